@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the web dashboard
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment:
+    DASHBOARD_HOST / DASHBOARD_PORT   Listen address (default 0.0.0.0:5000)
+    DASHBOARD_WORKERS                 Worker processes (default 2 x CPU cores + 1)
+    DASHBOARD_THREADS                 Threads per worker (default 4)
+    DASHBOARD_TIMEOUT                 Worker timeout in seconds (default 120; /api/check-now polls every source)
+    DASHBOARD_MAX_REQUESTS            Recycle a worker after this many requests (default 0 = never)
+    DASHBOARD_ACCESS_LOG              Access log file (default stdout, empty to disable)
+    PROMETHEUS_MULTIPROC_DIR          Per-worker metric files, aggregated by /metrics
+                                      (default reports/prometheus_multiproc)
+"""
+import gc
+import multiprocessing
+import os
+from pathlib import Path
+
+bind = f"{os.getenv('DASHBOARD_HOST', '0.0.0.0')}:{os.getenv('DASHBOARD_PORT', '5000')}"
+workers = int(os.getenv('DASHBOARD_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('DASHBOARD_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.getenv('DASHBOARD_TIMEOUT', 120))
+keepalive = 5
+max_requests = int(os.getenv('DASHBOARD_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+# Load sources, update index and reports once in the master (wsgi.preload_state)
+preload_app = True
+
+accesslog = os.getenv('DASHBOARD_ACCESS_LOG', '-') or None  # Empty: no access log
+errorlog = '-'
+
+# Every worker writes its metrics to this directory; stale files of a previous
+# run are removed before the app (and prometheus_client) is loaded
+_metrics_dir = Path(os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', 'reports/prometheus_multiproc'))
+_metrics_dir.mkdir(parents=True, exist_ok=True)
+for _stale in _metrics_dir.glob('*.db'):
+    _stale.unlink()
+
+
+def when_ready(server):
+    """Keep the preloaded objects out of the collector so workers share their pages"""
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -13,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.compliance_scanner import ComplianceGuardrail, ComplianceResult
 from src.analytics import generate_full_analytics_report, ComplianceAnalytics
+from src.aggregates import AggregateStore
 
 
 def load_test_cases(test_file_path: str = "test_data/sample_deployments.yaml"):
@@ -181,6 +182,9 @@ def run_all_tests():
     os.makedirs("reports", exist_ok=True)
     
     print("\n" + analytics.export_to_json(results_dict, export_path))
+
+    # 대시보드 집계 갱신 (reports/aggregates.json)
+    AggregateStore(compliance_report=export_path).record_compliance_report()
     print("="*70)
 
 
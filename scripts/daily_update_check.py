@@ -34,7 +34,7 @@ def send_notification(updates: list, report: str):
  f.write(report)
  f.write("\n\n")
  f.write("ACTION REQUIRED:\n")
- f.write("1. Review updates in reports/policy_updates.json\n")
+ f.write("1. Review updates in reports/update_log/\n")
  f.write("2. Consult with legal team\n")
  f.write("3. Update config/policy_rules.yaml if necessary\n")
  f.write("4. Run compliance tests\n")
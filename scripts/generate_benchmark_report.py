@@ -1,376 +1,354 @@
+#!/usr/bin/env python3
 """
 Generate Performance Benchmark Report
-Simulates load testing and performance metrics for portfolio demonstration
+Measures the compliance scanner and dashboard API on synthetic catalogs and
+compares the results against a stored baseline to catch regressions.
+
+Usage:
+    python scripts/generate_benchmark_report.py
+    python scripts/generate_benchmark_report.py --scales 1000 10000 --repeat 5
+    python scripts/generate_benchmark_report.py --save-baseline
+    python scripts/generate_benchmark_report.py --fail-on-regression
 """
 
+import argparse
+import gc
+import hashlib
 import json
+import os
+import platform
+import sys
+import tempfile
 import time
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
+import yaml
 
-def generate_speed_benchmark() -> Dict:
-    """Performance comparison: Manual vs Automated"""
-    return {
-        "test_date": datetime.now().isoformat(),
-        "test_environment": {
-            "hardware": "AWS EC2 t3.medium (2 vCPU, 4GB RAM)",
-            "os": "Ubuntu 22.04 LTS",
-            "python_version": "3.11.2",
-            "workers": 4
-        },
-        "validation_speed": {
-            "single_item": {
-                "automated_system": "0.03s",
-                "manual_review": "7200-14400s (2-4 hours)",
-                "improvement_factor": "240,000-480,000x faster"
-            },
-            "batch_1000_items": {
-                "automated_system": "30s (33ms/item)",
-                "manual_review": "2000-4000 hours",
-                "time_reduction": "99.9%"
-            },
-            "api_latency_p99": "85ms"
-        },
-        "accuracy_metrics": {
-            "test_dataset_size": 500,
-            "precision": 0.992,
-            "recall": 0.987,
-            "f1_score": 0.989,
-            "false_positive_rate": "< 1%",
-            "comparison": {
-                "industry_baseline_precision": "0.90-0.95",
-                "industry_baseline_recall": "0.85-0.90",
-                "industry_baseline_f1": "0.875"
-            }
-        }
-    }
+# Add project root and scripts directory to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+from src import cache as cache_module
+from src.compliance_scanner import ComplianceGuardrail
+from src.html_extractor import available_backends, get_extractor
+from src.policy_compiler import load_policy_rules
+from generate_sample_data import generate_deployment_catalog
+
+
+DEFAULT_POLICY_PATH = str(ROOT / "config" / "policy_rules.yaml")
+DEFAULT_OUTPUT = str(ROOT / "reports" / "performance_benchmark.json")
+DEFAULT_BASELINE = str(ROOT / "reports" / "benchmark_baseline.json")
+DEFAULT_SCALES = [100, 1000, 10000]
+DEFAULT_REGRESSION_THRESHOLD = 0.20  # 20% slower than baseline
+# Saved regulator pages for the HTML extraction benchmark
+HTML_FIXTURE_DIR = ROOT / "test_data" / "html"
+
+# Read-only dashboard endpoints measured through the Flask test client
+DASHBOARD_ENDPOINTS = ['/health', '/api/sources', '/api/updates', '/api/stats', '/api/analytics']
 
+# Metric used for the baseline comparison of each benchmark
+COMPARISON_METRIC = "p50_ms"
 
-def generate_load_test_results() -> Dict:
-    """Apache Bench load testing results"""
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples_seconds: List[float], items_per_sample: int = 1) -> Dict:
+    """Latency percentiles (ms) and throughput for a list of timings in seconds"""
+    values = sorted(samples_seconds)
+    total = sum(values)
     return {
-        "tool": "Apache Bench (ab)",
-        "test_date": datetime.now().isoformat(),
-        "endpoint": "POST /api/compliance/scan",
-        "scenarios": [
-            {
-                "name": "Baseline Load Test",
-                "total_requests": 10000,
-                "concurrency": 100,
-                "time_taken_seconds": 20.15,
-                "requests_per_second": 496.27,
-                "mean_latency_ms": 45,
-                "median_latency_ms": 42,
-                "p95_latency_ms": 78,
-                "p99_latency_ms": 85,
-                "failed_requests": 0,
-                "success_rate": "100%"
-            },
-            {
-                "name": "Stress Test (High Concurrency)",
-                "total_requests": 50000,
-                "concurrency": 500,
-                "time_taken_seconds": 125.3,
-                "requests_per_second": 399.04,
-                "mean_latency_ms": 68,
-                "median_latency_ms": 62,
-                "p95_latency_ms": 145,
-                "p99_latency_ms": 203,
-                "failed_requests": 12,
-                "success_rate": "99.98%",
-                "notes": "Minor timeouts under extreme load (500 concurrent)"
-            },
-            {
-                "name": "Sustained Load (30 minutes)",
-                "total_requests": 900000,
-                "concurrency": 100,
-                "duration_minutes": 30,
-                "requests_per_second": 500.12,
-                "mean_latency_ms": 47,
-                "failed_requests": 0,
-                "memory_leak_detected": False,
-                "cpu_utilization_avg": "45%",
-                "notes": "Stable performance, no degradation over time"
-            }
-        ],
-        "scalability_projection": {
-            "single_instance": "500 req/sec",
-            "3_instances_alb": "1500 req/sec",
-            "10_instances_alb": "5000 req/sec",
-            "daily_capacity_single": "43.2M validations/day",
-            "notes": "Linear scaling observed with load balancer"
-        }
+        "samples": len(values),
+        "mean_ms": round(total / len(values) * 1000, 4),
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "min_ms": round(values[0] * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4),
+        "items_per_second": round(len(values) * items_per_sample / total, 2) if total else None
     }
 
 
-def generate_cost_roi_analysis() -> Dict:
-    """ROI calculation for enterprise adoption"""
-    return {
-        "analysis_date": datetime.now().isoformat(),
-        "scenario": "Mid-size OTT Platform (Netflix-like service)",
-        "assumptions": {
-            "monthly_content_items": 1000,
-            "countries_deployed": 15,
-            "legal_reviewer_hourly_rate": "$50/hour",
-            "developer_hourly_rate": "$200/hour"
-        },
-        "manual_process_cost": {
-            "time_per_item": "3 hours",
-            "total_hours_monthly": "3000 hours (1000 items × 3 hours)",
-            "labor_cost_monthly": "$150,000",
-            "annual_cost": "$1,800,000",
-            "additional_costs": {
-                "delayed_launches": "$50,000/month (opportunity cost)",
-                "human_error_rework": "$20,000/month"
-            },
-            "total_monthly_cost": "$220,000"
-        },
-        "automated_system_cost": {
-            "infrastructure": {
-                "aws_ec2_t3_medium": "$50/month",
-                "aws_rds_postgresql": "$100/month",
-                "aws_elasticache_redis": "$50/month",
-                "total_infrastructure": "$200/month"
-            },
-            "maintenance": {
-                "developer_hours_monthly": "10 hours",
-                "cost": "$2,000/month"
-            },
-            "total_monthly_cost": "$2,200"
-        },
-        "roi_metrics": {
-            "monthly_savings": "$217,800",
-            "annual_savings": "$2,613,600",
-            "payback_period": "Immediate (< 1 month)",
-            "roi_percentage": "9900%",
-            "break_even_point": "Day 1"
-        },
-        "additional_benefits": {
-            "faster_time_to_market": "2-4 hours → 30 seconds (99.9% faster)",
-            "global_expansion_enabled": "15 → 100+ countries without proportional cost increase",
-            "compliance_accuracy": "85-90% (manual) → 99% (automated)",
-            "24_7_availability": "No human labor constraints"
+def measure(func: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    """Run func repeat times after warmup runs and return the timings in seconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def bench_policy_load(policy_path: str, repeat: int) -> Dict:
+    """Policy load time with and without the parsed-policy snapshot"""
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        return {
+            "policy_load_cold": summarize(measure(lambda: load_policy_rules(policy_path, None), repeat)),
+            "policy_load_snapshot": summarize(
+                measure(lambda: load_policy_rules(policy_path, snapshot_dir), repeat)
+            )
         }
+
+
+def bench_check_deployment(guardrail: ComplianceGuardrail, catalog: List[Dict]) -> Dict:
+    """Per-call latency of check_deployment over every catalog entry"""
+    samples = []
+    for deployment in catalog[:100]:
+        guardrail.check_deployment(deployment['country'], deployment['content_metadata'],
+                                   deployment.get('ad_schedule'))
+    for deployment in catalog:
+        country = deployment['country']
+        metadata = deployment['content_metadata']
+        ad_schedule = deployment.get('ad_schedule')
+        start = time.perf_counter()
+        guardrail.check_deployment(country, metadata, ad_schedule)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_check_all_countries(guardrail: ComplianceGuardrail, catalog: List[Dict]) -> Dict:
+    """Per-item latency of the single-pass all-country check"""
+    samples = []
+    for deployment in catalog:
+        metadata = deployment['content_metadata']
+        start = time.perf_counter()
+        guardrail.check_all_countries(metadata)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_dashboard(requests_per_endpoint: int) -> Dict:
+    """Latency of the read-only dashboard endpoints through the Flask test client"""
+    import web_dashboard
+
+    client = web_dashboard.app.test_client()
+    results = {}
+    for endpoint in DASHBOARD_ENDPOINTS:
+        statuses = set()
+
+        def request():
+            statuses.add(client.get(endpoint).status_code)
+
+        stats = summarize(measure(request, requests_per_endpoint, warmup=2))
+        stats["status_codes"] = sorted(statuses)
+        results[endpoint] = stats
+    return results
+
+
+def bench_html_extraction(repeat: int, fixture_dir: Path = HTML_FIXTURE_DIR) -> Dict:
+    """Extraction time per saved page for every available parser backend"""
+    pages = [path.read_bytes() for path in sorted(fixture_dir.glob("*.html"))]
+    if not pages:
+        return {}
+    results = {}
+    for backend in available_backends():
+        extractor = get_extractor(backend)
+
+        def extract_all():
+            for page in pages:
+                extractor.extract(page)
+
+        results[f"html_extract_{backend}"] = summarize(measure(extract_all, repeat), items_per_sample=len(pages))
+    return results
+
+
+def legacy_cache_key(*args, **kwargs) -> str:
+    """Key derivation of src.cache before canonical hashing, kept for comparison"""
+    key_data = str(args) + str(sorted(kwargs.items()))
+    return hashlib.md5(key_data.encode()).hexdigest()
+
+
+def bench_cache_overhead(guardrail: ComplianceGuardrail, catalog: List[Dict], repeat: int) -> Dict:
+    """Per-call cost of @cache key derivation and of a store + load round trip per serializer"""
+    calls = [(d['country'], d['content_metadata'], d.get('ad_schedule')) for d in catalog]
+    results = [guardrail.check_deployment(*call) for call in calls]
+    results_as_dicts = [result.to_dict() for result in results]
+    pack, unpack = cache_module._pack, cache_module._unpack
+
+    def derive(key_func):
+        def run():
+            for call in calls:
+                key_func(*call)
+        return run
+
+    benchmarks = {
+        "cache_key_legacy_md5": summarize(measure(derive(legacy_cache_key), repeat), items_per_sample=len(calls)),
+        "cache_key": summarize(measure(derive(cache_module.cache_key), repeat), items_per_sample=len(calls))
     }
+    for name in sorted(cache_module.SERIALIZERS):
+        values = results if name == 'pickle' else results_as_dicts  # Only pickle holds the objects
 
+        def round_trip():
+            for value in values:
+                unpack(pack(value, 0.0, 300, name))
 
-def generate_comparison_matrix() -> List[Dict]:
-    """Competitive landscape analysis"""
-    return [
-        {
-            "solution": "Glocal Policy Guardrail (This Project)",
-            "approach": "Policy-as-Code with YAML rules + Regex NLP",
-            "processing_time": "0.03s/item",
-            "accuracy": "99%",
-            "extensibility": "High (YAML config)",
-            "cost": "$200/month (AWS)",
-            "maintenance": "Low (5-10 hours/month)",
-            "ai_integration": "Planned (v2.0)",
-            "open_source": True
-        },
-        {
-            "solution": "Manual Legal Review",
-            "approach": "Human experts review each item",
-            "processing_time": "2-4 hours/item",
-            "accuracy": "85-90%",
-            "extensibility": "Low (requires training)",
-            "cost": "$150,000/month",
-            "maintenance": "N/A",
-            "ai_integration": False,
-            "open_source": False
-        },
-        {
-            "solution": "Hard-coded Rules (Legacy)",
-            "approach": "If-else logic in application code",
-            "processing_time": "0.05s/item",
-            "accuracy": "70-80%",
-            "extensibility": "Very Low (code changes needed)",
-            "cost": "$5,000/month (dev time)",
-            "maintenance": "High (2-4 hours per policy update)",
-            "ai_integration": False,
-            "open_source": False
-        },
-        {
-            "solution": "Commercial Compliance Tools (e.g., Verizon MediaGuard)",
-            "approach": "Proprietary AI/ML models",
-            "processing_time": "0.1s/item",
-            "accuracy": "95%",
-            "extensibility": "Medium (vendor-dependent)",
-            "cost": "$10,000-50,000/month",
-            "maintenance": "Vendor-managed",
-            "ai_integration": True,
-            "open_source": False
-        }
-    ]
+        benchmarks[f"cache_serialize_{name}"] = summarize(measure(round_trip, repeat), items_per_sample=len(values))
+    return benchmarks
 
 
-def generate_technical_metrics() -> Dict:
-    """System-level technical performance"""
-    return {
-        "code_quality": {
-            "lines_of_code": {
-                "core_engine": 800,
-                "tests": 450,
-                "documentation": 2000,
-                "total": 3250
-            },
-            "test_coverage": "85%",
-            "code_quality_tools": {
-                "black": "100% formatted",
-                "flake8": "0 linting errors",
-                "mypy": "95% type coverage",
-                "bandit": "0 security issues",
-                "safety": "0 CVEs in dependencies"
-            },
-            "complexity_metrics": {
-                "cyclomatic_complexity_avg": 3.2,
-                "maintainability_index": 82,
-                "technical_debt_ratio": "< 1%"
-            }
-        },
-        "system_performance": {
-            "memory_usage": {
-                "idle": "120 MB",
-                "under_load": "350 MB",
-                "peak": "480 MB"
-            },
-            "cpu_usage": {
-                "idle": "< 5%",
-                "moderate_load": "30-40%",
-                "peak_load": "60-70%"
-            },
-            "disk_io": {
-                "policy_db_load": "0.015s (cold start)",
-                "redis_cache_hit": "0.001s",
-                "json_report_export": "0.008s"
-            }
-        },
-        "reliability": {
-            "uptime_docker": "99.5% (simulated 30-day test)",
-            "error_rate": "< 0.01%",
-            "mtbf": "720 hours (30 days)",
-            "mttr": "< 5 minutes (auto-restart)"
-        },
-        "security": {
-            "vulnerability_scan_date": datetime.now().isoformat(),
-            "cve_count": 0,
-            "owasp_compliance": "A+ rating (theoretical)",
-            "encryption": "TLS 1.3 (production)",
-            "authentication": "API key + JWT (planned v2.0)"
+def run_benchmarks(policy_path: str, scales: List[int], repeat: int, seed: int,
+                   dashboard_requests: int) -> Dict:
+    """Run every benchmark and return the flat {name: stats} mapping"""
+    with open(policy_path, 'r', encoding='utf-8') as f:
+        policy_db = yaml.safe_load(f)
+    guardrail = ComplianceGuardrail(policy_path, None)
+
+    benchmarks = bench_policy_load(policy_path, repeat * 10)
+
+    largest = generate_deployment_catalog(max(scales), policy_db, seed)
+    benchmarks["check_deployment"] = bench_check_deployment(guardrail, largest)
+    benchmarks["check_all_countries"] = bench_check_all_countries(guardrail, largest[:min(len(largest), 2000)])
+
+    for scale in scales:
+        catalog = largest[:scale]
+        benchmarks[f"batch_check_{scale}"] = summarize(
+            measure(lambda: guardrail.batch_check(catalog), repeat), items_per_sample=scale
+        )
+
+    benchmarks.update(bench_cache_overhead(guardrail, largest[:min(len(largest), 1000)], repeat))
+    benchmarks.update(bench_html_extraction(repeat))
+
+    if dashboard_requests:
+        for endpoint, stats in bench_dashboard(dashboard_requests).items():
+            benchmarks[f"dashboard GET {endpoint}"] = stats
+
+    return benchmarks
+
+
+def compare_with_baseline(benchmarks: Dict, baseline: Optional[Dict], threshold: float) -> Dict:
+    """Ratio of each benchmark's comparison metric to the baseline (>1 is slower)"""
+    if not baseline:
+        return {"baseline": None, "regressions": [], "benchmarks": {}}
+
+    comparison = {}
+    regressions = []
+    for name, stats in benchmarks.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base or not base.get(COMPARISON_METRIC):
+            continue
+        ratio = stats[COMPARISON_METRIC] / base[COMPARISON_METRIC]
+        regressed = ratio > 1 + threshold
+        comparison[name] = {
+            "metric": COMPARISON_METRIC,
+            "baseline": base[COMPARISON_METRIC],
+            "current": stats[COMPARISON_METRIC],
+            "ratio": round(ratio, 3),
+            "regression": regressed
         }
+        if regressed:
+            regressions.append(name)
+
+    return {
+        "baseline": baseline.get("generated_date"),
+        "threshold": threshold,
+        "regressions": regressions,
+        "benchmarks": comparison
     }
 
 
-def generate_feature_comparison() -> Dict:
-    """Feature matrix vs industry solutions"""
+def environment_info() -> Dict:
+    """Where the numbers were measured"""
     return {
-        "features": [
-            {
-                "category": "Core Functionality",
-                "features": [
-                    {"name": "Multi-country support", "this_project": "15+", "competitors": "5-10"},
-                    {"name": "Keyword detection", "this_project": " (Regex)", "competitors": ""},
-                    {"name": "Time-based restrictions", "this_project": " (Timezone-aware)", "competitors": "Partial"},
-                    {"name": "Mandatory features check", "this_project": "", "competitors": ""}
-                ]
-            },
-            {
-                "category": "Performance",
-                "features": [
-                    {"name": "Processing speed", "this_project": "0.03s", "competitors": "0.1-2s"},
-                    {"name": "Batch processing", "this_project": " (1000 items/30s)", "competitors": ""},
-                    {"name": "API latency (p99)", "this_project": "85ms", "competitors": "150-500ms"}
-                ]
-            },
-            {
-                "category": "Automation",
-                "features": [
-                    {"name": "Auto regulatory monitoring", "this_project": " (24 sources)", "competitors": ""},
-                    {"name": "Policy update alerts", "this_project": " (Email/Slack/Discord)", "competitors": "Partial"},
-                    {"name": "Change tracking", "this_project": " (Git-like history)", "competitors": ""}
-                ]
-            },
-            {
-                "category": "Integration",
-                "features": [
-                    {"name": "REST API", "this_project": " (Swagger)", "competitors": ""},
-                    {"name": "CLI interface", "this_project": "", "competitors": ""},
-                    {"name": "Web dashboard", "this_project": "", "competitors": " (paid)"},
-                    {"name": "Docker deployment", "this_project": "", "competitors": "Partial"}
-                ]
-            }
-        ]
+        "python_version": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count()
     }
 
 
 def main():
-    """Generate comprehensive benchmark report"""
-    
+    """Measure, compare against the baseline and write the benchmark report"""
+    parser = argparse.ArgumentParser(description='Run the performance benchmark suite')
+    parser.add_argument('--policy', default=DEFAULT_POLICY_PATH, help='Policy database path')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='Catalog sizes for batch_check (default: 100 1000 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per batch benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic catalog seed')
+    parser.add_argument('--dashboard-requests', type=int, default=50,
+                        help='Requests per dashboard endpoint (0 to skip)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Report output path')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline report path')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='Allowed slowdown before a benchmark counts as regressed (0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 when any benchmark regressed')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    benchmarks = run_benchmarks(args.policy, args.scales, args.repeat, args.seed, args.dashboard_requests)
+
+    baseline = None
+    if not args.save_baseline and Path(args.baseline).exists():
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
     report = {
         "report_metadata": {
             "title": "Glocal Policy Guardrail - Performance Benchmark Report",
-            "version": "1.0.0",
+            "version": "2.0.0",
             "generated_date": datetime.now().isoformat(),
-            "author": "Deokhwa Jeong",
-            "purpose": "Portfolio demonstration and EB1 research contribution"
+            "duration_seconds": round(time.perf_counter() - started, 2)
         },
-        "speed_benchmarks": generate_speed_benchmark(),
-        "load_test_results": generate_load_test_results(),
-        "cost_roi_analysis": generate_cost_roi_analysis(),
-        "competitive_comparison": generate_comparison_matrix(),
-        "technical_metrics": generate_technical_metrics(),
-        "feature_matrix": generate_feature_comparison()
+        "environment": environment_info(),
+        "parameters": {
+            "policy": os.path.relpath(args.policy, ROOT),
+            "scales": args.scales,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "dashboard_requests": args.dashboard_requests
+        },
+        "benchmarks": benchmarks,
+        "comparison": compare_with_baseline(benchmarks, baseline, args.threshold)
     }
-    
-    # Save to file
-    output_path = "reports/performance_benchmark.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
-    
-    print("=" * 70)
-    print(" PERFORMANCE BENCHMARK REPORT GENERATED")
-    print("=" * 70)
-    print(f"\n Report saved to: {output_path}")
-    print(f"\n Key Highlights:")
-    print(f"   • Processing Speed: 0.03s/item (240,000x faster than manual)")
-    print(f"   • Accuracy: 99.2% precision, 98.7% recall")
-    print(f"   • Load Capacity: 500 req/sec (single instance)")
-    print(f"   • Annual Cost Savings: $2.6M for mid-size OTT platform")
-    print(f"   • Code Quality: 85% test coverage, 0 security vulnerabilities")
-    print(f"\n Use this data in:")
-    print(f"   • README.md (performance section)")
-    print(f"   • Research paper appendix")
-    print(f"   • EB1 visa application (technical contribution)")
-    print(f"   • Investor/stakeholder presentations")
-    print("\n" + "=" * 70)
-    
-    # Generate summary table
-    print("\n QUICK REFERENCE TABLE")
-    print("=" * 70)
-    print(f"{'Metric':<35} {'Value':<35}")
-    print("-" * 70)
-    
-    metrics = [
-        ("Processing Speed (single item)", "0.03s"),
-        ("Batch Processing (1000 items)", "30s (33ms/item)"),
-        ("API Latency (p99)", "85ms"),
-        ("Precision", "99.2%"),
-        ("Recall", "98.7%"),
-        ("F1 Score", "0.989"),
-        ("Load Capacity (single instance)", "500 req/sec"),
-        ("Monthly Cost (AWS infrastructure)", "$200"),
-        ("Annual ROI", "$2.6M savings"),
-        ("Test Coverage", "85%"),
-        ("Security Vulnerabilities", "0"),
-        ("Uptime (Docker)", "99.5%")
-    ]
-    
-    for metric, value in metrics:
-        print(f"{metric:<35} {value:<35}")
-    
-    print("=" * 70)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("=" * 88)
+    print(" PERFORMANCE BENCHMARK REPORT")
+    print("=" * 88)
+    print(f"{'Benchmark':<36} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'items/s':>12} {'vs base':>8}")
+    print("-" * 88)
+    compared = report["comparison"]["benchmarks"]
+    for name, stats in benchmarks.items():
+        ratio = compared.get(name, {}).get("ratio")
+        print(f"{name:<36} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+              f"{stats['items_per_second'] or 0:>12.1f} {f'{ratio:.2f}x' if ratio else '-':>8}")
+    print("=" * 88)
+    print(f"Report saved to: {args.output}")
+    if args.save_baseline:
+        print(f"Baseline saved to: {args.baseline}")
+
+    regressions = report["comparison"]["regressions"]
+    if regressions:
+        print(f"⚠️  Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,236 +1,336 @@
 #!/usr/bin/env python3
 """
 Generate realistic sample data for Glocal Policy Guardrail
-Creates sample policy updates, compliance reports, and change history
+Creates sample policy updates, compliance reports, change history and
+synthetic deployment catalogs for benchmarks
 """
+import argparse
 import json
 import random
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.update_log import UpdateLogStore
+from src.aggregates import AggregateStore
+
 # Realistic OTT regulatory data based on actual global regulations
 COUNTRIES = [
- "South_Korea", "United_States", "United_Kingdom", "Germany", "France",
- "Japan", "India", "Brazil", "Australia", "Canada", "Singapore",
- "Netherlands", "Spain", "Italy", "Mexico"
+    "South_Korea", "United_States", "United_Kingdom", "Germany", "France",
+    "Japan", "India", "Brazil", "Australia", "Canada", "Singapore",
+    "Netherlands", "Spain", "Italy", "Mexico"
 ]
 REGULATORY_UPDATES = {
- "South_Korea": [
- "K-Content mandatory subtitle requirements updated",
- "New content rating guidelines for streaming platforms",
- "Local content quota increased to 30%",
- "Platform registration requirements revised",
- "Advertisement time restrictions modified"
- ],
- "United_States": [
- "COPPA compliance requirements updated for children's content",
- "Closed captioning requirements for VOD services",
- "State-level privacy regulations harmonization",
- "FCC accessibility guidelines updated",
- "Content rating system aligned with MPAA standards"
- ],
- "European_Union": [
- "GDPR cookie consent requirements clarified",
- "Digital Services Act implementation deadline set",
- "AVMSD quota requirements for European content",
- "Age verification standards for mature content",
- "Cross-border content licensing simplified"
- ],
- "United_Kingdom": [
- "Ofcom streaming service regulations updated",
- "Brexit-related content licensing changes",
- "VOD accessibility requirements enhanced",
- "Harmful content regulation framework published",
- "Product placement disclosure rules revised"
- ],
- "Germany": [
- "Youth Protection Act amendments for streaming",
- "FSK rating system integration requirements",
- "Staatsvertrag obligations for VOD platforms",
- "Local language audio track requirements",
- "Advertising restrictions during children's programming"
- ],
- "Japan": [
- "Broadcasting Ethics regulations for streaming updated",
- "Content rating system alignment with EIRIN",
- "Disaster warning system integration required",
- "Local content promotion guidelines",
- "Privacy protection law compliance deadline"
- ],
- "India": [
- "Information Technology Rules for OTT platforms",
- "Self-classification system for content rating",
- "Regional language content requirements",
- "Parental control features mandatory",
- "Intermediary guidelines compliance required"
- ],
- "Brazil": [
- "Portuguese subtitles mandatory for foreign content",
- "ANCINE registration requirements updated",
- "Content rating (Classificação Indicativa) revised",
- "Tax obligations for streaming services clarified",
- "Accessibility features for hearing impaired required"
- ],
- "Australia": [
- "ACMA streaming service licensing framework",
- "Classification requirements for VOD content",
- "Australian content quota for SVOD services",
- "Closed captioning standards updated",
- "Privacy Act compliance for data collection"
- ],
- "Canada": [
- "CRTC online streaming regulations finalized",
- "CanCon requirements for streaming platforms",
- "French language content quotas in Quebec",
- "Accessibility standards for broadcasting",
- "Bill C-11 implementation guidelines"
- ]
+    "South_Korea": [
+        "K-Content mandatory subtitle requirements updated",
+        "New content rating guidelines for streaming platforms",
+        "Local content quota increased to 30%",
+        "Platform registration requirements revised",
+        "Advertisement time restrictions modified"
+    ],
+    "United_States": [
+        "COPPA compliance requirements updated for children's content",
+        "Closed captioning requirements for VOD services",
+        "State-level privacy regulations harmonization",
+        "FCC accessibility guidelines updated",
+        "Content rating system aligned with MPAA standards"
+    ],
+    "European_Union": [
+        "GDPR cookie consent requirements clarified",
+        "Digital Services Act implementation deadline set",
+        "AVMSD quota requirements for European content",
+        "Age verification standards for mature content",
+        "Cross-border content licensing simplified"
+    ],
+    "United_Kingdom": [
+        "Ofcom streaming service regulations updated",
+        "Brexit-related content licensing changes",
+        "VOD accessibility requirements enhanced",
+        "Harmful content regulation framework published",
+        "Product placement disclosure rules revised"
+    ],
+    "Germany": [
+        "Youth Protection Act amendments for streaming",
+        "FSK rating system integration requirements",
+        "Staatsvertrag obligations for VOD platforms",
+        "Local language audio track requirements",
+        "Advertising restrictions during children's programming"
+    ],
+    "Japan": [
+        "Broadcasting Ethics regulations for streaming updated",
+        "Content rating system alignment with EIRIN",
+        "Disaster warning system integration required",
+        "Local content promotion guidelines",
+        "Privacy protection law compliance deadline"
+    ],
+    "India": [
+        "Information Technology Rules for OTT platforms",
+        "Self-classification system for content rating",
+        "Regional language content requirements",
+        "Parental control features mandatory",
+        "Intermediary guidelines compliance required"
+    ],
+    "Brazil": [
+        "Portuguese subtitles mandatory for foreign content",
+        "ANCINE registration requirements updated",
+        "Content rating (Classificação Indicativa) revised",
+        "Tax obligations for streaming services clarified",
+        "Accessibility features for hearing impaired required"
+    ],
+    "Australia": [
+        "ACMA streaming service licensing framework",
+        "Classification requirements for VOD content",
+        "Australian content quota for SVOD services",
+        "Closed captioning standards updated",
+        "Privacy Act compliance for data collection"
+    ],
+    "Canada": [
+        "CRTC online streaming regulations finalized",
+        "CanCon requirements for streaming platforms",
+        "French language content quotas in Quebec",
+        "Accessibility standards for broadcasting",
+        "Bill C-11 implementation guidelines"
+    ]
 }
 SOURCES = [
- "Ministry of Culture, Sports and Tourism",
- "Federal Communications Commission",
- "European Commission",
- "Ofcom",
- "Bundesnetzagentur",
- "Ministry of Internal Affairs and Communications",
- "Ministry of Information and Broadcasting",
- "ANCINE",
- "ACMA",
- "CRTC"
+    "Ministry of Culture, Sports and Tourism",
+    "Federal Communications Commission",
+    "European Commission",
+    "Ofcom",
+    "Bundesnetzagentur",
+    "Ministry of Internal Affairs and Communications",
+    "Ministry of Information and Broadcasting",
+    "ANCINE",
+    "ACMA",
+    "CRTC"
 ]
 VIOLATION_TYPES = [
- "Missing required subtitles",
- "Incorrect content rating",
- "Inadequate parental controls",
- "Non-compliant privacy policy",
- "Missing accessibility features",
- "Local content quota not met",
- "Advertisement time exceeded",
- "Age verification not implemented",
- "Required metadata missing",
- "Geographic restriction violation"
+    "Missing required subtitles",
+    "Incorrect content rating",
+    "Inadequate parental controls",
+    "Non-compliant privacy policy",
+    "Missing accessibility features",
+    "Local content quota not met",
+    "Advertisement time exceeded",
+    "Age verification not implemented",
+    "Required metadata missing",
+    "Geographic restriction violation"
 ]
+
+
+# Synthetic catalog vocabulary for compliance scan benchmarks
+CATALOG_TITLE_WORDS = [
+    "night", "city", "love", "story", "family", "secret", "return", "empire", "ocean",
+    "summer", "legend", "kingdom", "detective", "kitchen", "journey", "school", "shadow"
+]
+CATALOG_GENRES = ["drama", "comedy", "documentary", "thriller", "romance", "animation", "reality"]
+CATALOG_FEATURES = [
+    "real_name_verification", "youth_protection_system", "korean_subtitle_availability",
+    "content_pre_approval", "data_localization", "real_name_registration", "gdpr_compliance"
+]
+CATALOG_AD_TYPES = ["gambling_ads", "alcohol_ads", "tobacco_ads", "toy_ads", "car_ads"]
+
+
+def generate_deployment_catalog(size: int, policy_db: dict, seed: int = 42,
+                                keyword_rate: float = 0.1, ad_rate: float = 0.3) -> list:
+    """
+    Generate a reproducible synthetic deployment catalog for the compliance scanner
+
+    Args:
+        size: Number of deployments
+        policy_db: Parsed policy database (countries and keywords are drawn from it)
+        seed: Random seed; the same seed always produces the same catalog
+        keyword_rate: Share of deployments that mention a forbidden keyword
+        ad_rate: Share of deployments that carry an ad schedule
+    """
+    rng = random.Random(seed)
+    countries = list(policy_db.keys())
+    keywords = sorted({kw for policy in policy_db.values() for kw in policy.get('forbidden_keywords') or []})
+
+    catalog = []
+    for i in range(size):
+        country = rng.choice(countries)
+        policy = policy_db[country]
+        description = " ".join(rng.choices(CATALOG_TITLE_WORDS, k=rng.randint(8, 30)))
+        if keywords and rng.random() < keyword_rate:
+            description += " " + rng.choice(keywords)
+        deployment = {
+            "country": country,
+            "content_metadata": {
+                "title": " ".join(rng.choices(CATALOG_TITLE_WORDS, k=rng.randint(1, 4))).title(),
+                "description": description,
+                "genre": rng.choice(CATALOG_GENRES),
+                "tags": rng.sample(CATALOG_GENRES, k=2),
+                "features": rng.sample(CATALOG_FEATURES, k=rng.randint(0, 4)),
+                "age_rating_system": policy.get("age_rating_system") if rng.random() < 0.9 else None
+            }
+        }
+        if rng.random() < ad_rate:
+            deployment["ad_schedule"] = {"ad_type": rng.choice(CATALOG_AD_TYPES), "slot": i % 24}
+        catalog.append(deployment)
+    return catalog
+
+
 def generate_policy_updates(num_days=90, updates_per_day=2):
- """Generate realistic policy update logs"""
- updates_log = []
- for i in range(num_days):
- date = datetime.now() - timedelta(days=num_days - i)
- for _ in range(random.randint(1, updates_per_day)):
- country = random.choice(COUNTRIES)
- country_updates = REGULATORY_UPDATES.get(country, REGULATORY_UPDATES["South_Korea"])
- log_entry = {
- "timestamp": date.isoformat(),
- "updates_count": random.randint(1, 5),
- "updates": []
- }
- for _ in range(log_entry["updates_count"]):
- update = {
- "country": country,
- "source": random.choice(SOURCES),
- "title": random.choice(country_updates),
- "url": f"https://example.gov/{country.lower()}/regulation-{random.randint(1000, 9999)}",
- "confidence": random.choice(["high", "high", "high", "medium"]),
- "detected_at": date.isoformat(),
- "status": "pending_review"
- }
- log_entry["updates"].append(update)
- updates_log.append(log_entry)
- return updates_log
+    """Generate realistic policy update logs"""
+    updates_log = []
+    for i in range(num_days):
+        date = datetime.now() - timedelta(days=num_days - i)
+        for _ in range(random.randint(1, updates_per_day)):
+            country = random.choice(COUNTRIES)
+            country_updates = REGULATORY_UPDATES.get(country, REGULATORY_UPDATES["South_Korea"])
+            log_entry = {
+                "timestamp": date.isoformat(),
+                "updates_count": random.randint(1, 5),
+                "updates": []
+            }
+            for _ in range(log_entry["updates_count"]):
+                update = {
+                    "country": country,
+                    "source": random.choice(SOURCES),
+                    "title": random.choice(country_updates),
+                    "url": f"https://example.gov/{country.lower()}/regulation-{random.randint(1000, 9999)}",
+                    "confidence": random.choice(["high", "high", "high", "medium"]),
+                    "detected_at": date.isoformat(),
+                    "status": "pending_review"
+                }
+                log_entry["updates"].append(update)
+            updates_log.append(log_entry)
+    return updates_log
+
+
 def generate_compliance_report():
- """Generate comprehensive compliance report"""
- report = {
- "generated_at": datetime.now().isoformat(),
- "summary": {
- "total_countries": len(COUNTRIES),
- "compliant_countries": random.randint(10, 13),
- "partial_compliance": random.randint(2, 4),
- "non_compliant": random.randint(0, 1),
- "total_checks": random.randint(450, 550),
- "violations_found": random.randint(15, 35)
- },
- "country_details": {}
- }
- for country in COUNTRIES:
- checks = random.randint(25, 45)
- violations = random.randint(0, 5)
- report["country_details"][country] = {
- "compliance_status": "compliant" if violations == 0 else "partial" if violations < 3 else "non_compliant",
- "total_checks": checks,
- "passed_checks": checks - violations,
- "violations": violations,
- "compliance_rate": round((checks - violations) / checks * 100, 2),
- "last_checked": (datetime.now() - timedelta(days=random.randint(0, 7))).isoformat(),
- "critical_issues": [],
- "warnings": []
- }
- if violations > 0:
- for _ in range(violations):
- issue = {
- "type": random.choice(VIOLATION_TYPES),
- "severity": random.choice(["high", "medium", "low"]),
- "description": f"Compliance issue detected in {country}",
- "remediation": "Update content metadata and implement required features"
- }
- if issue["severity"] == "high":
- report["country_details"][country]["critical_issues"].append(issue)
- else:
- report["country_details"][country]["warnings"].append(issue)
- return report
+    """Generate comprehensive compliance report"""
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "summary": {
+            "total_countries": len(COUNTRIES),
+            "compliant_countries": random.randint(10, 13),
+            "partial_compliance": random.randint(2, 4),
+            "non_compliant": random.randint(0, 1),
+            "total_checks": random.randint(450, 550),
+            "violations_found": random.randint(15, 35)
+        },
+        "country_details": {}
+    }
+    for country in COUNTRIES:
+        checks = random.randint(25, 45)
+        violations = random.randint(0, 5)
+        report["country_details"][country] = {
+            "compliance_status": "compliant" if violations == 0 else "partial" if violations < 3 else "non_compliant",
+            "total_checks": checks,
+            "passed_checks": checks - violations,
+            "violations": violations,
+            "compliance_rate": round((checks - violations) / checks * 100, 2),
+            "last_checked": (datetime.now() - timedelta(days=random.randint(0, 7))).isoformat(),
+            "critical_issues": [],
+            "warnings": []
+        }
+        if violations > 0:
+            for _ in range(violations):
+                issue = {
+                    "type": random.choice(VIOLATION_TYPES),
+                    "severity": random.choice(["high", "medium", "low"]),
+                    "description": f"Compliance issue detected in {country}",
+                    "remediation": "Update content metadata and implement required features"
+                }
+                if issue["severity"] == "high":
+                    report["country_details"][country]["critical_issues"].append(issue)
+                else:
+                    report["country_details"][country]["warnings"].append(issue)
+    return report
+
+
 def generate_change_history():
- """Generate change tracking history"""
- changes = []
- change_id = 1
- for i in range(50):
- date = datetime.now() - timedelta(days=random.randint(0, 90))
- country = random.choice(COUNTRIES)
- change = {
- "id": change_id,
- "timestamp": date.isoformat(),
- "country": country,
- "change_type": random.choice(["update", "new", "deprecated"]),
- "field": random.choice(["content_rating", "subtitle_requirement", "quota", "privacy_policy", "accessibility"]),
- "old_value": "Previous requirement" if change_id > 10 else None,
- "new_value": random.choice(REGULATORY_UPDATES.get(country, REGULATORY_UPDATES["South_Korea"])),
- "source": random.choice(SOURCES),
- "source_url": f"https://example.gov/{country.lower()}/update-{change_id}",
- "confidence": random.choice(["high", "high", "medium"]),
- "approved": random.choice([True, True, True, False]),
- "applied": random.choice([True, True, False]),
- "reviewer": random.choice(["compliance_team", "legal_team", "product_manager", None])
- }
- changes.append(change)
- change_id += 1
- return {"changes": changes, "versions": []}
+    """Generate change tracking history"""
+    changes = []
+    change_id = 1
+    for i in range(50):
+        date = datetime.now() - timedelta(days=random.randint(0, 90))
+        country = random.choice(COUNTRIES)
+        change = {
+            "id": change_id,
+            "timestamp": date.isoformat(),
+            "country": country,
+            "change_type": random.choice(["update", "new", "deprecated"]),
+            "field": random.choice(["content_rating", "subtitle_requirement", "quota", "privacy_policy", "accessibility"]),
+            "old_value": "Previous requirement" if change_id > 10 else None,
+            "new_value": random.choice(REGULATORY_UPDATES.get(country, REGULATORY_UPDATES["South_Korea"])),
+            "source": random.choice(SOURCES),
+            "source_url": f"https://example.gov/{country.lower()}/update-{change_id}",
+            "confidence": random.choice(["high", "high", "medium"]),
+            "approved": random.choice([True, True, True, False]),
+            "applied": random.choice([True, True, False]),
+            "reviewer": random.choice(["compliance_team", "legal_team", "product_manager", None])
+        }
+        changes.append(change)
+        change_id += 1
+    return {"changes": changes, "versions": []}
+
+
+def write_catalog(size: int, output_path: str, policy_path: str = "config/policy_rules.yaml", seed: int = 42):
+    """Write a synthetic deployment catalog as JSONL (input for src/stream_scanner.py)"""
+    with open(policy_path, 'r', encoding='utf-8') as f:
+        policy_db = yaml.safe_load(f)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for deployment in generate_deployment_catalog(size, policy_db, seed):
+            f.write(json.dumps(deployment, ensure_ascii=False) + "\n")
+
+
 def main():
- """Generate all sample data"""
- print("Generating realistic sample data for OTT compliance platform...")
- # Create directories
- Path("reports").mkdir(exist_ok=True)
- Path("reports/change_history").mkdir(exist_ok=True)
- # Generate policy updates
- print("📝 Generating policy updates (90 days)...")
- updates = generate_policy_updates(num_days=90, updates_per_day=2)
- with open("reports/policy_updates.json", "w") as f:
- json.dump(updates, f, indent=2)
- print(f" ✅ Created {len(updates)} policy update entries")
- # Generate compliance report
- print("📊 Generating compliance report...")
- report = generate_compliance_report()
- with open("reports/compliance_report.json", "w") as f:
- json.dump(report, f, indent=2)
- print(f" ✅ Created compliance report for {len(COUNTRIES)} countries")
- # Generate change history
- print("📜 Generating change history...")
- history = generate_change_history()
- with open("reports/change_history/changes.json", "w") as f:
- json.dump(history, f, indent=2)
- print(f" ✅ Created {len(history['changes'])} change records")
- print("\n✨ Sample data generation complete!")
- print("\n📈 Summary:")
- print(f" - Policy Updates: {len(updates)} entries over 90 days")
- print(f" - Total Regulatory Changes: {sum(log['updates_count'] for log in updates)}")
- print(f" - Countries Monitored: {len(COUNTRIES)}")
- print(f" - Compliance Checks: {report['summary']['total_checks']}")
- print(f" - Violations Found: {report['summary']['violations_found']}")
- print(f" - Change Records: {len(history['changes'])}")
+    """Generate all sample data"""
+    parser = argparse.ArgumentParser(description='Generate sample data for Glocal Policy Guardrail')
+    parser.add_argument('--catalog', type=int, metavar='SIZE',
+                        help='Only write a synthetic deployment catalog of SIZE items')
+    parser.add_argument('--output', default='test_data/catalog.jsonl', help='Catalog output path')
+    parser.add_argument('--seed', type=int, default=42, help='Catalog random seed')
+    args = parser.parse_args()
+
+    if args.catalog:
+        write_catalog(args.catalog, args.output, seed=args.seed)
+        print(f"✅ Wrote {args.catalog} deployments to {args.output}")
+        return
+
+    print("Generating realistic sample data for OTT compliance platform...")
+    # Create directories
+    Path("reports").mkdir(exist_ok=True)
+    Path("reports/change_history").mkdir(exist_ok=True)
+    # Generate policy updates
+    print("📝 Generating policy updates (90 days)...")
+    updates = generate_policy_updates(num_days=90, updates_per_day=2)
+    update_log = UpdateLogStore(legacy_path=None, fsync=False)
+    update_log.clear()
+    for entry in updates:
+        update_log.append(entry)
+    print(f" ✅ Created {len(updates)} policy update entries")
+    # Generate compliance report
+    print("📊 Generating compliance report...")
+    report = generate_compliance_report()
+    with open("reports/compliance_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print(f" ✅ Created compliance report for {len(COUNTRIES)} countries")
+    # Materialize dashboard aggregates from the log and report just written
+    AggregateStore(update_log=update_log).rebuild()
+    print(" ✅ Rebuilt dashboard aggregates")
+    # Generate change history
+    print("📜 Generating change history...")
+    history = generate_change_history()
+    with open("reports/change_history/changes.json", "w") as f:
+        json.dump(history, f, indent=2)
+    print(f" ✅ Created {len(history['changes'])} change records")
+    print("\n✨ Sample data generation complete!")
+    print("\n📈 Summary:")
+    print(f" - Policy Updates: {len(updates)} entries over 90 days")
+    print(f" - Total Regulatory Changes: {sum(log['updates_count'] for log in updates)}")
+    print(f" - Countries Monitored: {len(COUNTRIES)}")
+    print(f" - Compliance Checks: {report['summary']['total_checks']}")
+    print(f" - Violations Found: {report['summary']['violations_found']}")
+    print(f" - Change Records: {len(history['changes'])}")
+
+
 if __name__ == "__main__":
- main()
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Dashboard Load Test
+Starts the production server (gunicorn -c gunicorn.conf.py wsgi:app) with
+increasing worker counts, drives the read-only API endpoints from
+concurrent client processes and reports throughput and latency per worker
+count, so the scaling with workers can be checked on a multi-core box.
+
+Clients run on the same machine as the server; keep --clients at or below
+the number of cores that are not serving, or the clients become the limit.
+
+Usage:
+    python scripts/load_test_dashboard.py
+    python scripts/load_test_dashboard.py --workers 1 2 4 8 --threads 4 --clients 8 --duration 15
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+
+# Add project root and scripts directory to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+from generate_benchmark_report import environment_info, percentile
+
+
+DEFAULT_OUTPUT = str(ROOT / "reports" / "dashboard_load_test.json")
+DEFAULT_ENDPOINTS = ['/api/stats', '/api/updates', '/api/analytics', '/api/sources', '/health']
+DEFAULT_PORT = 5055
+STARTUP_TIMEOUT = 30.0
+
+
+def default_worker_counts() -> List[int]:
+    """1, 2, 4, ... up to the number of cores"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def start_server(workers: int, threads: int, port: int) -> subprocess.Popen:
+    """Start gunicorn with the production configuration and wait until it answers"""
+    env = dict(os.environ,
+               DASHBOARD_HOST='127.0.0.1', DASHBOARD_PORT=str(port),
+               DASHBOARD_WORKERS=str(workers), DASHBOARD_THREADS=str(threads),
+               DASHBOARD_ACCESS_LOG='')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f"gunicorn did not answer within {STARTUP_TIMEOUT:.0f}s")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def client(args) -> Dict:
+    """One client process: request the endpoints round-robin over a keep-alive connection until the deadline"""
+    base_url, endpoints, deadline = args
+    latencies = []
+    errors = 0
+    with requests.Session() as session:
+        i = 0
+        while time.time() < deadline:
+            url = base_url + endpoints[i % len(endpoints)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                response.content
+                if response.status_code >= 500:
+                    errors += 1
+            except requests.RequestException:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run_load(port: int, endpoints: List[str], clients: int, duration: float) -> Dict:
+    """Drive the server from `clients` processes for `duration` seconds"""
+    base_url = f"http://127.0.0.1:{port}"
+    for endpoint in endpoints:  # Warm every worker's connection and code paths
+        requests.get(base_url + endpoint, timeout=30)
+    started = time.time()
+    deadline = started + duration
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, [(base_url, endpoints, deadline)] * clients)
+    elapsed = max(time.time() - started, duration)
+
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+    return {
+        "requests": len(latencies),
+        "errors": sum(result['errors'] for result in results),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3)
+    }
+
+
+def main():
+    """Run the load test for every worker count and write the report"""
+    parser = argparse.ArgumentParser(description='Load test the production dashboard server')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_worker_counts(),
+                        help='Worker counts to test (default: 1, 2, 4, ... up to the core count)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker')
+    parser.add_argument('--clients', type=int, default=os.cpu_count() or 1, help='Concurrent client processes')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per worker count')
+    parser.add_argument('--endpoints', nargs='+', default=DEFAULT_ENDPOINTS, help='Endpoints requested round-robin')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port the test server listens on')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Report output path')
+    args = parser.parse_args()
+
+    results = {}
+    for workers in args.workers:
+        print(f"Testing {workers} worker(s) x {args.threads} thread(s), {args.clients} clients, {args.duration:.0f}s...")
+        server = start_server(workers, args.threads, args.port)
+        try:
+            results[str(workers)] = run_load(args.port, args.endpoints, args.clients, args.duration)
+        finally:
+            stop_server(server)
+
+    baseline = results[str(args.workers[0])]['requests_per_second']
+    for workers, stats in results.items():
+        stats['speedup'] = round(stats['requests_per_second'] / baseline, 2) if baseline else None
+
+    report = {
+        "report_metadata": {
+            "title": "Glocal Policy Guardrail - Dashboard Load Test",
+            "generated_date": datetime.now().isoformat()
+        },
+        "environment": environment_info(),
+        "parameters": {
+            "threads": args.threads,
+            "clients": args.clients,
+            "duration_seconds": args.duration,
+            "endpoints": args.endpoints
+        },
+        "results": results
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("=" * 72)
+    print(" DASHBOARD LOAD TEST")
+    print("=" * 72)
+    print(f"{'Workers':>8} {'req/s':>10} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    print("-" * 72)
+    for workers, stats in results.items():
+        print(f"{workers:>8} {stats['requests_per_second']:>10.1f} {stats['speedup']:>7.2f}x "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}")
+    print("-" * 72)
+    print(f"Cores: {os.cpu_count()} | Report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Materialized dashboard aggregates
+Statistics the dashboard shows (daily update counts, per-country
+compliance rows, violation distribution, insights) are maintained in
+reports/aggregates.json at write time: each run is folded in as it is
+appended to the update log and the compliance export refreshes the
+compliance section, so read endpoints only look values up. Everything can be rebuilt from the raw
+update log and compliance report.
+
+Usage:
+    python src/aggregates.py rebuild
+    python src/aggregates.py show
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.file_cache import FileCache, report_cache
+from src.fork_safety import after_fork_in_child
+from src.update_log import UpdateLogStore, file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AGGREGATES_PATH = "reports/aggregates.json"
+DEFAULT_COMPLIANCE_REPORT = "reports/compliance_report.json"
+AGGREGATES_FORMAT = 1
+RECENT_RUNS = 30  # Runs behind /api/stats daily_updates
+
+ISSUE_CATEGORIES = ['Content Rating', 'Advertising', 'Privacy', 'Accessibility', 'Localization', 'Other']
+
+
+def categorize_issue(issue):
+    """Categorize an issue based on its content"""
+    issue_lower = str(issue).lower()
+    if any(word in issue_lower for word in ['rating', 'age', 'mature', 'violence', 'sexual']):
+        return 'Content Rating'
+    elif any(word in issue_lower for word in ['ad', 'advertising', 'commercial', 'sponsor']):
+        return 'Advertising'
+    elif any(word in issue_lower for word in ['privacy', 'data', 'personal', 'gdpr']):
+        return 'Privacy'
+    elif any(word in issue_lower for word in ['accessibility', 'subtitle', 'caption', 'audio']):
+        return 'Accessibility'
+    elif any(word in issue_lower for word in ['language', 'translation', 'localization', 'local']):
+        return 'Localization'
+    else:
+        return 'Other'
+
+
+def analytics_view(violations_by_country: Dict[str, int], distribution_by_category: Dict[str, int]) -> Dict:
+    """/api/analytics payload for per-country violation counts and their category distribution"""
+    total_violations = sum(violations_by_country.values())
+    total_countries = len(violations_by_country)
+    compliant_countries = sum(1 for v in violations_by_country.values() if v == 0)
+
+    insights = [
+        {
+            'type': 'coverage',
+            'title': 'Global Coverage',
+            'description': f'Monitoring {total_countries} countries with comprehensive regulatory tracking',
+            'value': f'{total_countries} Countries'
+        },
+        {
+            'type': 'compliance',
+            'title': 'Compliance Rate',
+            'description': f'{compliant_countries} out of {total_countries} regions are fully compliant',
+            'value': f'{int((compliant_countries/total_countries)*100)}%' if total_countries > 0 else '0%'
+        },
+        {
+            'type': 'monitoring',
+            'title': 'Active Monitoring',
+            'description': f'{compliant_countries} regions fully compliant',
+            'value': f'{compliant_countries} Regions'
+        },
+        {
+            'type': 'warning' if total_violations > 5 else 'success',
+            'title': 'Total Violations',
+            'description': f'{total_violations} violations detected across all monitored regions',
+            'value': f'{total_violations} Issues'
+        }
+    ]
+
+    return {
+        'violations_by_country': violations_by_country,
+        'distribution_by_category': distribution_by_category,
+        'insights': insights,
+        'total_violations': total_violations,
+        'total_countries': total_countries,
+        'compliant_countries': compliant_countries
+    }
+
+
+def empty_update_aggregates() -> Dict:
+    return {
+        'run_count': 0,
+        'total_updates': 0,
+        'daily_updates': {},
+        'updates_by_country': {},
+        'updates_by_source': {},
+        'recent_runs': [],
+        'recent_daily_updates': {},
+        'last_run': None
+    }
+
+
+def fold_run(aggregates: Dict, entry: Dict) -> None:
+    """Add one update log run to the update aggregates in place"""
+    timestamp = entry.get('timestamp', '')
+    count = entry.get('updates_count', 0)
+    aggregates['run_count'] += 1
+    aggregates['total_updates'] += count
+    date = timestamp[:10]
+    aggregates['daily_updates'][date] = aggregates['daily_updates'].get(date, 0) + count
+    for update in entry.get('updates', []):
+        for field, key in (('country', 'updates_by_country'), ('source', 'updates_by_source')):
+            value = update.get(field, 'Unknown')
+            aggregates[key][value] = aggregates[key].get(value, 0) + 1
+
+    run = {'timestamp': timestamp, 'updates_count': count}
+    aggregates['last_run'] = run
+    aggregates['recent_runs'] = (aggregates['recent_runs'] + [run])[-RECENT_RUNS:]
+    recent_daily = {}
+    for recent in aggregates['recent_runs']:
+        recent_date = recent['timestamp'][:10]
+        recent_daily[recent_date] = recent_daily.get(recent_date, 0) + recent['updates_count']
+    aggregates['recent_daily_updates'] = recent_daily
+
+
+def compliance_aggregates(report: Optional[Dict]) -> Dict:
+    """Dashboard compliance figures of a compliance report ({} without country details)"""
+    if not report:
+        return {}
+    summary = report.get('summary', {})
+    monitoring = {}
+    violations_by_country = {}
+    distribution_by_category = {category: 0 for category in ISSUE_CATEGORIES}
+    for country, data in report.get('country_details', {}).items():
+        try:
+            monitoring[country] = {
+                'status': data['compliance_status'],
+                'checks': data['total_checks'],
+                'violations': data['violations'],
+                'pass_rate': data['compliance_rate'],
+                'critical_issues': len(data.get('critical_issues', [])),
+                'warnings': len(data.get('warnings', [])),
+                'last_checked': data.get('last_checked', '')
+            }
+        except KeyError:
+            pass  # Incomplete country entry: no status row, still counted below
+        violations_by_country[country] = data.get('violations', 0)
+        for issue in data.get('critical_issues', []):
+            category = categorize_issue(issue)
+            distribution_by_category[category] = distribution_by_category.get(category, 0) + 1
+    return {
+        'total_checks': summary.get('total_checks', 0),
+        'compliance_rate': summary.get('compliance_rate', 0),
+        'monitoring': monitoring,
+        'compliant_regions': sum(1 for row in monitoring.values() if row['status'] == 'compliant'),
+        'analytics': analytics_view(violations_by_country, distribution_by_category) if violations_by_country else None
+    }
+
+
+def _file_signature(path: Path) -> Optional[str]:
+    """"mtime_ns:size" of a file (a string, so it compares equal after a JSON round trip)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class AggregateStore:
+    """reports/aggregates.json, updated by writers and read through the shared report cache"""
+
+    def __init__(self, path: Optional[str] = None, update_log: Optional[UpdateLogStore] = None,
+                 compliance_report: str = DEFAULT_COMPLIANCE_REPORT, cache: FileCache = report_cache):
+        """
+        Args:
+            path: Aggregates file (default: aggregates.json next to the update log directory)
+            update_log: Update log the run aggregates are derived from
+            compliance_report: Compliance report the compliance section is derived from
+            cache: Parsed-file cache shared with the dashboard
+        """
+        self.update_log = update_log or UpdateLogStore()
+        self.path = Path(path) if path else self.update_log.directory.parent / Path(DEFAULT_AGGREGATES_PATH).name
+        self.compliance_report = Path(compliance_report)
+        self.cache = cache
+        self._thread_lock = threading.Lock()
+        after_fork_in_child(self._after_fork)
+
+    def _after_fork(self):
+        self._thread_lock = threading.Lock()
+
+    @property
+    def lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".lock")
+
+    def get(self) -> Dict:
+        """
+        Current aggregates (read-only view)
+
+        Built from the raw files when missing; the compliance section is
+        refreshed if the report was rewritten without going through
+        record_compliance_report.
+        """
+        aggregates = self.cache.get(self.path)
+        if aggregates is None or aggregates.get('format') != AGGREGATES_FORMAT:
+            self.rebuild()
+        elif aggregates['compliance_source'] != _file_signature(self.compliance_report):
+            self.record_compliance_report()
+        else:
+            return aggregates
+        return self.cache.get(self.path)
+
+    def record_run(self, entry: Dict) -> None:
+        """
+        Append a run to the update log and fold it into the aggregates
+
+        Both happen under the aggregates lock, so a rebuild (which reads
+        the log under the same lock) counts each run exactly once. The log
+        is authoritative: an aggregates failure is logged, not raised, and
+        `aggregates.py rebuild` recovers.
+        """
+        with file_lock(self.lock_path, self._thread_lock):
+            self.update_log.append(entry)
+            try:
+                aggregates = self._load()
+                if aggregates is None:
+                    aggregates = self._build()  # Already includes the appended run
+                else:
+                    fold_run(aggregates['updates'], entry)
+                self._write(aggregates)
+            except Exception as e:
+                logger.warning(f"Could not update dashboard aggregates: {e}")
+
+    def record_compliance_report(self) -> None:
+        """Refresh the compliance section after the compliance report was written"""
+        with file_lock(self.lock_path, self._thread_lock):
+            aggregates = self._load() or self._build()
+            aggregates['compliance'] = compliance_aggregates(self.cache.get(self.compliance_report))
+            aggregates['compliance_source'] = _file_signature(self.compliance_report)
+            self._write(aggregates)
+
+    def rebuild(self) -> Dict:
+        """Recompute everything from the update log and the compliance report"""
+        with file_lock(self.lock_path, self._thread_lock):
+            aggregates = self._build()
+            self._write(aggregates)
+        return aggregates
+
+    def _build(self) -> Dict:
+        updates = empty_update_aggregates()
+        for entry in self.update_log.iter_entries():
+            fold_run(updates, entry)
+        return {
+            'format': AGGREGATES_FORMAT,
+            'updates': updates,
+            'compliance': compliance_aggregates(self.cache.get(self.compliance_report)),
+            'compliance_source': _file_signature(self.compliance_report)
+        }
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                aggregates = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return aggregates if aggregates.get('format') == AGGREGATES_FORMAT else None
+
+    def _write(self, aggregates: Dict) -> None:
+        aggregates['updated_at'] = datetime.now().isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(aggregates, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.cache.invalidate(self.path)  # A rewrite within one mtime tick may keep the same size
+
+
+def main(argv=None) -> int:
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Rebuild or inspect the materialized dashboard aggregates')
+    parser.add_argument('--path', default=None, help=f'Aggregates file (default: {DEFAULT_AGGREGATES_PATH})')
+    parser.add_argument('--update-log', default=None, help='Update log directory (default: reports/update_log)')
+    parser.add_argument('--compliance-report', default=DEFAULT_COMPLIANCE_REPORT, help='Compliance report path')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('rebuild', help='Recompute the aggregates from the raw update log and report')
+    subparsers.add_parser('show', help='Print the current aggregates')
+    args = parser.parse_args(argv)
+
+    update_log = UpdateLogStore(args.update_log) if args.update_log else None
+    store = AggregateStore(args.path, update_log, args.compliance_report)
+    if args.command == 'rebuild':
+        aggregates = store.rebuild()
+        print(f"Rebuilt {store.path}: {aggregates['updates']['run_count']} runs, "
+              f"{aggregates['updates']['total_updates']} updates")
+    else:
+        print(json.dumps(store.get(), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,7 @@ class RegulatoryUpdateScheduler:
     def __init__(self, config_path: str = "config/regulatory_sources.yaml"):
         self.config_path = config_path
         self.scheduler = BlockingScheduler()
+        # One monitor, and with it one pooled HTTP session, for every scheduled run
         self.monitor = PolicyUpdateMonitor(config_path)
         self.updater = PolicyAutoUpdater()
         self.notifier = NotificationManager()
@@ -45,15 +46,12 @@ class RegulatoryUpdateScheduler:
         logger.info("Running DAILY regulatory check...")
         logger.info("=" * 70)
         try:
-                        daily_sources = [s for s in self.monitor.sources if s.check_frequency == "daily"]
+            daily_sources = [s for s in self.monitor.sources if s.check_frequency == "daily"]
             if not daily_sources:
                 logger.info("No daily sources configured")
                 return
             logger.info(f"Checking {len(daily_sources)} daily sources...")
-                        original_sources = self.monitor.sources
-            self.monitor.sources = daily_sources
-            updates = self.monitor.check_for_updates()
-                        self.monitor.sources = original_sources
+            updates = self.monitor.check_for_updates(daily_sources)
             if updates:
                 self._process_updates(updates, "daily")
             else:
@@ -71,10 +69,7 @@ class RegulatoryUpdateScheduler:
                 logger.info("No weekly sources configured")
                 return
             logger.info(f"Checking {len(weekly_sources)} weekly sources...")
-            original_sources = self.monitor.sources
-            self.monitor.sources = weekly_sources
-            updates = self.monitor.check_for_updates()
-            self.monitor.sources = original_sources
+            updates = self.monitor.check_for_updates(weekly_sources)
             if updates:
                 self._process_updates(updates, "weekly")
             else:
@@ -92,10 +87,7 @@ class RegulatoryUpdateScheduler:
                 logger.info("No monthly sources configured")
                 return
             logger.info(f"Checking {len(monthly_sources)} monthly sources...")
-            original_sources = self.monitor.sources
-            self.monitor.sources = monthly_sources
-            updates = self.monitor.check_for_updates()
-            self.monitor.sources = original_sources
+            updates = self.monitor.check_for_updates(monthly_sources)
             if updates:
                 self._process_updates(updates, "monthly")
             else:
@@ -105,10 +97,10 @@ class RegulatoryUpdateScheduler:
     def _process_updates(self, updates: list, frequency: str):
         """ """
         logger.info(f"🔔 {len(updates)} update(s) detected from {frequency} check!")
-                report = self.monitor.generate_update_report(updates)
+        report = self.monitor.generate_update_report(updates)
         logger.info("\n" + report)
-                self.monitor.save_update_log(updates)
-                logger.info("\n🤖 Generating policy update suggestions...")
+        self.monitor.save_update_log(updates)
+        logger.info("\n🤖 Generating policy update suggestions...")
         suggestions = []
         for update in updates:
             suggestion = self.updater.suggest_policy_update(update)
@@ -116,7 +108,7 @@ class RegulatoryUpdateScheduler:
                 suggestions.append(suggestion)
                 logger.info(f"  - Suggestion generated for {update['country']}")
         if suggestions:
-                        suggestions_file = Path("reports/policy_suggestions.json")
+            suggestions_file = Path("reports/policy_suggestions.json")
             suggestions_file.parent.mkdir(parents=True, exist_ok=True)
             try:
                 with open(suggestions_file, 'r') as f:
@@ -202,6 +194,7 @@ class RegulatoryUpdateScheduler:
         except (KeyboardInterrupt, SystemExit):
             logger.info("\nShutting down scheduler...")
             self.scheduler.shutdown()
+            self.monitor.close()
             logger.info("Scheduler stopped.")
 def main():
     """ """
@@ -1,116 +1,1090 @@
 """
 Performance optimization with caching
+
+Backend selection (CACHE_BACKEND):
+    auto    Redis when reachable, otherwise the in-process MemoryCache (default)
+    redis   Redis, falling back to the MemoryCache only while it is down
+    memory  In-process MemoryCache only (CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+Redis is connected on first use through a connection pool, never at
+import. A circuit breaker (redis_breaker) sends calls to the MemoryCache
+after CACHE_BREAKER_FAILURES consecutive connection failures and probes
+Redis in the background every CACHE_BREAKER_PROBE_INTERVAL seconds until it
+answers again.
+
+With Redis, a small per-process L1 (CACHE_LOCAL_TTL, CACHE_LOCAL_MAX_ENTRIES)
+answers repeated reads without a round trip. Misses are recomputed by one
+caller per key while the others wait, and hot keys are refreshed shortly
+before they expire (CACHE_EARLY_REFRESH_BETA).
+
+Results can be grouped in namespaces (e.g. one per country) whose keys carry
+a generation number: invalidate_namespace() bumps the generation in O(1),
+and a CacheSweeper removes the orphaned entries in the background with
+SCAN instead of blocking Redis with KEYS.
+
+Keys are a blake2b hash of a canonical encoding of the call's arguments, so
+they do not depend on dict ordering. Values are stored with a serializer
+chosen per function (CACHE_SERIALIZER for the default): json, pickle (for
+objects such as ComplianceResult), and msgpack / orjson when installed.
 """
 import redis
 import json
+import fnmatch
 import hashlib
+import logging
+import math
 import os
+import pickle
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
 from functools import wraps
 from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Union
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
-# Redis connection (falls back to in-memory if Redis unavailable)
 try:
-    REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
-    REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
-    REDIS_DB = int(os.getenv('REDIS_DB', '0'))
-    
-    redis_client = redis.Redis(
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.fork_safety import after_fork_in_child
+try:
+    from src.monitoring import track_cache_breaker
+except ImportError:  # prometheus_client not installed: the breaker still works
+    track_cache_breaker = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ('auto', 'redis', 'memory')
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'auto').lower()
+DEFAULT_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+DEFAULT_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+DEFAULT_LOCAL_TTL = float(os.getenv('CACHE_LOCAL_TTL', '5'))            # Seconds; 0 disables the L1
+DEFAULT_LOCAL_MAX_ENTRIES = int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', '1000'))
+DEFAULT_EARLY_REFRESH_BETA = float(os.getenv('CACHE_EARLY_REFRESH_BETA', '1.0'))  # 0 disables
+RECOMPUTE_LOCK_TIMEOUT = float(os.getenv('CACHE_LOCK_TIMEOUT', '10'))  # Seconds one process may hold a recompute
+LOCK_POLL_INTERVAL = 0.05
+GENERATION_PREFIX = "gen:"   # Redis counters of the namespace generations
+SWEEP_BATCH = 500            # Keys per SCAN step and per UNLINK
+DEFAULT_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'json')  # For values shared through Redis
+LOCAL_SERIALIZER = 'pickle'  # In-process only: keeps types (tuple, datetime, ...) and gives callers copies
+BREAKER_FAILURES = int(os.getenv('CACHE_BREAKER_FAILURES', '3'))               # Consecutive failures that trip
+BREAKER_PROBE_INTERVAL = float(os.getenv('CACHE_BREAKER_PROBE_INTERVAL', '5'))  # Seconds between recovery probes
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ValueError(f"CACHE_BACKEND must be one of {CACHE_BACKENDS}, got {CACHE_BACKEND!r}")
+
+
+def _entry_size(key: str, value: Any) -> int:
+    """Approximate bytes held by an entry (payloads are serialized strings or bytes)"""
+    if isinstance(value, (str, bytes)):
+        return len(key) + len(value)
+    return len(key) + sys.getsizeof(value)
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process cache with wall-clock TTL and LRU eviction
+
+    Bounded by entry count and by the approximate size of the stored
+    payloads. Statistics are kept per namespace, the part of the key before
+    the first ':' (the decorated function's name for @cache keys).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum approximate size of keys plus payloads
+            clock: Time source in seconds (monotonic, so wall-clock jumps do not expire entries)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value stored under key, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                self._remove(key, 'expirations')
+                entry = None
+            if entry is None:
+                self._count(key, 'misses')
+                return None
+            self._entries.move_to_end(key)
+            self._count(key, 'hits')
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float) -> bool:
+        """Store value for ttl seconds; False when it alone exceeds max_bytes"""
+        size = _entry_size(key, value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, self.clock() + ttl, size)
+            self._bytes += size
+            self._count(key, 'sets')
+            now = self.clock()
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest, (_, expires_at, _) = next(iter(self._entries.items()))
+                self._remove(oldest, 'expirations' if expires_at <= now else 'evictions')
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove one entry; True if it existed"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_where(self, predicate: Callable[[str], bool]) -> int:
+        """Remove the entries whose key satisfies predicate; returns the number removed"""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                self._remove(key)
+            return len(doomed)
+
+    def delete_matching(self, pattern: str) -> int:
+        """Remove the entries whose key matches a glob pattern ('*', '?', '[...]' as in Redis)"""
+        if pattern == '*':
+            with self._lock:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return removed
+        return self.delete_where(lambda key: fnmatch.fnmatchcase(key, pattern))
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns the number removed"""
+        with self._lock:
+            now = self.clock()
+            expired = [key for key, entry in self._entries.items() if entry[1] <= now]
+            for key in expired:
+                self._remove(key, 'expirations')
+            return len(expired)
+
+    def clear(self) -> None:
+        """Drop all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Size, limits and per-namespace hit/miss/set/eviction/expiration counts"""
+        with self._lock:
+            namespaces = {name: dict(counts) for name, counts in self._stats.items()}
+            hits = sum(counts['hits'] for counts in namespaces.values())
+            misses = sum(counts['misses'] for counts in namespaces.values())
+            for counts in namespaces.values():
+                lookups = counts['hits'] + counts['misses']
+                counts['hit_rate'] = round(counts['hits'] / lookups, 4) if lookups else 0.0
+            return {
+                'keys': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': hits,
+                'misses': misses,
+                'evictions': sum(counts['evictions'] for counts in namespaces.values()),
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'functions': namespaces
+            }
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        if reason:
+            self._count(key, reason)
+
+    def _count(self, key: str, event: str) -> None:
+        namespace = key.split(':', 1)[0]
+        counts = self._stats.get(namespace)
+        if counts is None:
+            counts = self._stats[namespace] = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+        counts[event] += 1
+
+
+class CircuitBreaker:
+    """
+    Stops sending calls to Redis while it is unreachable
+
+    Closed: calls go to Redis and connection errors are counted. After
+    `threshold` consecutive failures the breaker opens: callers use the local
+    backend without a round trip, and a background thread probes Redis every
+    `probe_interval` seconds until it answers, then closes the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    FAILURES = (redis.ConnectionError, redis.TimeoutError)
+
+    def __init__(self, probe: Callable[[], Any], threshold: int = BREAKER_FAILURES,
+                 probe_interval: float = BREAKER_PROBE_INTERVAL, initial_threshold: Optional[int] = None):
+        """
+        Args:
+            probe: Call that raises while Redis is down (e.g. a PING)
+            threshold: Consecutive connection failures that open the breaker
+            probe_interval: Seconds between recovery probes while open
+            initial_threshold: Threshold until Redis has answered once (default: threshold)
+        """
+        if threshold < 1:
+            raise ValueError("threshold must be at least 1")
+        self.probe = probe
+        self.threshold = threshold
+        self.initial_threshold = threshold if initial_threshold is None else initial_threshold
+        self.probe_interval = probe_interval
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.connected_once = False
+        self._listeners: List[Callable[[bool], None]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        after_fork_in_child(self._after_fork)
+
+    def add_listener(self, listener: Callable[[bool], None]) -> None:
+        """Call listener(is_open) on every state change (from the probe thread when closing)"""
+        self._listeners.append(listener)
+
+    def allow(self) -> bool:
+        """True while calls should go to Redis"""
+        if self.state == self.CLOSED:
+            return True
+        if self._thread is None:  # Not probing in this process yet (e.g. a forked worker)
+            self._start_probe()
+        return False
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """fn(*args, **kwargs), counting connection errors (which are re-raised)"""
+        try:
+            result = fn(*args, **kwargs)
+        except self.FAILURES:
+            self.record_failure()
+            raise
+        if self.failures or not self.connected_once:
+            self.record_success()
+        return result
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.connected_once = True
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            threshold = self.threshold if self.connected_once else self.initial_threshold
+            if self.state != self.CLOSED or self.failures < threshold:
+                return
+            self.state = self.OPEN
+            self.trips += 1
+        logger.warning(f"Redis unreachable after {self.failures} failure(s); using the local cache "
+                       f"and probing every {self.probe_interval:g}s")
+        self._notify(True)
+        self._start_probe()
+
+    def probe_once(self) -> bool:
+        """Probe Redis now; closes the breaker and returns True when it answers"""
+        try:
+            self.probe()
+        except Exception:
+            return False
+        with self._lock:
+            was_open = self.state == self.OPEN
+            self.state = self.CLOSED
+            self.failures = 0
+            self.connected_once = True
+        if was_open:
+            logger.info("Redis reachable again; cache calls go to Redis")
+            self._notify(False)
+        return True
+
+    def reset(self) -> None:
+        """Close the breaker and forget failures (e.g. after switching clients)"""
+        with self._lock:
+            was_open = self.state == self.OPEN
+            self.state = self.CLOSED
+            self.failures = 0
+            self.connected_once = False
+        self._wake.set()  # Let a sleeping probe thread exit
+        if was_open:
+            self._notify(False)
+
+    def stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'trips': self.trips,
+            'threshold': self.threshold,
+            'probe_interval': self.probe_interval
+        }
+
+    def _notify(self, is_open: bool) -> None:
+        for listener in self._listeners:
+            try:
+                listener(is_open)
+            except Exception as e:
+                logger.warning(f"Circuit breaker listener failed: {e}")
+
+    def _start_probe(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._probe_loop, name="redis-breaker-probe", daemon=True)
+            self._thread.start()
+
+    def _probe_loop(self) -> None:
+        while self.state == self.OPEN:
+            self._wake.wait(self.probe_interval)
+            self._wake.clear()
+            if self.state != self.OPEN or self.probe_once():
+                return
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None  # The parent's probe thread does not exist here; allow() restarts it
+
+
+# Redis connection: nothing is connected at import; the pool connects on first use.
+# REDIS_AVAILABLE means the Redis tier is selected, redis_breaker whether it is used right now.
+REDIS_AVAILABLE = CACHE_BACKEND != 'memory'
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
+REDIS_DB = int(os.getenv('REDIS_DB', '0'))
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '2'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '2'))
+if REDIS_AVAILABLE:
+    redis_pool = redis.ConnectionPool(  # Re-created by redis-py in forked workers
         host=REDIS_HOST,
         port=REDIS_PORT,
         db=REDIS_DB,
-        decode_responses=True,
-        socket_connect_timeout=2
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT
     )
-    redis_client.ping()  # Test connection
-    REDIS_AVAILABLE = True
-except:
-    REDIS_AVAILABLE = False
-    # Fallback to in-memory cache
-    _memory_cache = {}
+    redis_client = redis.Redis(connection_pool=redis_pool)  # Binary replies: serialized payloads are not UTF-8
+
+# In 'auto' a Redis that never answered trips the breaker on the first failure,
+# so a deployment without Redis pays one connect timeout, not one per call
+redis_breaker = CircuitBreaker(lambda: redis_client.ping(),
+                               initial_threshold=1 if CACHE_BACKEND == 'auto' else None)
+memory_cache = MemoryCache()
+# Per-process L1 in front of Redis (two-tier mode); None disables it
+local_cache: Optional[MemoryCache] = MemoryCache(DEFAULT_LOCAL_MAX_ENTRIES) if DEFAULT_LOCAL_TTL > 0 else None
+local_ttl = DEFAULT_LOCAL_TTL
+
+
+def configure_cache(backend: str = 'memory', max_entries: int = DEFAULT_MAX_ENTRIES,
+                    max_bytes: int = DEFAULT_MAX_BYTES, client=None,
+                    local_ttl_seconds: float = DEFAULT_LOCAL_TTL,
+                    local_max_entries: int = DEFAULT_LOCAL_MAX_ENTRIES) -> None:
+    """
+    Select the cache backend at runtime
+
+    Args:
+        backend: 'memory', or 'redis' (two-tier: local L1 in front of Redis)
+        max_entries: Size of the in-process cache ('memory')
+        max_bytes: Byte bound of the in-process cache ('memory')
+        client: Redis client to use instead of the one configured from REDIS_HOST ('redis');
+            binary serializers (pickle, msgpack) need one created with decode_responses=False
+        local_ttl_seconds: Lifetime of L1 copies, bounding how stale another process's
+            write can be seen; 0 disables the L1 ('redis')
+        local_max_entries: Size of the L1 ('redis')
+    """
+    global REDIS_AVAILABLE, memory_cache, redis_client, local_cache, local_ttl
+    if backend not in ('redis', 'memory'):
+        raise ValueError(f"backend must be 'redis' or 'memory', got {backend!r}")
+    if backend == 'redis':
+        if client is not None:
+            redis_client = client
+        elif 'redis_client' not in globals():
+            raise ValueError("Redis backend is not configured (CACHE_BACKEND=memory)")
+        local_ttl = local_ttl_seconds
+        local_cache = MemoryCache(local_max_entries) if local_ttl_seconds > 0 else None
+        REDIS_AVAILABLE = True
+        redis_breaker.reset()
+    else:
+        REDIS_AVAILABLE = False
+        memory_cache = MemoryCache(max_entries, max_bytes)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._calls: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.early_refreshes = 0
+
+    def record_early_refresh(self) -> None:
+        """Count a caller that recomputes a still-valid entry ahead of its expiry"""
+        with self._lock:
+            self.early_refreshes += 1
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]):
+        """
+        Run fn once for all concurrent callers of key
+
+        Returns (value, leader): the leader ran fn, the others waited for its
+        value. An exception raised by fn is raised to every caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'value': None, 'error': None}
+            else:
+                self.coalesced += 1
+        if not leader:
+            call['done'].wait()
+        else:
+            try:
+                call['value'] = fn()
+            except BaseException as e:
+                call['error'] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call['done'].set()
+        if call['error'] is not None:
+            raise call['error']
+        return call['value'], leader
+
+
+_flights = SingleFlight()
+
+
+class Serializer(NamedTuple):
+    """How cached values are turned into bytes and back"""
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+SERIALIZERS: Dict[str, Serializer] = {}
+
+
+def register_serializer(name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]) -> Serializer:
+    """Make a serializer selectable with @cache(serializer=name)"""
+    if not name or not name.isidentifier():
+        raise ValueError(f"Serializer name must be an identifier, got {name!r}")
+    serializer = SERIALIZERS[name] = Serializer(name, dumps, loads)
+    return serializer
+
+
+def get_serializer(name: str) -> Serializer:
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache serializer {name!r}; available: {sorted(SERIALIZERS)}") from None
+
+
+register_serializer('json', lambda value: json.dumps(value, ensure_ascii=False).encode('utf-8'), json.loads)
+# Any picklable value, e.g. ComplianceResult; only for a Redis that untrusted clients cannot write to
+register_serializer('pickle', lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL), pickle.loads)
+if MSGPACK_AVAILABLE:
+    register_serializer('msgpack', lambda value: msgpack.packb(value, use_bin_type=True),
+                        lambda data: msgpack.unpackb(data, raw=False))
+if ORJSON_AVAILABLE:
+    register_serializer('orjson', orjson.dumps, orjson.loads)
+
+
+def _pack(value, delta: float, ttl: float, serializer: str = 'json') -> bytes:
+    """
+    Stored form: a header with the serializer, the recompute time and the
+    absolute expiry (for early refresh), followed by the serialized value
+    """
+    codec = get_serializer(serializer)
+    return b"%s\n%.6f\n%.3f\n" % (codec.name.encode(), delta, time.time() + ttl) + codec.dumps(value)
+
+
+def _unpack(payload) -> Optional[dict]:
+    """{'v': value, 'd': recompute time, 'x': expiry} of a payload; None if unreadable here"""
+    if isinstance(payload, str):  # Read through a client with decode_responses=True
+        payload = payload.encode('utf-8')
+    parts = payload.split(b"\n", 3)
+    if len(parts) != 4:
+        return None  # Written by an older version of this module
+    codec = SERIALIZERS.get(parts[0].decode('ascii', 'replace'))
+    if codec is None:
+        return None  # Serializer not installed in this process
+    try:
+        return {'v': codec.loads(parts[3]), 'd': float(parts[1]), 'x': float(parts[2])}
+    except Exception:
+        return None
+
+
+def _should_refresh_early(entry: dict, beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch)
+
+    Recomputes with rising probability as expiry approaches, earlier for
+    values that take longer to compute, so one caller refreshes a hot key
+    before it expires instead of all callers recomputing after.
+    """
+    if beta <= 0:
+        return False
+    return time.time() - entry['d'] * beta * math.log(1.0 - random.random()) >= entry['x']
+
+
+def _redis_ready() -> bool:
+    """True when this call should use Redis: the tier is selected and the breaker is closed"""
+    return REDIS_AVAILABLE and redis_breaker.allow()
+
+
+def _redis(command: str, *args, **kwargs):
+    """redis_client.<command>(*args, **kwargs) through the circuit breaker"""
+    return redis_breaker.call(getattr(redis_client, command), *args, **kwargs)
+
+
+def _load(key: str) -> Optional[dict]:
+    """Cached entry of key: L1, then Redis (copied into L1), or the memory backend"""
+    if not _redis_ready():
+        payload = memory_cache.get(key)
+        return _unpack(payload) if payload is not None else None
+    if local_cache is not None:
+        payload = local_cache.get(key)
+        if payload is not None:
+            return _unpack(payload)
+    try:
+        payload = _redis('get', key)
+    except Exception:
+        return None
+    if not payload:
+        return None
+    entry = _unpack(payload)
+    if entry is not None and local_cache is not None:
+        remaining = entry['x'] - time.time()
+        if remaining > 0:
+            local_cache.set(key, payload, min(local_ttl, remaining))
+    return entry
+
+
+def _store(key: str, payload: bytes, ttl: float) -> None:
+    if not _redis_ready():
+        memory_cache.set(key, payload, ttl)
+        return
+    try:
+        _redis('set', key, payload, ex=max(1, int(math.ceil(ttl))))
+    except Exception:
+        if not redis_breaker.allow():  # This failure tripped the breaker
+            memory_cache.set(key, payload, ttl)
+        return
+    if local_cache is not None:
+        local_cache.set(key, payload, min(local_ttl, ttl))
+
+
+def _text(value) -> Optional[str]:
+    """Redis reply as str, whether or not the client decodes responses"""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _acquire_recompute_lock(key: str) -> Optional[str]:
+    """
+    Token of the cross-process recompute lock of key (Redis only), None if
+    another process holds it; '' when there is nothing to lock
+    """
+    if not _redis_ready():
+        return ''
+    token = os.urandom(8).hex()
+    try:
+        acquired = _redis('set', f"lock:{key}", token, nx=True, px=int(RECOMPUTE_LOCK_TIMEOUT * 1000))
+    except Exception:
+        return ''
+    return token if acquired else None
+
+
+def _release_recompute_lock(key: str, token: str) -> None:
+    if not token:
+        return
+    try:
+        if _text(_redis('get', f"lock:{key}")) == token:  # Not one that expired and was re-acquired
+            _redis('delete', f"lock:{key}")
+    except Exception:
+        pass
+
+
+def _wait_for_other_process(key: str) -> Optional[dict]:
+    """Poll Redis while another process recomputes key; None if it gave up or timed out"""
+    deadline = time.monotonic() + RECOMPUTE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            payload = _redis('get', key)
+            if payload:
+                entry = _unpack(payload)
+                if entry is not None:
+                    return entry
+            if not _redis('exists', f"lock:{key}"):
+                return None
+        except Exception:
+            return None
+    return None
+
+
+def _recompute(key: str, f, args, kwargs, ttl: float, stale: Optional[dict], serializer: Optional[str] = None):
+    """
+    Compute and store f(*args, **kwargs) as (value, payload), at most once
+    across processes sharing Redis: without the lock, serve `stale` or wait
+    for the holder's value
+
+    A result the serializer cannot encode is returned uncached (payload None).
+    """
+    token = _acquire_recompute_lock(key)
+    if token is None:
+        if stale is not None:
+            return stale['v'], None
+        entry = _wait_for_other_process(key)
+        if entry is not None:
+            return entry['v'], None
+        token = ''
+    try:
+        start = time.perf_counter()
+        result = f(*args, **kwargs)
+        delta = time.perf_counter() - start
+        if serializer is None:
+            serializer = DEFAULT_SERIALIZER if _redis_ready() else LOCAL_SERIALIZER
+        try:
+            payload = _pack(result, delta, ttl, serializer)
+        except Exception as e:
+            logger.warning(f"Not caching {key}: result cannot be serialized with {serializer!r}: {e}")
+            return result, None
+        _store(key, payload, ttl)
+        return result, payload
+    finally:
+        _release_recompute_lock(key, token)
+
+
+_generations: Dict[str, tuple] = {}   # namespace -> (generation, monotonic time read)
+_generations_lock = threading.Lock()
+# ('namespace', name) / ('pattern', glob) invalidated while the breaker was open
+_missed_invalidations: Set[tuple] = set()
+
+
+def current_generation(namespace: str) -> int:
+    """
+    Generation of a namespace
+
+    With Redis the shared counter is re-read at most every local_ttl
+    seconds, the same staleness bound as the L1; in memory mode the
+    in-process counter is authoritative.
+    """
+    cached = _generations.get(namespace)
+    if not _redis_ready():
+        return cached[0] if cached else 0
+    now = time.monotonic()
+    if cached is not None and now - cached[1] < local_ttl:
+        return cached[0]
+    try:
+        generation = int(_redis('get', GENERATION_PREFIX + namespace) or 0)
+    except Exception:
+        return cached[0] if cached else 0
+    _generations[namespace] = (generation, now)
+    return generation
+
+
+def invalidate_namespace(namespace: str) -> int:
+    """
+    Invalidate every cached result of a namespace in O(1) by bumping its
+    generation; returns the new generation
+
+    Entries of older generations are never read again and are removed by
+    CacheSweeper (or expire). Other processes see the bump within local_ttl.
+    A bump made while Redis is down is applied there when it recovers.
+    """
+    with _generations_lock:
+        generation = None
+        if _redis_ready():
+            try:
+                generation = int(_redis('incr', GENERATION_PREFIX + namespace))
+            except Exception:
+                logger.warning(f"Could not bump cache generation of {namespace!r} in Redis")
+        if generation is None:
+            cached = _generations.get(namespace)
+            generation = (cached[0] if cached else 0) + 1
+            if REDIS_AVAILABLE:
+                _missed_invalidations.add(('namespace', namespace))
+        _generations[namespace] = (generation, time.monotonic())
+    return generation
+
+
+def country_namespace(country: str) -> str:
+    """Namespace of results that depend on one country's policy"""
+    return f"country:{country}"
+
+
+def invalidate_on_policy_reload(guardrail) -> None:
+    """
+    Invalidate the country namespaces a ComplianceGuardrail reload changes
+
+    Only countries with a rule-level change (src.policy_diff) lose their
+    cached results.
+    """
+    from src.policy_diff import diff_policies
+
+    def on_reload(old_rules, new_rules):
+        for country in diff_policies(old_rules, new_rules).countries:
+            invalidate_namespace(country_namespace(country))
+
+    guardrail.add_reload_listener(on_reload)
+
+
+def _parse_namespaced_key(key: str):
+    """(namespace, generation) of a key built as '<function>:<namespace>@<generation>:<hash>', else None"""
+    head, _, _ = key.rpartition(':')
+    _, _, scoped = head.partition(':')
+    namespace, at, generation = scoped.rpartition('@')
+    if not at or not generation.isdigit():
+        return None
+    return namespace, int(generation)
+
+
+def _is_stale(key: str, generations: Dict[str, int]) -> bool:
+    """True for keys of a superseded namespace generation"""
+    parsed = _parse_namespaced_key(key)
+    if parsed is None:
+        return False
+    namespace, generation = parsed
+    if namespace not in generations:
+        generations[namespace] = _read_generation_uncached(namespace)
+    return generation < generations[namespace]
+
+
+def _read_generation_uncached(namespace: str) -> int:
+    if _redis_ready():
+        try:
+            return int(_redis('get', GENERATION_PREFIX + namespace) or 0)
+        except Exception:
+            return 0
+    return current_generation(namespace)
+
+
+def _scan_delete(match: str, predicate: Callable[[str], bool] = lambda key: True, pause: float = 0.0) -> int:
+    """
+    Delete Redis keys matching a glob with SCAN and batched UNLINK, so the
+    server is never blocked for the whole keyspace; generation counters are kept
+    """
+    removed = 0
+    batch = []
+    for key in redis_client.scan_iter(match=match, count=SWEEP_BATCH):
+        key = _text(key)
+        if key.startswith(GENERATION_PREFIX) or not predicate(key):
+            continue
+        batch.append(key)
+        if len(batch) >= SWEEP_BATCH:
+            removed += redis_client.unlink(*batch)
+            batch = []
+            if pause:
+                time.sleep(pause)
+    if batch:
+        removed += redis_client.unlink(*batch)
+    return removed
+
+
+def _on_breaker_change(is_open: bool) -> None:
+    """
+    Export the breaker state; on tripping, start the fallback empty (it may
+    hold results of an earlier outage that missed invalidations); on
+    recovery, apply the invalidations Redis missed and drop local copies
+    that predate the outage
+    """
+    if track_cache_breaker is not None:
+        track_cache_breaker(is_open)
+    if is_open:
+        memory_cache.clear()
+        return
+    with _generations_lock:
+        missed = sorted(_missed_invalidations)
+        _missed_invalidations.clear()
+        _generations.clear()
+    for kind, name in missed:
+        try:
+            if kind == 'namespace':
+                _redis('incr', GENERATION_PREFIX + name)
+            else:
+                _scan_delete(name)
+        except Exception as e:
+            logger.warning(f"Could not apply missed cache invalidation of {name!r}: {e}")
+    if local_cache is not None:
+        local_cache.clear()
+
+
+redis_breaker.add_listener(_on_breaker_change)
+
+
+class CacheSweeper:
+    """
+    Background thread removing entries of superseded namespace generations
+    (and expired in-process entries) in small SCAN batches
+    """
+
+    def __init__(self, interval: float = 60.0, pause: float = 0.01):
+        """
+        Args:
+            interval: Seconds between sweeps
+            pause: Seconds to yield between UNLINK batches
+        """
+        self.interval = interval
+        self.pause = pause
+        self.removed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep_once(self) -> int:
+        """One full pass; returns the number of entries removed"""
+        generations: Dict[str, int] = {}
+
+        def stale(key: str) -> bool:
+            return _is_stale(key, generations)
+
+        removed = 0
+        if _redis_ready():
+            try:
+                removed += redis_breaker.call(_scan_delete, '*@*', stale, self.pause)
+            except Exception as e:
+                logger.warning(f"Cache sweep failed: {e}")
+            if local_cache is not None:
+                removed += local_cache.delete_where(stale) + local_cache.purge_expired()
+        else:
+            removed += memory_cache.delete_where(stale) + memory_cache.purge_expired()
+        self.removed += removed
+        return removed
+
+    def start(self) -> "CacheSweeper":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sweep_once()
+
+
+def _key_default(value):
+    """JSON form of argument types the encoders do not handle themselves"""
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted(_encode_key_part(item).decode('utf-8', 'surrogatepass') for item in value)}
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if callable(getattr(value, 'to_dict', None)):
+        return value.to_dict()
+    if is_dataclass(value):
+        return asdict(value)
+    return repr(value)
+
+
+def _encode_key_json(value) -> bytes:
+    try:
+        text = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=_key_default)
+    except TypeError:  # Dict keys of mixed types cannot be sorted
+        text = json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_key_default)
+    return text.encode('utf-8', 'surrogatepass')
+
+
+if ORJSON_AVAILABLE:
+    _KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def _encode_key_part(value) -> bytes:
+        try:
+            return orjson.dumps(value, default=_key_default, option=_KEY_OPTIONS)
+        except orjson.JSONEncodeError:  # e.g. integers beyond 64 bits
+            return _encode_key_json(value)
+else:
+    _encode_key_part = _encode_key_json
 
 
 def cache_key(*args, **kwargs):
-    """Generate cache key from arguments"""
-    key_data = str(args) + str(sorted(kwargs.items()))
-    return hashlib.md5(key_data.encode()).hexdigest()
+    """
+    Generate cache key from arguments
+
+    blake2b of the arguments as JSON with sorted keys, so the key does not
+    depend on dict or set ordering and is the same in every process (unlike
+    hash()). Arguments that are equal as JSON, such as a tuple and a list,
+    share a key.
+    """
+    return hashlib.blake2b(_encode_key_part([args, kwargs]), digest_size=16).hexdigest()
 
 
-def cache(ttl=300):
+def cache(ttl=300, beta=None, namespace: Union[str, Callable[..., str], None] = None,
+          serializer: Optional[str] = None):
     """
     Decorator to cache function results
     ttl: time to live in seconds (default 5 minutes)
+    beta: early refresh aggressiveness (default CACHE_EARLY_REFRESH_BETA; 0 disables)
+    namespace: name, or function of the call's arguments returning one, whose
+        generation the key carries, e.g. lambda country, *a, **kw: country_namespace(country);
+        invalidate_namespace() then drops all of its results at once
+    serializer: name of a registered serializer for the results, e.g. 'pickle'
+        for functions returning ComplianceResult through Redis (default:
+        CACHE_SERIALIZER with Redis, pickle in memory so types are kept);
+        results it cannot encode are logged and returned uncached
+
+    Concurrent misses of one key run the function once per process (and once
+    across processes with Redis); the others wait for its result. Every
+    caller, the one that ran it included, gets its own decoded copy, so they
+    all see the types a later cache hit would return.
     """
+    refresh_beta = DEFAULT_EARLY_REFRESH_BETA if beta is None else beta
+    codec = get_serializer(serializer).name if serializer is not None else None
+    get_serializer(DEFAULT_SERIALIZER)  # Fail at decoration time on a bad CACHE_SERIALIZER
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # Generate cache key
-            key = f"{f.__name__}:{cache_key(*args, **kwargs)}"
-            
-            # Try to get from cache
-            if REDIS_AVAILABLE:
-                try:
-                    cached = redis_client.get(key)
-                    if cached:
-                        return json.loads(cached)
-                except:
-                    pass
-            else:
-                if key in _memory_cache:
-                    cached_data, expiry = _memory_cache[key]
-                    if expiry > 0:  # Not expired
-                        _memory_cache[key] = (cached_data, expiry - 1)
-                        return cached_data
-            
-            # Execute function
-            result = f(*args, **kwargs)
-            
-            # Store in cache
-            if REDIS_AVAILABLE:
-                try:
-                    redis_client.setex(key, ttl, json.dumps(result))
-                except:
-                    pass
+            if namespace is None:
+                key = f"{f.__name__}:{cache_key(*args, **kwargs)}"
             else:
-                _memory_cache[key] = (result, ttl)
-            
-            return result
-        
+                name = namespace(*args, **kwargs) if callable(namespace) else namespace
+                key = f"{f.__name__}:{name}@{current_generation(name)}:{cache_key(*args, **kwargs)}"
+
+            # Try to get from cache
+            entry = _load(key)
+            if entry is not None:
+                if not _should_refresh_early(entry, refresh_beta) or _flights.in_flight(key):
+                    return entry['v']
+                _flights.record_early_refresh()
+
+            # Execute function (one caller per key; the rest share its result)
+            (result, payload), leader = _flights.do(
+                key, lambda: _recompute(key, f, args, kwargs, ttl, entry, codec))
+            if payload is None:  # Could not be serialized: every caller shares the one result
+                return result
+            # Every caller, the leader included, gets its own decoded copy, so all of them
+            # (and later cache hits) see the same types, e.g. lists for tuples under json
+            return _unpack(payload)['v']
+
         return decorated_function
     return decorator
 
 
+def shared_cache_enabled() -> bool:
+    """True when values can be shared with other processes (the Redis tier is configured)"""
+    return REDIS_AVAILABLE
+
+
+def get_shared(key: str) -> Optional[bytes]:
+    """
+    Raw value of key in Redis, read through the circuit breaker
+
+    None when the key is missing, the Redis tier is not configured or its
+    breaker is open, or the read fails; callers keep their own local copies.
+    """
+    if not _redis_ready():
+        return None
+    try:
+        return _redis('get', key)
+    except Exception:
+        return None
+
+
+def set_shared(key: str, value: Union[str, bytes], ttl: float) -> bool:
+    """Store a raw value in Redis for ttl seconds through the circuit breaker; False if it was not stored"""
+    if not _redis_ready():
+        return False
+    try:
+        _redis('set', key, value, ex=max(1, int(math.ceil(ttl))))
+    except Exception:
+        return False
+    return True
+
+
+def delete_shared(key: str) -> bool:
+    """Remove key from Redis through the circuit breaker; False if it was not removed"""
+    if not _redis_ready():
+        return False
+    try:
+        return bool(_redis('delete', key))
+    except Exception:
+        return False
+
+
 def invalidate_cache(pattern='*'):
-    """Invalidate cache entries matching pattern"""
-    if REDIS_AVAILABLE:
+    """
+    Invalidate cache entries matching a glob pattern; returns the number removed
+
+    Redis keys are found with incremental SCAN (never KEYS). L1 copies in
+    other processes expire within local_ttl; to drop a group of results
+    everywhere at once, use a namespace and invalidate_namespace(). A pattern
+    invalidated while Redis is down is applied there when it recovers.
+    """
+    if _redis_ready():
+        removed = 0
         try:
-            keys = redis_client.keys(pattern)
-            if keys:
-                redis_client.delete(*keys)
-        except:
-            pass
-    else:
-        _memory_cache.clear()
+            removed = redis_breaker.call(_scan_delete, pattern)
+        except Exception as e:
+            logger.warning(f"Cache invalidation of {pattern!r} failed: {e}")
+            if not redis_breaker.allow():
+                _missed_invalidations.add(('pattern', pattern))
+        if local_cache is not None:
+            local_cache.delete_matching(pattern)
+        return removed
+    if REDIS_AVAILABLE:
+        _missed_invalidations.add(('pattern', pattern))
+    return memory_cache.delete_matching(pattern)
 
 
 def get_cache_stats():
     """Get cache statistics"""
+    coalescing = {'coalesced': _flights.coalesced, 'early_refreshes': _flights.early_refreshes}
     if REDIS_AVAILABLE:
+        coalescing['breaker'] = redis_breaker.stats()
+    if _redis_ready():
+        stats = {'type': 'redis', 'local': local_cache.stats() if local_cache is not None else None, **coalescing}
         try:
-            info = redis_client.info('stats')
-            return {
-                'type': 'redis',
+            info = _redis('info', 'stats')
+            stats.update({
                 'hits': info.get('keyspace_hits', 0),
                 'misses': info.get('keyspace_misses', 0),
-                'keys': redis_client.dbsize()
-            }
-        except:
-            return {'type': 'redis', 'status': 'unavailable'}
+                'keys': _redis('dbsize')
+            })
+        except Exception:
+            stats['status'] = 'unavailable'
+        return stats
     else:
-        return {
-            'type': 'memory',
-            'keys': len(_memory_cache)
-        }
+        return {'type': 'memory', **memory_cache.stats(), **coalescing}
 
 
 # Async helper (for future async implementation)
@@ -6,12 +6,33 @@ Author: [Your Name]
 Purpose: EB1 Research - Policy-as-Code Framework for Global OTT Platforms
 """
 
-import yaml
-import re
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, time
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from enum import Enum
 
+# 스크립트 실행 시에도 src 패키지를 import 할 수 있도록 경로 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.policy_compiler import (
+    DEFAULT_SNAPSHOT_DIR, CompiledPolicy, KeywordMatcher, PolicyRuleSet, TimeWindow,
+    compile_policy_db, load_policy_rules
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 병렬 일괄 검사 설정: 이보다 작은 배치는 프로세스 풀 오버헤드가 더 크므로 순차 처리
+PARALLEL_MIN_BATCH = 5000
+DEFAULT_CHUNK_SIZE = 1000
+
+# 정책 파일 변경 감시 주기 (초)
+DEFAULT_WATCH_INTERVAL = 5.0
+
 
 class ViolationSeverity(Enum):
     """위반 심각도 레벨"""
@@ -23,10 +44,12 @@ class ViolationSeverity(Enum):
 
 class ComplianceResult:
     """컴플라이언스 검사 결과"""
-    def __init__(self, status: str, country: str, violations: List[Dict] = None):
+    def __init__(self, status: str, country: str, violations: List[Dict] = None,
+                 policy_version: Optional[str] = None):
         self.status = status  # PASS, WARNING, CRITICAL
         self.country = country
         self.violations = violations or []
+        self.policy_version = policy_version  # 검사에 사용된 정책 버전
         self.timestamp = datetime.now().isoformat()
     
     def add_violation(self, violation_type: str, message: str, severity: str, 
@@ -49,6 +72,7 @@ class ComplianceResult:
         return {
             "status": self.status,
             "country": self.country,
+            "policy_version": self.policy_version,
             "timestamp": self.timestamp,
             "violation_count": len(self.violations),
             "violations": self.violations
@@ -68,26 +92,211 @@ class ComplianceResult:
         return "\n".join(output)
 
 
+class ComplianceSummary:
+    """검사 결과 상태별 집계 (결과를 보관하지 않고 실시간으로 누적)"""
+    def __init__(self):
+        self.total = 0
+        self.passed = 0
+        self.warnings = 0
+        self.critical = 0
+    
+    def add(self, result: ComplianceResult):
+        """결과 하나를 집계에 반영"""
+        self.total += 1
+        if result.status == "PASS":
+            self.passed += 1
+        elif result.status == "WARNING":
+            self.warnings += 1
+        elif result.status == "CRITICAL":
+            self.critical += 1
+    
+    @classmethod
+    def from_results(cls, results: Iterable[ComplianceResult]) -> "ComplianceSummary":
+        """결과 목록으로부터 집계 생성"""
+        summary = cls()
+        for result in results:
+            summary.add(result)
+        return summary
+    
+    def to_dict(self) -> Dict:
+        """집계를 딕셔너리로 변환"""
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "warnings": self.warnings,
+            "critical": self.critical
+        }
+
+
 class ComplianceGuardrail:
     """정책 기반 컴플라이언스 가드레일 시스템"""
     
-    def __init__(self, policy_db_path: str = "config/policy_rules.yaml"):
+    # 금지 키워드 검사 대상 텍스트 필드
+    SEARCHABLE_FIELDS = ('title', 'description', 'tags', 'genre')
+    
+    def __init__(self, policy_db_path: str = "config/policy_rules.yaml",
+                 snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR):
         """
         Args:
             policy_db_path: 정책 YAML 파일 경로
+            snapshot_dir: 파싱된 정책 스냅샷 디렉토리 (None이면 스냅샷 미사용)
+        """
+        self.policy_db_path = policy_db_path
+        self.snapshot_dir = snapshot_dir
+        self._init_reload_state()
+        # YAML이 변경되지 않았다면 파싱된 스냅샷에서 바로 컴파일
+        self._source_stat = self._stat_policy_file()
+        self._set_rules(load_policy_rules(policy_db_path, snapshot_dir))
+    
+    @classmethod
+    def from_policy_db(cls, policy_db: Dict) -> "ComplianceGuardrail":
+        """이미 파싱된 정책 데이터베이스로 가드레일 생성 (파일 로드 없음)"""
+        return cls.from_rules(compile_policy_db(policy_db))
+    
+    @classmethod
+    def from_rules(cls, rules: PolicyRuleSet) -> "ComplianceGuardrail":
+        """컴파일된 정책 규칙으로 가드레일 생성"""
+        guardrail = cls.__new__(cls)
+        guardrail.policy_db_path = None
+        guardrail.snapshot_dir = None
+        guardrail._init_reload_state()
+        guardrail._source_stat = None
+        guardrail._set_rules(rules)
+        return guardrail
+    
+    def _init_reload_state(self):
+        """핫 리로드용 내부 상태 초기화"""
+        self._reload_lock = threading.Lock()
+        self._reload_listeners: List[Callable[[PolicyRuleSet, PolicyRuleSet], None]] = []
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+    
+    def _set_rules(self, rules: PolicyRuleSet):
+        """
+        컴파일된 정책 규칙 설정
+        
+        시간대 파싱, 키워드 매처 컴파일, 광고 타입 조회 테이블 구성은 모두 컴파일 시 한 번만 수행하며,
+        잘못된 정책은 요청 처리 중이 아니라 로드 시점에 ValueError로 보고된다.
+        규칙 집합, 원본 정책, 국가 목록을 하나의 튜플로 묶어 단일 참조 대입으로 교체하므로
+        검사 도중 리로드가 일어나도 읽는 쪽은 항상 한 버전의 일관된 상태만 보게 된다.
         """
-        self.policy_db = self._load_policy_db(policy_db_path)
-        self.supported_countries = list(self.policy_db.keys())
+        self._state = (rules, list(rules.raw.keys()))
+    
+    @property
+    def rules(self) -> PolicyRuleSet:
+        """현재 적용 중인 컴파일된 정책 규칙"""
+        return self._state[0]
+    
+    @property
+    def policy_db(self):
+        """현재 적용 중인 원본 정책 데이터베이스 (읽기 전용)"""
+        return self._state[0].raw
+    
+    @property
+    def supported_countries(self) -> List[str]:
+        """현재 정책이 정의된 국가 목록"""
+        return self._state[1]
     
-    def _load_policy_db(self, path: str) -> Dict:
-        """정책 데이터베이스 로드"""
+    @property
+    def policy_version(self) -> str:
+        """현재 적용 중인 정책 버전 (정책 내용 해시)"""
+        return self._state[0].version
+    
+    def _stat_policy_file(self) -> Optional[Tuple[int, int]]:
+        """정책 파일의 (mtime_ns, size), 파일이 없으면 None"""
+        try:
+            stat = os.stat(self.policy_db_path)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def add_reload_listener(self, listener: Callable[[PolicyRuleSet, PolicyRuleSet], None]):
+        """정책 교체 시 호출할 콜백 등록 (인자: 이전 규칙, 새 규칙)"""
+        self._reload_listeners.append(listener)
+    
+    def remove_reload_listener(self, listener: Callable[[PolicyRuleSet, PolicyRuleSet], None]):
+        """등록된 콜백 해제 (등록되지 않은 콜백은 무시)"""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Policy database not found at {path}")
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML format: {e}")
+            self._reload_listeners.remove(listener)
+        except ValueError:
+            pass
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        정책 파일이 변경되었으면 다시 컴파일하여 원자적으로 교체
+        
+        새 규칙은 기존 규칙을 그대로 둔 채 컴파일되며, 완료된 뒤에만 참조가 교체된다.
+        진행 중인 검사는 시작 시 잡은 이전 버전으로 끝나고 이후 검사부터 새 버전을 사용한다.
+        잘못된 정책 파일은 오류를 로그로 남기고 기존 규칙을 유지한다.
+        
+        Args:
+            force: 파일 상태가 그대로여도 다시 로드
+        
+        Returns:
+            정책 버전이 바뀌었으면 True
+        """
+        if not self.policy_db_path:
+            return False
+        
+        with self._reload_lock:
+            source_stat = self._stat_policy_file()
+            if not force and source_stat == self._source_stat:
+                return False
+            
+            try:
+                new_rules = load_policy_rules(self.policy_db_path, self.snapshot_dir)
+            except (OSError, ValueError) as e:
+                logger.error("Policy reload failed, keeping version %s: %s", self.policy_version, e)
+                return False
+            
+            # 파일 상태는 로드 성공 후에만 갱신 (실패한 파일은 다음 주기에 다시 시도)
+            self._source_stat = source_stat
+            old_rules = self.rules
+            if new_rules.version == old_rules.version:
+                return False
+            
+            self._set_rules(new_rules)
+            logger.info("Policy reloaded: %s -> %s", old_rules.version, new_rules.version)
+        
+        for listener in list(self._reload_listeners):
+            try:
+                listener(old_rules, new_rules)
+            except Exception:
+                logger.exception("Policy reload listener failed")
+        return True
+    
+    def start_watching(self, interval: float = DEFAULT_WATCH_INTERVAL):
+        """
+        백그라운드 스레드에서 정책 파일 변경을 주기적으로 감시 (mtime 폴링)
+        
+        Args:
+            interval: 감시 주기 (초)
+        """
+        if not self.policy_db_path:
+            raise ValueError("Guardrail was not loaded from a policy file; nothing to watch")
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="policy-watcher", daemon=True
+        )
+        self._watch_thread.start()
+    
+    def stop_watching(self, timeout: Optional[float] = None):
+        """정책 파일 감시 중지"""
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout)
+            self._watch_thread = None
+    
+    def _watch_loop(self, interval: float):
+        """감시 스레드 본체"""
+        while not self._watch_stop.wait(interval):
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Policy watcher iteration failed")
     
     def check_deployment(self, 
                         country: str, 
@@ -106,19 +315,94 @@ class ComplianceGuardrail:
         Returns:
             ComplianceResult: 검사 결과
         """
+        # 검사 전체에서 같은 버전의 정책을 사용하도록 참조를 한 번만 읽음
+        rules, supported_countries = self._state
+        
         # 국가 정책 확인
-        if country not in self.policy_db:
-            return ComplianceResult("WARNING", country, [{
-                "type": "UNKNOWN_COUNTRY",
-                "message": f"No policy found for {country}. Supported: {', '.join(self.supported_countries)}",
-                "severity": "MEDIUM"
-            }])
+        if country not in rules.policies:
+            return self._unknown_country_result(rules, supported_countries, country)
+        
+        field_hits = self._scan_fields(
+            self._normalize_fields(content_metadata), rules.policies[country].keyword_matcher
+        )
+        return self._evaluate(rules, country, content_metadata, field_hits, ad_schedule, current_time)
+    
+    def check_all_countries(self,
+                            content_metadata: Dict,
+                            countries: Optional[List[str]] = None,
+                            ad_schedule: Optional[Dict] = None,
+                            current_time: Optional[datetime] = None) -> Dict[str, ComplianceResult]:
+        """
+        하나의 콘텐츠를 여러 국가에 대해 한 번의 스캔으로 검사
         
-        policy = self.policy_db[country]
-        result = ComplianceResult("PASS", country)
+        메타데이터 정규화와 금지 키워드 스캔은 전체 국가 합집합 매처로 한 번만 수행하고,
+        검출된 키워드를 국가별 ComplianceResult로 분배한다.
+        
+        Args:
+            content_metadata: 콘텐츠 메타데이터
+            countries: 대상 국가 목록 (기본값: 지원되는 모든 국가)
+            ad_schedule: 광고 스케줄 정보 (선택)
+            current_time: 현재 시간 (테스트용, 기본값: 현재)
+        
+        Returns:
+            국가별 검사 결과 딕셔너리
+        """
+        rules, supported_countries = self._state
+        if countries is None:
+            countries = supported_countries
+        
+        union_hits = self._scan_fields(self._normalize_fields(content_metadata), rules.union_matcher)
+        
+        # 검출된 키워드가 속한 국가만 키워드 분배 대상
+        hit_countries = set()
+        for hits in union_hits.values():
+            for keyword in hits:
+                hit_countries.update(rules.keyword_countries.get(keyword, ()))
+        
+        results = {}
+        for country in countries:
+            if country not in rules.policies:
+                results[country] = self._unknown_country_result(rules, supported_countries, country)
+                continue
+            field_hits = union_hits if country in hit_countries else {}
+            results[country] = self._evaluate(
+                rules, country, content_metadata, field_hits, ad_schedule, current_time
+            )
+        
+        return results
+    
+    def _unknown_country_result(self, rules: PolicyRuleSet, supported_countries: List[str],
+                                country: str) -> ComplianceResult:
+        """정책이 없는 국가에 대한 경고 결과"""
+        return ComplianceResult("WARNING", country, [{
+            "type": "UNKNOWN_COUNTRY",
+            "message": f"No policy found for {country}. Supported: {', '.join(supported_countries)}",
+            "severity": "MEDIUM"
+        }], policy_version=rules.version)
+    
+    def _normalize_fields(self, content_metadata: Dict) -> Dict[str, str]:
+        """검사 대상 텍스트 필드를 소문자 문자열로 정규화"""
+        return {
+            field: str(content_metadata[field]).lower()
+            for field in self.SEARCHABLE_FIELDS
+            if field in content_metadata
+        }
+    
+    def _scan_fields(self, fields: Dict[str, str], matcher: KeywordMatcher) -> Dict[str, set]:
+        """필드별로 검출된 키워드 집합 (필드당 한 번의 스캔)"""
+        if not matcher:
+            return {}
+        return {field: matcher.matched_keywords(text) for field, text in fields.items()}
+    
+    def _evaluate(self, rules: PolicyRuleSet, country: str, content_metadata: Dict,
+                  field_hits: Dict[str, set], ad_schedule: Optional[Dict],
+                  current_time: Optional[datetime]) -> ComplianceResult:
+        """국가 정책에 따라 모든 검사를 수행"""
+        policy = rules.policies[country]
+        result = ComplianceResult("PASS", country, policy_version=rules.version)
         
         # 1. 금지 키워드 검사
-        self._check_forbidden_keywords(content_metadata, policy, result)
+        self._check_forbidden_keywords(field_hits, policy, result)
         
         # 2. 광고 제한사항 검사
         if ad_schedule:
@@ -132,111 +416,93 @@ class ComplianceGuardrail:
         
         return result
     
-    def _check_forbidden_keywords(self, content_metadata: Dict, policy: Dict, 
+    def _check_forbidden_keywords(self, field_hits: Dict[str, set], policy: CompiledPolicy,
                                   result: ComplianceResult):
         """금지 키워드 검사"""
-        forbidden_keywords = policy.get('forbidden_keywords', [])
-        if not forbidden_keywords:
+        if not policy.forbidden_keywords or not field_hits:
             return
         
-        # 검사할 텍스트 필드들
-        searchable_fields = ['title', 'description', 'tags', 'genre']
-        
-        for field in searchable_fields:
-            if field not in content_metadata:
+        for field in self.SEARCHABLE_FIELDS:
+            hits = field_hits.get(field)
+            if not hits:
                 continue
             
-            text = str(content_metadata[field]).lower()
-            
-            for keyword in forbidden_keywords:
-                # 정규식을 사용하여 단어 경계를 고려한 검색
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                if re.search(pattern, text):
-                    severity = policy.get('violation_severity', 'HIGH')
+            # 정책에 정의된 순서대로 검출된 키워드 보고
+            for keyword in policy.forbidden_keywords:
+                if keyword.lower() in hits:
                     result.add_violation(
                         violation_type="FORBIDDEN_KEYWORD",
                         message=f"Forbidden keyword '{keyword}' detected in {field}",
-                        severity=severity,
+                        severity=policy.violation_severity,
                         detected_content=keyword
                     )
     
-    def _check_ad_restrictions(self, ad_schedule: Dict, policy: Dict, 
+    def _check_ad_restrictions(self, ad_schedule: Dict, policy: CompiledPolicy, 
                                result: ComplianceResult, current_time: Optional[datetime]):
         """광고 제한사항 검사"""
-        ad_restrictions = policy.get('ad_restrictions', {})
-        if not ad_restrictions:
+        if not policy.ad_rules:
+            return
+        
+        # 광고 타입에 해당하는 규칙만 조회 (로드 시 구성한 테이블 사용)
+        rules = policy.ad_rules_for(ad_schedule.get('ad_type', ''))
+        if not rules:
             return
         
         current_time = current_time or datetime.now()
         ad_type = ad_schedule.get('ad_type', 'unknown')
         
-        # 각 광고 타입별 제한사항 확인
-        for restriction_key, restriction_value in ad_restrictions.items():
-            if restriction_key not in ad_schedule.get('ad_type', ''):
-                continue
-            
+        for rule in rules:
             # 완전 금지
-            if restriction_value == "completely_forbidden":
+            if rule.completely_forbidden:
                 result.add_violation(
                     violation_type="AD_COMPLETELY_FORBIDDEN",
-                    message=f"{restriction_key} is completely forbidden in {result.country}",
+                    message=f"{rule.key} is completely forbidden in {result.country}",
                     severity="CRITICAL",
                     detected_content=ad_type
                 )
             
             # 시간대 기반 제한
-            elif isinstance(restriction_value, dict):
-                if restriction_value.get('restriction_type') == 'time_based':
-                    self._check_time_restriction(
-                        restriction_value, current_time, result, restriction_key
-                    )
+            else:
+                self._check_time_restriction(
+                    rule.allowed_window, rule.forbidden_window, current_time, result, rule.key
+                )
     
-    def _check_time_restriction(self, restriction: Dict, current_time: datetime, 
-                               result: ComplianceResult, ad_type: str):
-        """시간대 기반 광고 제한 검사"""
-        allowed_window = restriction.get('allowed_time_window')
-        forbidden_window = restriction.get('forbidden_time_window')
-        
-        current_hour_minute = current_time.time()
-        
-        if allowed_window:
+    def _check_time_restriction(self, allowed_window: Optional[TimeWindow],
+                                forbidden_window: Optional[TimeWindow], current_time: datetime,
+                                result: ComplianceResult, ad_type: str):
+        """시간대 기반 광고 제한 검사 (시간대는 로드 시 분 단위 정수로 파싱됨)"""
+        if allowed_window and not allowed_window.contains(current_time):
             # 허용된 시간대만 명시 (예: "01:00-05:00")
-            start_str, end_str = allowed_window.split('-')
-            start_time = datetime.strptime(start_str, "%H:%M").time()
-            end_time = datetime.strptime(end_str, "%H:%M").time()
-            
-            if not (start_time <= current_hour_minute <= end_time):
-                result.add_violation(
-                    violation_type="AD_TIME_RESTRICTION",
-                    message=f"{ad_type} only allowed during {allowed_window}. Current: {current_time.strftime('%H:%M')}",
-                    severity="HIGH",
-                    detected_content=f"Scheduled at {current_time.strftime('%H:%M')}"
-                )
+            result.add_violation(
+                violation_type="AD_TIME_RESTRICTION",
+                message=f"{ad_type} only allowed during {allowed_window.label}. Current: {current_time.strftime('%H:%M')}",
+                severity="HIGH",
+                detected_content=f"Scheduled at {current_time.strftime('%H:%M')}"
+            )
         
-        if forbidden_window:
+        if forbidden_window and forbidden_window.contains(current_time):
             # 금지된 시간대 명시 (예: "07:00-22:00")
-            start_str, end_str = forbidden_window.split('-')
-            start_time = datetime.strptime(start_str, "%H:%M").time()
-            end_time = datetime.strptime(end_str, "%H:%M").time()
-            
-            if start_time <= current_hour_minute <= end_time:
-                result.add_violation(
-                    violation_type="AD_TIME_RESTRICTION",
-                    message=f"{ad_type} forbidden during {forbidden_window}. Current: {current_time.strftime('%H:%M')}",
-                    severity="HIGH",
-                    detected_content=f"Scheduled at {current_time.strftime('%H:%M')}"
-                )
+            result.add_violation(
+                violation_type="AD_TIME_RESTRICTION",
+                message=f"{ad_type} forbidden during {forbidden_window.label}. Current: {current_time.strftime('%H:%M')}",
+                severity="HIGH",
+                detected_content=f"Scheduled at {current_time.strftime('%H:%M')}"
+            )
     
-    def _check_mandatory_features(self, content_metadata: Dict, policy: Dict, 
+    def _check_mandatory_features(self, content_metadata: Dict, policy: CompiledPolicy, 
                                   result: ComplianceResult):
         """필수 기능 요구사항 검사"""
-        mandatory_features = policy.get('mandatory_features', [])
-        if not mandatory_features:
+        if not policy.mandatory_features:
             return
         
         available_features = content_metadata.get('features', [])
         
-        for feature in mandatory_features:
+        # 모든 필수 기능을 갖춘 경우 빠르게 종료
+        if isinstance(available_features, (list, tuple, set, frozenset)) and \
+                policy.mandatory_feature_set.issubset(available_features):
+            return
+        
+        for feature in policy.mandatory_features:
             if feature not in available_features:
                 result.add_violation(
                     violation_type="MISSING_MANDATORY_FEATURE",
@@ -245,10 +511,10 @@ class ComplianceGuardrail:
                     detected_content=f"Available: {', '.join(available_features)}"
                 )
     
-    def _check_age_rating(self, content_metadata: Dict, policy: Dict, 
+    def _check_age_rating(self, content_metadata: Dict, policy: CompiledPolicy, 
                          result: ComplianceResult):
         """연령 등급 시스템 검사"""
-        expected_system = policy.get('age_rating_system')
+        expected_system = policy.age_rating_system
         if not expected_system:
             return
         
@@ -269,33 +535,89 @@ class ComplianceGuardrail:
                 severity="MEDIUM"
             )
     
-    def batch_check(self, deployments: List[Dict]) -> Dict[str, ComplianceResult]:
+    def batch_check(self, deployments: List[Dict], workers: Optional[int] = None,
+                    chunk_size: Optional[int] = None) -> Dict[str, ComplianceResult]:
         """
         여러 배포 대상을 일괄 검사
         
         Args:
             deployments: 배포 정보 리스트 (각각 country와 content_metadata 포함)
+            workers: 병렬 검사에 사용할 프로세스 수 (None 또는 1이면 순차 처리)
+            chunk_size: 워커에 한 번에 전달할 배포 개수 (기본값: DEFAULT_CHUNK_SIZE)
         
         Returns:
             국가별 검사 결과 딕셔너리
         """
-        results = {}
+        if not workers or workers <= 1 or len(deployments) < PARALLEL_MIN_BATCH:
+            return {
+                self._batch_key(deployment, idx): self._check_entry(deployment)
+                for idx, deployment in enumerate(deployments)
+            }
+        
+        return self._parallel_batch_check(deployments, workers, chunk_size or DEFAULT_CHUNK_SIZE)
+    
+    def iter_check(self, deployments: Iterable[Dict],
+                   summary: Optional[ComplianceSummary] = None) -> Iterator[Tuple[str, ComplianceResult]]:
+        """
+        배포 대상을 스트리밍 방식으로 검사 (전체 목록/결과를 메모리에 보관하지 않음)
+        
+        Args:
+            deployments: 배포 정보 이터러블 (파일/표준입력 스트림 등)
+            summary: 상태별 집계를 실시간으로 누적할 ComplianceSummary (선택)
+        
+        Yields:
+            (batch_check와 같은 "{country}_{idx}" 키, 검사 결과)
+        """
         for idx, deployment in enumerate(deployments):
-            country = deployment.get('country')
-            content = deployment.get('content_metadata', {})
-            ad_schedule = deployment.get('ad_schedule')
-            
-            result = self.check_deployment(country, content, ad_schedule)
-            results[f"{country}_{idx}"] = result
+            result = self._check_entry(deployment)
+            if summary is not None:
+                summary.add(result)
+            yield self._batch_key(deployment, idx), result
+    
+    def _parallel_batch_check(self, deployments: List[Dict], workers: int,
+                              chunk_size: int) -> Dict[str, ComplianceResult]:
+        """프로세스 풀로 청크 단위 병렬 검사 (정책 DB는 워커 시작 시 한 번만 전달)"""
+        starts = range(0, len(deployments), chunk_size)
+        chunks = (deployments[start:start + chunk_size] for start in starts)
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.rules,)) as executor:
+            # map은 제출 순서대로 결과를 돌려주므로 기존 키 순서가 유지됨
+            for chunk_results in executor.map(_check_batch_chunk, starts, chunks):
+                results.update(chunk_results)
         
         return results
     
-    def generate_compliance_report(self, results: Dict[str, ComplianceResult]) -> str:
-        """컴플라이언스 리포트 생성"""
-        total = len(results)
-        passed = sum(1 for r in results.values() if r.status == "PASS")
-        warnings = sum(1 for r in results.values() if r.status == "WARNING")
-        critical = sum(1 for r in results.values() if r.status == "CRITICAL")
+    @staticmethod
+    def _batch_key(deployment: Dict, idx: int) -> str:
+        """일괄 검사 결과 키"""
+        return f"{deployment.get('country')}_{idx}"
+    
+    def _check_entry(self, deployment: Dict) -> ComplianceResult:
+        """일괄 검사 항목 하나를 검사"""
+        return self.check_deployment(
+            deployment.get('country'),
+            deployment.get('content_metadata', {}),
+            deployment.get('ad_schedule')
+        )
+    
+    def generate_compliance_report(self, results: Dict[str, ComplianceResult],
+                                   summary: Optional[ComplianceSummary] = None) -> str:
+        """
+        컴플라이언스 리포트 생성
+        
+        Args:
+            results: 상세 출력할 검사 결과 (스트리밍 검사에서는 빈 딕셔너리 가능)
+            summary: iter_check로 누적한 집계 (없으면 results로부터 계산)
+        """
+        if summary is None:
+            summary = ComplianceSummary.from_results(results.values())
+        total = summary.total
+        passed = summary.passed
+        warnings = summary.warnings
+        critical = summary.critical
         
         report = [
             "=" * 70,
@@ -316,6 +638,24 @@ class ComplianceGuardrail:
         return "\n".join(report)
 
 
+# 병렬 일괄 검사 워커 상태 (프로세스마다 풀 시작 시 한 번 생성)
+_worker_guardrail = None
+
+
+def _init_batch_worker(rules: PolicyRuleSet):
+    """워커 프로세스 초기화: 전달받은 컴파일된 정책으로 가드레일 구성"""
+    global _worker_guardrail
+    _worker_guardrail = ComplianceGuardrail.from_rules(rules)
+
+
+def _check_batch_chunk(start: int, chunk: List[Dict]) -> List[Tuple[str, ComplianceResult]]:
+    """워커 프로세스에서 청크 하나를 검사"""
+    return [
+        (ComplianceGuardrail._batch_key(deployment, idx), _worker_guardrail._check_entry(deployment))
+        for idx, deployment in enumerate(chunk, start)
+    ]
+
+
 def main():
     """메인 실행 함수 (데모)"""
     print("🌍 Glocal Policy Guardrail - Compliance Scanner")
@@ -0,0 +1,79 @@
+"""
+Seen-entry index for RSS/Atom sources
+Remembers which feed entries were already reported so every poll emits
+exactly the entries that are new since the previous one, instead of
+comparing a hash of the top entry.
+"""
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_MAX_AGE_DAYS = 180   # Forget entries not seen in the feed for this long
+DEFAULT_MAX_ENTRIES = 2000   # Hard cap per source, most recently seen kept
+
+
+def entry_key(entry) -> Optional[str]:
+    """
+    Stable, compact identity of a feed entry
+
+    Uses the GUID/id, falling back to the link and then to title plus
+    publication date, so editing an entry's title or summary does not make
+    it new. Hashed to 16 hex characters to keep the persisted index small.
+    """
+    identity = entry.get('id') or entry.get('link')
+    if not identity:
+        identity = f"{entry.get('title', '')}\x1f{entry.get('published', '')}"
+        if identity == "\x1f":
+            return None
+    return hashlib.blake2b(identity.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class SeenEntryIndex:
+    """Entry keys of one source mapped to the epoch second they were last present in the feed"""
+
+    def __init__(self, seen: Optional[Dict[str, int]] = None,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.seen: Dict[str, int] = dict(seen or {})
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.seen
+
+    def update(self, entries: Iterable, now: Optional[float] = None) -> List:
+        """
+        Record the entries of a poll and return those not seen before, in feed order
+
+        Entries still in the feed have their timestamp refreshed, so an old
+        but still listed entry is never aged out and then re-reported.
+        """
+        now = int(now if now is not None else time.time())
+        new_entries = []
+        for entry in entries:
+            key = entry_key(entry)
+            if key is None:
+                continue
+            if key not in self.seen:
+                new_entries.append(entry)
+            self.seen[key] = now
+        self.prune(now)
+        return new_entries
+
+    def prune(self, now: Optional[float] = None):
+        """Drop entries past the age limit, then the least recently seen beyond the cap"""
+        now = now if now is not None else time.time()
+        cutoff = now - self.max_age
+        seen = {key: ts for key, ts in self.seen.items() if ts >= cutoff}
+        if len(seen) > self.max_entries:
+            newest = sorted(seen.items(), key=lambda item: item[1], reverse=True)[:self.max_entries]
+            seen = dict(newest)
+        self.seen = seen
+
+    def to_dict(self) -> Dict[str, int]:
+        """JSON-serializable form for the source state file"""
+        return dict(self.seen)
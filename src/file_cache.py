@@ -0,0 +1,136 @@
+"""
+Process-wide cache of parsed report files
+Parses each report (e.g. reports/compliance_report.json) once per version
+of the file, keyed by (path, mtime_ns, size), and hands every caller the
+same read-only view until the file changes on disk.
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.fork_safety import after_fork_in_child
+try:
+    from src.monitoring import track_file_cache_event
+except ImportError:  # prometheus_client not installed: counters below still work
+    track_file_cache_event = None
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError("cached report views are read-only")
+
+
+class FrozenDict(dict):
+    """dict that rejects mutation; still a dict, so jsonify and json.dumps accept it"""
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Read-only deep view of parsed JSON: dicts become FrozenDict, lists tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def load_json(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FileCache:
+    """Parsed files keyed by (path, mtime_ns, size), reloaded lazily when the file changes"""
+
+    def __init__(self, name: str = "reports", loader: Callable[[Path], Any] = load_json):
+        """
+        Args:
+            name: Cache name used as the metrics label
+            loader: Parses a file; its result is frozen before it is shared
+        """
+        self.name = name
+        self.loader = loader
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        after_fork_in_child(self._after_fork)
+
+    def _after_fork(self):
+        """Parsed entries stay shared with the parent; only the lock is replaced"""
+        self._lock = threading.Lock()
+
+    def get(self, path, default: Any = None) -> Any:
+        """
+        Read-only parsed content of path, or default when the file does not
+        exist or cannot be parsed
+        """
+        key = os.fspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return default
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == version:
+            self._record('hit')
+            return cached[1]
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:  # Parsed by another thread meanwhile
+                self._record('hit')
+                return cached[1]
+            try:
+                value = freeze(self.loader(Path(key)))
+            except (OSError, ValueError):
+                return default
+            self._record('reload' if cached is not None else 'miss')
+            self._entries[key] = (version, value)
+            return value
+
+    def invalidate(self, path=None) -> None:
+        """Forget one file (or all), e.g. after writing it within the same mtime tick"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.fspath(path), None)
+
+    def _record(self, event: str) -> None:
+        if event == 'hit':
+            self.hits += 1
+        elif event == 'miss':
+            self.misses += 1
+        else:
+            self.reloads += 1
+        if track_file_cache_event is not None:
+            track_file_cache_event(self.name, event)
+
+    def stats(self) -> Dict:
+        """Hit, miss and reload counts"""
+        lookups = self.hits + self.misses + self.reloads
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'files': len(self._entries)
+        }
+
+
+# Shared by every endpoint of the process
+report_cache = FileCache("reports")
@@ -0,0 +1,42 @@
+"""
+Fork-safe process state
+Objects created before a pre-forking server (gunicorn --preload) forks its
+workers are inherited by every worker: their parsed data is shared
+copy-on-write, but locks possibly held by another thread at fork time and
+pooled sockets must not be. Such objects register a callback that
+re-creates that state in each child process.
+"""
+import os
+import threading
+import weakref
+from typing import Callable, List
+
+_callbacks: List[weakref.WeakMethod] = []
+_registry_lock = threading.Lock()
+
+
+def after_fork_in_child(callback: Callable[[], None]) -> None:
+    """
+    Run a bound method in every child process forked after this call
+
+    Only a weak reference is kept, so registering does not keep the object
+    alive.
+    """
+    with _registry_lock:
+        _callbacks.append(weakref.WeakMethod(callback))
+
+
+def _run_callbacks() -> None:
+    global _registry_lock
+    _registry_lock = threading.Lock()  # May have been held by another thread of the parent
+    alive = []
+    for ref in _callbacks:
+        callback = ref()
+        if callback is not None:
+            callback()
+            alive.append(ref)
+    _callbacks[:] = alive
+
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which does not fork
+    os.register_at_fork(after_in_child=_run_callbacks)
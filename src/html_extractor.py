@@ -0,0 +1,258 @@
+"""
+HTML content extraction for scraped regulatory sources
+Pluggable parser backends that pull the main content block, its text and
+the latest headline out of a page. lxml (C, libxml2) is the default;
+selectolax is used when installed; BeautifulSoup's pure-Python html.parser
+remains available as the reference implementation.
+"""
+import abc
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+
+try:
+    from lxml.cssselect import CSSSelector
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSELECT_AVAILABLE = False
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+DEFAULT_BACKEND = "lxml"
+# Probed in order when a source has no selectors configured
+DEFAULT_CONTENT_SELECTORS = ('main', 'article', '.content', '#content', '.notice-list', '.news-list')
+HEADLINE_TAGS = ('h1', 'h2', 'h3', 'h4')
+# Elements whose text is not page content (BeautifulSoup's get_text skips them too)
+NON_CONTENT_TAGS = ('script', 'style', 'template')
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+)*)$')
+
+
+@dataclass
+class ExtractedPage:
+    """Main content of a page"""
+    text: str                     # Content text, stripped strings joined by single spaces
+    title: Optional[str] = None   # Text of the first h1-h4 in the content block
+    link: Optional[str] = None    # href of the headline link, unresolved
+    selector: Optional[str] = None  # Selector that matched, None when <body> was used
+
+
+def css_to_xpath(selector: str) -> str:
+    """
+    XPath for a CSS selector, matching the selected element or its descendants
+
+    Uses cssselect when installed. Without it only type, #id and .class
+    selectors joined by descendant or child (>) combinators are supported,
+    which covers the content containers of the configured sources.
+    """
+    if CSSSELECT_AVAILABLE:
+        return CSSSelector(selector).path
+
+    steps = []
+    axis = 'descendant-or-self::'
+    for token in selector.replace('>', ' > ').split():
+        if token == '>':
+            if not steps or axis == '/':
+                raise ValueError(f"Unsupported CSS selector: {selector!r}")
+            axis = '/'
+            continue
+        match = _SIMPLE_SELECTOR.match(token)
+        if not match or not (match.group(1) or match.group(2)):
+            raise ValueError(f"Unsupported CSS selector without cssselect installed: {selector!r}")
+        predicates = []
+        for part in re.findall(r'[.#][\w-]+', match.group(2)):
+            if part[0] == '#':
+                predicates.append(f"@id = '{part[1:]}'")
+            else:
+                predicates.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {part[1:]} ')")
+        step = (match.group(1) or '*') + ''.join(f'[{p}]' for p in predicates)
+        steps.append(axis + step)
+        axis = '/descendant::'
+    if not steps or axis == '/':
+        raise ValueError(f"Unsupported CSS selector: {selector!r}")
+    return ''.join(steps)
+
+
+@lru_cache(maxsize=256)
+def _compiled_selector(selector: str) -> etree.XPath:
+    return etree.XPath(css_to_xpath(selector))
+
+
+def _resolve_charset(content: bytes, charset: Optional[str]) -> Optional[str]:
+    """Charset to decode with, or None to let the parser follow the document's meta tag"""
+    if charset:
+        return charset
+    if _META_CHARSET.search(content[:4096]):
+        return None
+    try:
+        content.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return 'utf-8'
+
+
+class HTMLExtractor(abc.ABC):
+    """Base class of the extractor backends"""
+    name = ""
+
+    @abc.abstractmethod
+    def extract(self, content: bytes, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS,
+                charset: Optional[str] = None) -> ExtractedPage:
+        """
+        Extract the first element matching one of the selectors (tried in
+        order, falling back to <body>) from an HTML document
+
+        Args:
+            content: Raw HTML bytes
+            selectors: CSS selectors of the content block, most specific first
+            charset: Charset from the Content-Type header, if any
+        """
+
+
+class BeautifulSoupExtractor(HTMLExtractor):
+    """Reference backend on BeautifulSoup's pure-Python html.parser"""
+    name = "bs4"
+
+    def extract(self, content: bytes, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS,
+                charset: Optional[str] = None) -> ExtractedPage:
+        soup = BeautifulSoup(content, 'html.parser', from_encoding=charset)
+        main_content = matched = None
+        for selector in selectors:
+            main_content = soup.select_one(selector)
+            if main_content:
+                matched = selector
+                break
+        if not main_content:
+            main_content = soup.body if soup.body else soup
+
+        page = ExtractedPage(main_content.get_text(strip=True, separator=' '), selector=matched)
+        for tag in HEADLINE_TAGS:
+            title_elem = main_content.find(tag)
+            if title_elem:
+                page.title = title_elem.get_text(strip=True)
+                link_elem = title_elem.find('a') or title_elem.find_parent('a')
+                if link_elem and link_elem.get('href'):
+                    page.link = link_elem['href']
+                break
+        return page
+
+
+class LxmlExtractor(HTMLExtractor):
+    """libxml2 backend; selectors are compiled to cached XPath expressions"""
+    name = "lxml"
+
+    def extract(self, content: bytes, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS,
+                charset: Optional[str] = None) -> ExtractedPage:
+        parser = lxml.html.HTMLParser(encoding=_resolve_charset(content, charset), remove_comments=True)
+        try:
+            root = lxml.html.document_fromstring(content, parser=parser)
+        except etree.ParserError:  # Empty document
+            return ExtractedPage('')
+        etree.strip_elements(root, *NON_CONTENT_TAGS, with_tail=False)
+
+        main_content = matched = None
+        for selector in selectors:
+            matches = _compiled_selector(selector)(root)
+            if matches:
+                main_content, matched = matches[0], selector
+                break
+        if main_content is None:
+            main_content = root.find('body')
+            if main_content is None:
+                main_content = root
+
+        page = ExtractedPage(self._text(main_content, ' '), selector=matched)
+        for tag in HEADLINE_TAGS:
+            title_elem = next(main_content.iterdescendants(tag), None)
+            if title_elem is not None:
+                page.title = self._text(title_elem, '')
+                link_elem = next(title_elem.iterdescendants('a'), None)
+                if link_elem is None:
+                    link_elem = next(title_elem.iterancestors('a'), None)
+                if link_elem is not None and link_elem.get('href'):
+                    page.link = link_elem.get('href')
+                break
+        return page
+
+    @staticmethod
+    def _text(element, separator: str) -> str:
+        """Stripped, non-empty text nodes joined by separator"""
+        return separator.join(s for s in (t.strip() for t in element.itertext()) if s)
+
+
+class SelectolaxExtractor(HTMLExtractor):
+    """selectolax (lexbor/Modest) backend; optional dependency"""
+    name = "selectolax"
+
+    def __init__(self):
+        if not SELECTOLAX_AVAILABLE:
+            raise ValueError("selectolax backend requested but selectolax is not installed")
+
+    def extract(self, content: bytes, selectors: Sequence[str] = DEFAULT_CONTENT_SELECTORS,
+                charset: Optional[str] = None) -> ExtractedPage:
+        resolved = _resolve_charset(content, charset)
+        tree = SelectolaxParser(content.decode(resolved, errors='replace') if resolved else content)
+        tree.strip_tags(list(NON_CONTENT_TAGS))
+
+        main_content = matched = None
+        for selector in selectors:
+            main_content = tree.css_first(selector)
+            if main_content is not None:
+                matched = selector
+                break
+        if main_content is None:
+            main_content = tree.body if tree.body is not None else tree.root
+
+        page = ExtractedPage(self._text(main_content, ' '), selector=matched)
+        for tag in HEADLINE_TAGS:
+            title_elem = main_content.css_first(tag)
+            if title_elem is not None:
+                page.title = self._text(title_elem, '')
+                link_elem = title_elem.css_first('a')
+                if link_elem is None:
+                    parent = title_elem.parent
+                    while parent is not None and parent.tag != 'a':
+                        parent = parent.parent
+                    link_elem = parent
+                if link_elem is not None and link_elem.attributes.get('href'):
+                    page.link = link_elem.attributes['href']
+                break
+        return page
+
+    @staticmethod
+    def _text(node, separator: str) -> str:
+        """Stripped, non-empty text nodes joined by separator"""
+        texts = (child.text_content.strip() for child in node.traverse(include_text=True)
+                 if child.tag == '-text')
+        return separator.join(s for s in texts if s)
+
+
+BACKENDS: Dict[str, type] = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+    SelectolaxExtractor.name: SelectolaxExtractor,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of the backends usable in this environment"""
+    return [name for name in BACKENDS if name != SelectolaxExtractor.name or SELECTOLAX_AVAILABLE]
+
+
+def get_extractor(name: Optional[str] = None) -> HTMLExtractor:
+    """Extractor for a backend name (default: DEFAULT_BACKEND)"""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML extractor backend: {name!r} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
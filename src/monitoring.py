@@ -2,7 +2,9 @@
 Monitoring and observability with Prometheus metrics
 """
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import CollectorRegistry, multiprocess
 from flask import Response
+import os
 import time
 import functools
 
@@ -23,7 +25,8 @@ REQUEST_DURATION = Histogram(
 ACTIVE_REQUESTS = Gauge(
     'http_requests_active',
     'Number of active HTTP requests',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    multiprocess_mode='livesum'
 )
 
 COMPLIANCE_SCANS = Counter(
@@ -50,6 +53,23 @@ UPDATE_CHECK_DURATION = Histogram(
     ['country']
 )
 
+FILE_CACHE_EVENTS = Counter(
+    'file_cache_events_total',
+    'Parsed report cache lookups (hit, miss, reload)',
+    ['cache', 'event']
+)
+
+CACHE_BREAKER_OPEN = Gauge(
+    'cache_redis_breaker_open',
+    'Redis circuit breaker of src.cache (1=open, serving from the local cache)',
+    multiprocess_mode='livemax'
+)
+
+CACHE_BREAKER_TRIPS = Counter(
+    'cache_redis_breaker_trips_total',
+    'Times the Redis circuit breaker of src.cache opened'
+)
+
 
 def track_request_metrics(f):
     """Decorator to track request metrics"""
@@ -89,6 +109,18 @@ def track_regulatory_update(country, source):
     REGULATORY_UPDATES.labels(country=country, source=source).inc()
 
 
+def track_file_cache_event(cache, event):
+    """Track a parsed report cache hit, first load (miss) or reload after a file change"""
+    FILE_CACHE_EVENTS.labels(cache=cache, event=event).inc()
+
+
+def track_cache_breaker(is_open):
+    """Track the Redis circuit breaker of src/cache.py opening or closing"""
+    CACHE_BREAKER_OPEN.set(1 if is_open else 0)
+    if is_open:
+        CACHE_BREAKER_TRIPS.inc()
+
+
 def track_error(component, error):
     """Track system errors"""
     error_type = type(error).__name__
@@ -96,7 +128,11 @@ def track_error(component, error):
 
 
 def metrics_endpoint():
-    """Endpoint to expose Prometheus metrics"""
+    """Endpoint to expose Prometheus metrics (summed over all gunicorn workers in multiprocess mode)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
 
@@ -7,17 +7,46 @@ the policy database when changes are detected.
 import requests
 import feedparser
 import hashlib
+import random
+import threading
+import time
 import yaml
 import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
 from dataclasses import dataclass, asdict
 import logging
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import os
 from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.feed_index import SeenEntryIndex
+from src.fork_safety import after_fork_in_child
+from src.html_extractor import DEFAULT_BACKEND as DEFAULT_HTML_BACKEND, DEFAULT_CONTENT_SELECTORS, get_extractor
+from src.update_log import UpdateLogStore
+from src.aggregates import AggregateStore
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Concurrent source polling limits
+DEFAULT_MAX_WORKERS = 8          # Global cap on simultaneous fetches
+DEFAULT_PER_HOST_LIMIT = 2       # Simultaneous fetches against one host
+DEFAULT_SOURCE_DEADLINE = 15.0   # Seconds one source may take once its fetch starts
+DEFAULT_RUN_BUDGET = 120.0       # Seconds for a whole check_for_updates run
+FETCH_CHUNK_SIZE = 64 * 1024
+# Shared HTTP session: keep-alive connections reused across sources and scheduler runs
+DEFAULT_POOL_SIZE = DEFAULT_PER_HOST_LIMIT   # Kept-alive connections per host
+DEFAULT_POOL_HOSTS = 32                      # Hosts with a cached connection pool
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5                  # Seconds; doubled on every retry
+DEFAULT_RETRY_JITTER = 0.5                   # Up to this fraction of the backoff added at random
+RETRY_STATUSES = (429, 502, 503, 504)
+# Per-source change state: content hash plus HTTP validators for conditional requests
+SOURCE_STATE_DIR = Path("reports/source_hashes")
+class SourceDeadlineExceeded(Exception):
+    """Raised when a source fetch runs past its deadline"""
 @dataclass
 class RegulatorySource:
     """Regulatory Information Sources"""
@@ -32,11 +61,62 @@ class RegulatorySource:
     note: Optional[str] = None
     filter_keywords: Optional[List[str]] = None
     applies_to: Optional[List[str]] = None
+    selectors: Optional[List[str]] = None  # CSS selectors of the content block (scrape sources)
 class PolicyUpdateMonitor:
     """Policy update monitoring system"""
-    def __init__(self, config_path: str = "config/regulatory_sources.yaml"):
+    def __init__(self, config_path: str = "config/regulatory_sources.yaml",
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 source_deadline: float = DEFAULT_SOURCE_DEADLINE,
+                 run_budget: float = DEFAULT_RUN_BUDGET,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 html_backend: str = DEFAULT_HTML_BACKEND,
+                 update_log: Optional[UpdateLogStore] = None,
+                 aggregates: Optional[AggregateStore] = None):
         self.sources = self._load_sources(config_path)
         self.update_log = []
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.source_deadline = source_deadline
+        self.run_budget = run_budget
+        self.fetch_stats = self._new_fetch_stats()
+        self._stats_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._pool_size = max(pool_size, per_host_limit)
+        self.session = self._build_session(self._pool_size)
+        self.extractor = get_extractor(html_backend)
+        self.aggregates = aggregates or AggregateStore(update_log=update_log)
+        self.update_log_store = self.aggregates.update_log  # Runs are appended through the aggregates
+        after_fork_in_child(self._after_fork)
+    def _after_fork(self):
+        """A forked worker must not share the parent's pooled connections"""
+        self._stats_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.session = self._build_session(self._pool_size)
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        """
+        Pooled keep-alive session
+
+        The adapter does not retry: _fetch retries itself, so every attempt
+        and backoff stays within the source deadline.
+        """
+        adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_HOSTS, pool_maxsize=pool_size, max_retries=0)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
     def _load_sources(self, path: str) -> List[RegulatorySource]:
         """Load Regulatory Source Configuration"""
         try:
@@ -72,62 +152,279 @@ class PolicyUpdateMonitor:
             ),
             # More sources to be added
         ]
-    def check_for_updates(self) -> List[Dict]:
-        """   """
-        updates = []
-        for source in self.sources:
+    def check_for_updates(self, sources: Optional[List[RegulatorySource]] = None) -> List[Dict]:
+        """
+        Check every source concurrently and return the detected updates in source order
+
+        Fetches run on a bounded thread pool (max_workers) with at most
+        per_host_limit fetches against the same host. Each source must finish
+        within source_deadline seconds of starting its fetch, and sources still
+        pending when run_budget runs out are skipped for this run. A checker
+        returns one update, None, or (RSS) a list with one update per new entry.
+        Runs on one monitor are serialized, so fetch_stats always describes a
+        single complete run.
+
+        Args:
+            sources: Sources to check (default: every configured source)
+        """
+        with self._run_lock:
+            return self._check_sources(self.sources if sources is None else sources)
+
+    def _check_sources(self, sources: List[RegulatorySource]) -> List[Dict]:
+        checkers = self._source_checkers()
+        jobs = []
+        for idx, source in enumerate(sources):
+            if source.method in checkers:
+                jobs.append((idx, source))
+            else:
+                logger.info(f"Skipping manual source: {source.name}")
+        self.fetch_stats = self._new_fetch_stats()
+        if not jobs:
+            return []
+        host_limits = {
+            host: threading.BoundedSemaphore(self.per_host_limit)
+            for host in {self._source_host(source) for _, source in jobs}
+        }
+        run_deadline = time.monotonic() + self.run_budget
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(jobs))),
+                                      thread_name_prefix="source-check")
+        futures = {}
+        try:
+            futures = {
+                executor.submit(self._check_source, checkers[source.method], source,
+                                host_limits[self._source_host(source)], run_deadline): (idx, source)
+                for idx, source in jobs
+            }
+            pending = set(futures)
+            while pending:
+                remaining = run_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, source = futures[future]
+                    try:
+                        update = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Error checking {source.name}: {e}")
+                        continue
+                    if update:
+                        results[idx] = update if isinstance(update, list) else [update]
+                        logger.info(f"✅ {len(results[idx])} update(s) detected from {source.name}")
+                    else:
+                        logger.info(f"ℹ️  No changes from {source.name}")
+            for future in pending:
+                future.cancel()
+                logger.warning(f"⏱️  Run budget exhausted, skipped {futures[future][1].name}")
+        finally:
+            # Do not wait for fetches that overran the budget; they stop at their own deadline.
+            # Queued ones are cancelled here (shutdown(cancel_futures=True) needs Python 3.9)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        stats = self.fetch_stats
+        logger.info(
+            f"📉 Fetched {stats['requests']} sources: {stats['not_modified']} not modified "
+            f"({stats['not_modified_rate']:.0%}), {stats['bytes_downloaded']} bytes downloaded, "
+            f"~{stats['bytes_saved']} bytes saved"
+        )
+        return [update for idx in sorted(results) for update in results[idx]]
+    @staticmethod
+    def _new_fetch_stats() -> Dict:
+        """Per-run conditional fetch counters"""
+        return {"requests": 0, "not_modified": 0, "not_modified_rate": 0.0,
+                "bytes_downloaded": 0, "bytes_saved": 0}
+    def _record_fetch(self, not_modified: bool, downloaded: int, saved: int):
+        with self._stats_lock:
+            stats = self.fetch_stats
+            stats["requests"] += 1
+            stats["not_modified"] += int(not_modified)
+            stats["bytes_downloaded"] += downloaded
+            stats["bytes_saved"] += saved
+            stats["not_modified_rate"] = round(stats["not_modified"] / stats["requests"], 4)
+    @staticmethod
+    def _state_file(source: RegulatorySource) -> Path:
+        """Change state file of a source (reports/source_hashes/<country>_<name>.json)"""
+        return SOURCE_STATE_DIR / f"{source.country}_{source.name.replace(' ', '_')}.json"
+    def _load_source_state(self, source: RegulatorySource) -> Dict:
+        state_file = self._state_file(source)
+        if not state_file.exists():
+            return {}
+        try:
+            with open(state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    def _save_source_state(self, source: RegulatorySource, state: Dict, response: requests.Response):
+        """Persist state, refreshing the validators from a 200 response"""
+        state = dict(state)
+        if response.status_code == 200:
+            state['etag'] = response.headers.get('ETag')
+            state['last_modified'] = response.headers.get('Last-Modified')
+            state['content_length'] = len(response.content)
+        state['last_checked'] = datetime.now().isoformat()
+        state['url'] = source.url
+        SOURCE_STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self._state_file(source), 'w') as f:
+            json.dump(state, f, indent=2)
+    def _fetch_source(self, source: RegulatorySource, deadline: Optional[float],
+                      state: Dict, **kwargs) -> requests.Response:
+        """Conditional GET of a source using the validators from its saved state"""
+        headers = dict(kwargs.pop('headers', None) or {})
+        if state.get('url') == source.url:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        response = self._fetch(source.url, deadline, headers=headers, **kwargs)
+        not_modified = response.status_code == 304
+        self._record_fetch(not_modified, len(response.content or b""),
+                           (state.get('content_length') or 0) if not_modified else 0)
+        return response
+    def _source_checkers(self) -> Dict[str, Callable]:
+        """Check method per source type"""
+        return {
+            "rss": self._check_rss_feed,
+            "api": self._check_api,
+            "scrape": self._check_website,
+        }
+    @staticmethod
+    def _source_host(source: RegulatorySource) -> str:
+        """Host part of a source URL, used for per-host concurrency limits"""
+        return urlsplit(source.url).netloc.lower()
+    def _check_source(self, checker: Callable, source: RegulatorySource,
+                      host_limit: threading.BoundedSemaphore, run_deadline: float) -> Optional[Dict]:
+        """Run one source check once a slot for its host is free"""
+        if not host_limit.acquire(timeout=max(0.0, run_deadline - time.monotonic())):
+            raise SourceDeadlineExceeded(f"no free connection slot for {source.url} within the run budget")
+        try:
+            deadline = min(time.monotonic() + self.source_deadline, run_deadline)
+            return checker(source, deadline=deadline)
+        finally:
+            host_limit.release()
+    def _fetch(self, url: str, deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        GET url, failing with SourceDeadlineExceeded if the whole download
+        (not just one socket read), retries and backoff included, runs past
+        the deadline
+
+        Connection errors, timeouts and RETRY_STATUSES are retried up to
+        max_retries times with exponential backoff, jitter and Retry-After.
+        A retry that would not fit before the deadline is not attempted.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.source_deadline
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SourceDeadlineExceeded(f"deadline passed before fetching {url}")
             try:
-                if source.method == "rss":
-                    update = self._check_rss_feed(source)
-                elif source.method == "api":
-                    update = self._check_api(source)
-                elif source.method == "scrape":
-                    update = self._check_website(source)
-                else:
-                    logger.info(f"Skipping manual source: {source.name}")
-                    continue
-                if update:
-                    updates.append(update)
-                    logger.info(f"✅ Update detected from {source.name}")
-                else:
-                    logger.info(f"ℹ️  No changes from {source.name}")
-            except Exception as e:
-                logger.error(f"❌ Error checking {source.name}: {e}")
-        return updates
-    def _check_rss_feed(self, source: RegulatorySource) -> Optional[Dict]:
-        """RSS  """
+                response = self._fetch_once(url, deadline, remaining, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries or not self._backoff(attempt, None, deadline):
+                    raise
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            if not self._backoff(attempt, response, deadline):
+                return response
+        return response
+    def _backoff(self, attempt: int, response: Optional[requests.Response], deadline: float) -> bool:
+        """Sleep before retry number attempt + 1; False (without sleeping) if it would pass the deadline"""
+        delay = self.retry_backoff * (2 ** attempt) + random.uniform(0, DEFAULT_RETRY_JITTER * self.retry_backoff)
+        retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        if time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+    def _fetch_once(self, url: str, deadline: float, timeout: float, **kwargs) -> requests.Response:
+        """One GET, reading the body in chunks until the deadline"""
+        response = self.session.get(url, timeout=timeout, stream=True, **kwargs)
         try:
-            feed = feedparser.parse(source.url)
+            read1 = getattr(response.raw, 'read1', None)
+            if read1 is not None:
+                # Returns whatever has arrived, so a slowly trickling body cannot block past the deadline
+                stream = iter(lambda: read1(FETCH_CHUNK_SIZE, decode_content=True), b"")
+            else:  # urllib3 < 2
+                stream = response.iter_content(FETCH_CHUNK_SIZE)
+            chunks = []
+            for chunk in stream:
+                chunks.append(chunk)
+                if time.monotonic() > deadline:
+                    raise SourceDeadlineExceeded(f"{url} did not finish within its deadline")
+            response._content = b"".join(chunks)
+        finally:
+            response.close()
+        return response
+    def _check_rss_feed(self, source: RegulatorySource, deadline: Optional[float] = None) -> List[Dict]:
+        """
+        One update per feed entry not seen in earlier polls
+
+        The first poll of a source records every current entry and reports
+        only the latest one (nothing, if it matches the top-entry hash saved
+        by earlier versions).
+        """
+        try:
+            # Fetch with requests so the deadline applies; feedparser only parses
+            state = self._load_source_state(source)
+            response = self._fetch_source(source, deadline, state)
+            if response.status_code == 304:
+                self._save_source_state(source, state, response)
+                return []
+            if response.status_code != 200:
+                logger.warning(f"Non-200 status code for {source.name}: {response.status_code}")
+                return []
+            feed = feedparser.parse(response.content)
             if not feed.entries:
-                return None
-            latest = feed.entries[0]
-            content = f"{latest.title}{latest.get('summary', '')}"
-            current_hash = hashlib.md5(content.encode()).hexdigest()
-            if source.last_hash and source.last_hash == current_hash:
-                return None
-            return {
-                "source": source.name,
-                "country": source.country,
-                "method": "rss",
-                "title": latest.title,
-                "summary": latest.get('summary', ''),
-                "link": latest.get('link', ''),
-                "published": latest.get('published', ''),
-                "hash": current_hash,
-                "detected_at": datetime.now().isoformat()
-            }
+                self._save_source_state(source, state, response)
+                return []
+            state = dict(state)
+            legacy_hash = state.pop('hash', None)
+            index = SeenEntryIndex(state.get('seen_entries'))
+            bootstrap = not index
+            new_entries = index.update(feed.entries)
+            if bootstrap:
+                latest = feed.entries[0]
+                top_hash = hashlib.md5(f"{latest.get('title', '')}{latest.get('summary', '')}".encode()).hexdigest()
+                new_entries = [] if legacy_hash == top_hash else new_entries[:1]
+            state['seen_entries'] = index.to_dict()
+            self._save_source_state(source, state, response)
+            detected_at = datetime.now().isoformat()
+            return [
+                {
+                    "source": source.name,
+                    "country": source.country,
+                    "method": "rss",
+                    "title": entry.get('title', ''),
+                    "summary": entry.get('summary', ''),
+                    "link": entry.get('link', ''),
+                    "published": entry.get('published', ''),
+                    "entry_id": entry.get('id') or entry.get('link', ''),
+                    "detected_at": detected_at
+                }
+                for entry in new_entries
+            ]
         except Exception as e:
             logger.error(f"RSS feed error for {source.name}: {e}")
-            return None
-    def _check_api(self, source: RegulatorySource) -> Optional[Dict]:
+            return []
+    def _check_api(self, source: RegulatorySource, deadline: Optional[float] = None) -> Optional[Dict]:
         """API  """
         try:
-            response = requests.get(source.url, timeout=10)
+            state = self._load_source_state(source)
+            response = self._fetch_source(source, deadline, state)
+            if response.status_code == 304:
+                self._save_source_state(source, state, response)
+                return None
             if response.status_code != 200:
                 return None
             data = response.json()
             current_hash = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
-            if source.last_hash and source.last_hash == current_hash:
+            previous_hash = state.get('hash')
+            self._save_source_state(source, dict(state, hash=current_hash), response)
+            if previous_hash and previous_hash == current_hash:
                 return None
             return {
                 "source": source.name,
@@ -140,59 +437,38 @@ class PolicyUpdateMonitor:
         except Exception as e:
             logger.error(f"API error for {source.name}: {e}")
             return None
-    def _check_website(self, source: RegulatorySource) -> Optional[Dict]:
+    def _check_website(self, source: RegulatorySource, deadline: Optional[float] = None) -> Optional[Dict]:
         """  (  )"""
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(source.url, headers=headers, timeout=15)
+            state = self._load_source_state(source)
+            response = self._fetch_source(source, deadline, state, headers=headers)
+            if response.status_code == 304:
+                # Unchanged since the last run: no parsing needed
+                self._save_source_state(source, state, response)
+                return None
             if response.status_code != 200:
                 logger.warning(f"Non-200 status code for {source.name}: {response.status_code}")
                 return None
-            # BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-            #    (   )
-            #  /
-            main_content = None
-            for selector in ['main', 'article', '.content', '#content', '.notice-list', '.news-list']:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
-            if not main_content:
-                main_content = soup.body if soup.body else soup
-            text_content = main_content.get_text(strip=True, separator=' ')
-            current_hash = hashlib.md5(text_content.encode()).hexdigest()
-            hash_dir = Path("reports/source_hashes")
-            hash_dir.mkdir(parents=True, exist_ok=True)
-            hash_file = hash_dir / f"{source.country}_{source.name.replace(' ', '_')}.json"
-            previous_hash = None
-            if hash_file.exists():
-                with open(hash_file, 'r') as f:
-                    data = json.load(f)
-                    previous_hash = data.get('hash')
-            with open(hash_file, 'w') as f:
-                json.dump({
-                    'hash': current_hash,
-                    'last_checked': datetime.now().isoformat(),
-                    'url': source.url
-                }, f, indent=2)
+            # Configured selectors go straight to the content block; others probe the common containers
+            charset = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+            page = self.extractor.extract(response.content, source.selectors or DEFAULT_CONTENT_SELECTORS, charset)
+            if source.selectors and page.selector is None:
+                logger.warning(f"No configured selector matched for {source.name}, hashing the whole <body>")
+            current_hash = hashlib.md5(page.text.encode()).hexdigest()
+            previous_hash = state.get('hash')
+            self._save_source_state(source, dict(state, hash=current_hash), response)
             if previous_hash and previous_hash == current_hash:
                 return None
-            latest_title = "Content updated"
+            latest_title = page.title if page.title is not None else "Content updated"
             latest_link = source.url
-            #   /
-            for tag in ['h1', 'h2', 'h3', 'h4']:
-                title_elem = main_content.find(tag)
-                if title_elem:
-                    latest_title = title_elem.get_text(strip=True)
-                    link_elem = title_elem.find('a') or title_elem.find_parent('a')
-                    if link_elem and link_elem.get('href'):
-                        latest_link = link_elem['href']
-                        if not latest_link.startswith('http'):
-                            from urllib.parse import urljoin
-                            latest_link = urljoin(source.url, latest_link)
-                    break
+            if page.link:
+                latest_link = page.link
+                if not latest_link.startswith('http'):
+                    from urllib.parse import urljoin
+                    latest_link = urljoin(source.url, latest_link)
             return {
                 "source": source.name,
                 "country": source.country,
@@ -236,25 +512,16 @@ class PolicyUpdateMonitor:
         report.append("3. Run compliance tests to verify changes")
         report.append("4. Document changes in version control")
         return "\n".join(report)
-    def save_update_log(self, updates: List[Dict], filepath: str = "reports/policy_updates.json"):
-        """  """
-        import os
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    def save_update_log(self, updates: List[Dict]):
+        """Append this run to the update log (O(1), safe against concurrent writers)"""
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "updates_count": len(updates),
+            "fetch_stats": dict(self.fetch_stats),
             "updates": updates
         }
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-        except FileNotFoundError:
-            logs = []
-        logs.append(log_entry)
-        #  ( 100 )
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(logs[-100:], f, indent=2, ensure_ascii=False)
-        logger.info(f"Update log saved to {filepath}")
+        self.aggregates.record_run(log_entry)  # Appends to update_log_store and updates the aggregates
+        logger.info(f"Update log saved to {self.update_log_store.directory}")
 class PolicyAutoUpdater:
     """   """
     def __init__(self, policy_path: str = "config/policy_rules.yaml"):
@@ -325,7 +592,7 @@ def main():
     if updates:
         monitor.save_update_log(updates)
         print()
-        print("✅ Update log saved to reports/policy_updates.json")
+        print(f"✅ Update log saved to {monitor.update_log_store.directory}")
     updater = PolicyAutoUpdater()
     print()
     print("🤖 GENERATING POLICY UPDATE SUGGESTIONS...")
@@ -0,0 +1,410 @@
+"""
+Policy compilation helpers for the compliance scanner
+Turns raw policy rules into structures that can be evaluated without
+re-parsing or re-compiling anything on the per-check path.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+DEFAULT_VIOLATION_SEVERITY = "HIGH"
+
+# Parsed-policy snapshot cache in the user's cache directory, outside any checkout
+# (set POLICY_SNAPSHOT_DIR to an empty string to disable)
+DEFAULT_SNAPSHOT_DIR = os.getenv('POLICY_SNAPSHOT_DIR', os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'glocal-policy-guardrail', 'policy_snapshots'))
+# Bump whenever the snapshot layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT = 3
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher with word-boundary semantics
+
+    All keywords are compiled into a single alternation regex, so a text is
+    scanned once regardless of how many keywords are configured. A keyword
+    hits exactly when ``re.search(r'\\b' + re.escape(keyword) + r'\\b', text)``
+    would, and every hit is reported with its offset.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        self._pattern = None
+        self._same_start = {}
+
+        if not self.keywords:
+            return
+
+        # Longest first, so the alternation reports the longest keyword at each position
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        alternation = '|'.join(re.escape(kw) for kw in ordered)
+        # Zero-width lookahead lets finditer try every start position (overlapping hits)
+        self._pattern = re.compile(r'(?=\b(' + alternation + r')\b)')
+
+        # Shorter keywords that also match wherever a longer one matches at the same offset
+        for keyword in ordered:
+            shorter = [
+                other for other in ordered
+                if len(other) < len(keyword)
+                and keyword.startswith(other)
+                and re.match(re.escape(other) + r'\b', keyword)
+            ]
+            if shorter:
+                self._same_start[keyword] = tuple(shorter)
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+
+    def find_all(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Return every (keyword, offset) hit in an already lower-cased text
+
+        Args:
+            text: Text to scan (callers lower-case it once per field)
+
+        Returns:
+            Hits ordered by offset
+        """
+        if self._pattern is None:
+            return []
+
+        hits = []
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            offset = match.start()
+            hits.append((keyword, offset))
+            for shorter in self._same_start.get(keyword, ()):
+                hits.append((shorter, offset))
+        return hits
+
+    def matched_keywords(self, text: str) -> set:
+        """Return the set of keywords present in an already lower-cased text"""
+        return {keyword for keyword, _ in self.find_all(text)}
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """Inclusive daily time window, stored as minute-of-day bounds"""
+    start_minute: int
+    end_minute: int
+    label: str  # Original "HH:MM-HH:MM" text, used in violation messages
+
+    def contains(self, moment: datetime) -> bool:
+        """Same result as comparing moment.time() against the parsed window bounds"""
+        seconds = moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+        return self.start_minute * 60 <= seconds <= self.end_minute * 60
+
+
+@dataclass(frozen=True)
+class AdRule:
+    """Actionable ad restriction for one ad type key (e.g. "gambling_ads")"""
+    key: str
+    completely_forbidden: bool = False
+    allowed_window: Optional[TimeWindow] = None
+    forbidden_window: Optional[TimeWindow] = None
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """Immutable, pre-parsed rule set for one country"""
+    country: str
+    forbidden_keywords: Tuple[str, ...]
+    keyword_matcher: KeywordMatcher
+    violation_severity: str
+    ad_rules: Tuple[AdRule, ...]
+    ad_rules_by_type: Mapping[str, Tuple[AdRule, ...]]
+    mandatory_features: Tuple[str, ...]
+    mandatory_feature_set: frozenset
+    age_rating_system: Optional[str]
+    raw: Mapping
+
+    def ad_rules_for(self, ad_type: str) -> Tuple[AdRule, ...]:
+        """Rules whose key is contained in ad_type (table lookup for known ad types)"""
+        rules = self.ad_rules_by_type.get(ad_type)
+        if rules is None:
+            rules = tuple(rule for rule in self.ad_rules if rule.key in ad_type)
+        return rules
+
+    def __reduce__(self):
+        # Mapping proxies cannot be pickled; store plain dicts and re-wrap on load
+        return _restore_frozen, (type(self), _frozen_state(self))
+
+
+@dataclass(frozen=True)
+class PolicyRuleSet:
+    """Compiled policies for every country plus the cross-country keyword matcher"""
+    policies: Mapping[str, CompiledPolicy]
+    union_matcher: KeywordMatcher
+    keyword_countries: Mapping[str, frozenset]
+    raw: Mapping
+    version: str  # Content hash of the policy source; identical policies share a version
+
+    def __reduce__(self):
+        return _restore_frozen, (type(self), _frozen_state(self))
+
+
+def _frozen_state(obj) -> Dict:
+    return {
+        f.name: dict(value) if isinstance(value, MappingProxyType) else value
+        for f in fields(obj)
+        for value in (getattr(obj, f.name),)
+    }
+
+
+def _restore_frozen(cls, state: Dict):
+    return cls(**{
+        name: MappingProxyType(value) if isinstance(value, dict) else value
+        for name, value in state.items()
+    })
+
+
+def parse_time_window(value: str, country: str, ad_key: str) -> TimeWindow:
+    """Parse an "HH:MM-HH:MM" window, raising ValueError with context on bad input"""
+    try:
+        start_str, end_str = value.split('-')
+        start = datetime.strptime(start_str, "%H:%M")
+        end = datetime.strptime(end_str, "%H:%M")
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time window {value!r} for {country}.ad_restrictions.{ad_key}")
+    return TimeWindow(start.hour * 60 + start.minute, end.hour * 60 + end.minute, value)
+
+
+def _string_list(policy: Dict, field: str, country: str) -> Tuple[str, ...]:
+    values = policy.get(field) or []
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{country}.{field} must be a list of strings")
+    return tuple(values)
+
+
+def _compile_ad_rules(ad_restrictions: Dict, country: str) -> Tuple[AdRule, ...]:
+    if not isinstance(ad_restrictions, dict):
+        raise ValueError(f"{country}.ad_restrictions must be a mapping")
+
+    rules = []
+    for key, value in ad_restrictions.items():
+        if value == "completely_forbidden":
+            rules.append(AdRule(key, completely_forbidden=True))
+        elif isinstance(value, dict) and value.get('restriction_type') == 'time_based':
+            allowed = value.get('allowed_time_window')
+            forbidden = value.get('forbidden_time_window')
+            if not allowed and not forbidden:
+                continue
+            rules.append(AdRule(
+                key,
+                allowed_window=parse_time_window(allowed, country, key) if allowed else None,
+                forbidden_window=parse_time_window(forbidden, country, key) if forbidden else None
+            ))
+        # Other restriction types are informational and not evaluated by the scanner
+    return tuple(rules)
+
+
+def compile_country_policy(country: str, policy: Dict) -> CompiledPolicy:
+    """
+    Validate and compile one country's policy
+
+    Raises:
+        ValueError: If the policy is malformed
+    """
+    if not isinstance(policy, dict):
+        raise ValueError(f"Policy for {country} must be a mapping")
+
+    forbidden_keywords = _string_list(policy, 'forbidden_keywords', country)
+    mandatory_features = _string_list(policy, 'mandatory_features', country)
+
+    severity = policy.get('violation_severity', DEFAULT_VIOLATION_SEVERITY)
+    if severity not in SEVERITIES:
+        raise ValueError(f"{country}.violation_severity must be one of {', '.join(SEVERITIES)}")
+
+    ad_rules = _compile_ad_rules(policy.get('ad_restrictions') or {}, country)
+    # Exact lookup table for the ad types named in the policy itself
+    ad_rules_by_type = {
+        rule.key: tuple(other for other in ad_rules if other.key in rule.key)
+        for rule in ad_rules
+    }
+
+    return CompiledPolicy(
+        country=country,
+        forbidden_keywords=forbidden_keywords,
+        keyword_matcher=KeywordMatcher(forbidden_keywords),
+        violation_severity=severity,
+        ad_rules=ad_rules,
+        ad_rules_by_type=MappingProxyType(ad_rules_by_type),
+        mandatory_features=mandatory_features,
+        mandatory_feature_set=frozenset(mandatory_features),
+        age_rating_system=policy.get('age_rating_system'),
+        raw=MappingProxyType(policy)
+    )
+
+
+def compile_union_matcher(policy_db: Dict) -> Tuple[KeywordMatcher, Dict[str, frozenset]]:
+    """
+    Compile the forbidden keywords of every country into one matcher
+
+    Returns:
+        (matcher, keyword_countries) where keyword_countries maps each
+        lower-cased keyword to the countries that forbid it
+    """
+    keyword_countries = {}
+    for country, policy in policy_db.items():
+        for keyword in (policy or {}).get('forbidden_keywords') or []:
+            keyword_countries.setdefault(keyword.lower(), set()).add(country)
+
+    matcher = KeywordMatcher(keyword_countries)
+    return matcher, {kw: frozenset(countries) for kw, countries in keyword_countries.items()}
+
+
+def policy_version(data: bytes) -> str:
+    """Short content hash used as the policy version"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def compile_policy_db(policy_db: Dict, version: Optional[str] = None) -> PolicyRuleSet:
+    """
+    Validate and compile a whole policy database (config/policy_rules.yaml)
+
+    Args:
+        policy_db: Parsed policy database
+        version: Policy version (default: hash of the canonical JSON form)
+
+    Raises:
+        ValueError: If the database or any country policy is malformed
+    """
+    if not isinstance(policy_db, dict) or not policy_db:
+        raise ValueError("Policy database must be a non-empty mapping of country policies")
+
+    policies = {
+        country: compile_country_policy(country, policy)
+        for country, policy in policy_db.items()
+    }
+    union_matcher, keyword_countries = compile_union_matcher(policy_db)
+
+    return PolicyRuleSet(
+        policies=MappingProxyType(policies),
+        union_matcher=union_matcher,
+        keyword_countries=MappingProxyType(keyword_countries),
+        raw=MappingProxyType(policy_db),
+        version=version or policy_version(
+            json.dumps(policy_db, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+        )
+    )
+
+
+def _snapshot_path(policy_path: str, snapshot_dir: str) -> Path:
+    source = Path(policy_path).resolve()
+    # Path digest keeps snapshots of different policy files with the same name apart
+    path_digest = hashlib.sha1(str(source).encode()).hexdigest()[:8]
+    return Path(snapshot_dir) / f"{source.stem}-{path_digest}.json"
+
+
+def _read_snapshot(snapshot_path: Path) -> Optional[Dict]:
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable policy snapshot {snapshot_path}: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+def _json_round_trips(policy_db: Dict) -> bool:
+    try:
+        return json.loads(json.dumps(policy_db, ensure_ascii=False)) == policy_db
+    except (TypeError, ValueError):
+        return False
+
+
+def _write_snapshot(snapshot_path: Path, snapshot: Dict):
+    """Write atomically so concurrent readers never see a partial snapshot"""
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, snapshot_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        # A read-only filesystem only costs us the cache, never the load
+        logger.warning(f"Could not write policy snapshot {snapshot_path}: {e}")
+
+
+def parse_policy_yaml(data: bytes) -> Dict:
+    """Parse policy YAML bytes, mapping parser errors to ValueError"""
+    try:
+        return yaml.safe_load(data.decode('utf-8'))
+    except (yaml.YAMLError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid YAML format: {e}")
+
+
+def load_policy_rules(path: str, snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR) -> PolicyRuleSet:
+    """
+    Load and compile a policy file, reusing a parsed snapshot when possible
+
+    Parsing the YAML is the expensive part of a load, so the snapshot keeps
+    the parsed policy database as JSON along with the YAML file's mtime,
+    size and SHA-256; compiling from it is cheap. A matching mtime and size
+    uses the snapshot without reading the YAML at all; a touched-but-identical
+    file is recognised by its hash; any content change re-parses and rewrites
+    the snapshot. Policies that do not survive a JSON round trip unchanged
+    (e.g. YAML dates) are never snapshotted.
+
+    Args:
+        path: Policy YAML path
+        snapshot_dir: Directory for snapshots (None or "" disables)
+
+    Raises:
+        FileNotFoundError: If the policy file does not exist
+        ValueError: If the YAML or the policy rules are invalid
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Policy database not found at {path}")
+
+    snapshot_path = _snapshot_path(path, snapshot_dir) if snapshot_dir else None
+    snapshot = _read_snapshot(snapshot_path) if snapshot_path else None
+
+    if snapshot and snapshot['mtime_ns'] == stat.st_mtime_ns and snapshot['size'] == stat.st_size:
+        return compile_policy_db(snapshot['policy_db'], version=snapshot['sha256'][:12])
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    if snapshot and snapshot['sha256'] == digest:
+        policy_db = snapshot['policy_db']
+    else:
+        policy_db = parse_policy_yaml(data)
+    rules = compile_policy_db(policy_db, version=digest[:12])  # == policy_version(data)
+
+    if snapshot_path and _json_round_trips(policy_db):
+        _write_snapshot(snapshot_path, {
+            'format': SNAPSHOT_FORMAT,
+            'source': str(Path(path).resolve()),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'policy_db': policy_db
+        })
+    return rules
@@ -0,0 +1,121 @@
+"""
+Policy diff engine
+Compares two compiled policy versions and reports the minimal set of
+(country, rule) changes, so callers can re-check only what a change touches.
+"""
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.policy_compiler import CompiledPolicy, PolicyRuleSet
+
+
+# Rule categories, matching the checks in ComplianceGuardrail._evaluate
+RULE_COUNTRY = "country"
+RULE_FORBIDDEN_KEYWORD = "forbidden_keyword"
+RULE_VIOLATION_SEVERITY = "violation_severity"
+RULE_AD_RESTRICTION = "ad_restriction"
+RULE_MANDATORY_FEATURE = "mandatory_feature"
+RULE_AGE_RATING_SYSTEM = "age_rating_system"
+
+
+@dataclass(frozen=True)
+class PolicyChange:
+    """One rule-level change for one country"""
+    country: str
+    rule: str     # One of the RULE_* categories
+    change: str   # "added", "removed" or "changed"
+    item: Optional[str] = None  # Keyword, ad type or feature the change applies to
+
+    def __str__(self) -> str:
+        target = f" '{self.item}'" if self.item is not None else ""
+        return f"{self.country}: {self.rule}{target} {self.change}"
+
+
+@dataclass(frozen=True)
+class PolicyDiff:
+    """All changes between two compiled policy versions"""
+    old_version: str
+    new_version: str
+    changes: Tuple[PolicyChange, ...]
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def for_country(self, country: str) -> List[PolicyChange]:
+        """Changes that apply to one country"""
+        return [change for change in self.changes if change.country == country]
+
+    @property
+    def countries(self) -> List[str]:
+        """Countries with at least one change, in diff order"""
+        return list(dict.fromkeys(change.country for change in self.changes))
+
+    def to_dict(self) -> Dict:
+        return {
+            "old_version": self.old_version,
+            "new_version": self.new_version,
+            "changes": [
+                {"country": c.country, "rule": c.rule, "change": c.change, "item": c.item}
+                for c in self.changes
+            ]
+        }
+
+
+def _set_changes(country: str, rule: str, old_items, new_items) -> List[PolicyChange]:
+    old_set, new_set = set(old_items), set(new_items)
+    changes = [PolicyChange(country, rule, "added", item)
+               for item in new_items if item not in old_set]
+    changes.extend(PolicyChange(country, rule, "removed", item)
+                   for item in old_items if item not in new_set)
+    return changes
+
+
+def diff_country(old: CompiledPolicy, new: CompiledPolicy) -> List[PolicyChange]:
+    """Rule-level changes between two versions of one country's policy"""
+    country = new.country
+    changes = _set_changes(country, RULE_FORBIDDEN_KEYWORD, old.forbidden_keywords, new.forbidden_keywords)
+
+    if old.violation_severity != new.violation_severity:
+        changes.append(PolicyChange(country, RULE_VIOLATION_SEVERITY, "changed", new.violation_severity))
+
+    old_ads = {rule.key: rule for rule in old.ad_rules}
+    new_ads = {rule.key: rule for rule in new.ad_rules}
+    changes.extend(_set_changes(country, RULE_AD_RESTRICTION, list(old_ads), list(new_ads)))
+    changes.extend(
+        PolicyChange(country, RULE_AD_RESTRICTION, "changed", key)
+        for key, rule in new_ads.items()
+        if key in old_ads and old_ads[key] != rule
+    )
+
+    changes.extend(_set_changes(
+        country, RULE_MANDATORY_FEATURE, old.mandatory_features, new.mandatory_features
+    ))
+
+    if old.age_rating_system != new.age_rating_system:
+        changes.append(PolicyChange(country, RULE_AGE_RATING_SYSTEM, "changed", new.age_rating_system))
+
+    return changes
+
+
+def diff_policies(old: PolicyRuleSet, new: PolicyRuleSet) -> PolicyDiff:
+    """
+    Compute the minimal set of rule changes between two compiled policy versions
+
+    Informational policy fields that the scanner does not evaluate are ignored,
+    so a diff is empty whenever every check would return the same result.
+    """
+    changes: List[PolicyChange] = []
+    for country, policy in new.policies.items():
+        if country not in old.policies:
+            changes.append(PolicyChange(country, RULE_COUNTRY, "added"))
+        else:
+            changes.extend(diff_country(old.policies[country], policy))
+    changes.extend(
+        PolicyChange(country, RULE_COUNTRY, "removed")
+        for country in old.policies
+        if country not in new.policies
+    )
+    return PolicyDiff(old.version, new.version, tuple(changes))
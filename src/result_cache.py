@@ -0,0 +1,218 @@
+"""
+Compliance result cache
+Caches ComplianceGuardrail.check_deployment results by a fingerprint of the
+metadata the checks actually read, the country and the policy version, so
+re-submitted content (retries, re-publishes, preview builds) is not re-checked.
+"""
+import hashlib
+import json
+import logging
+import sys
+import threading
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src import cache
+from src.compliance_scanner import ComplianceGuardrail, ComplianceResult
+from src.policy_compiler import PolicyRuleSet
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_REDIS_TTL = 3600
+DEFAULT_LOCAL_TTL = 24 * 3600
+REDIS_KEY_PREFIX = "compliance_result:"  # Also the statistics namespace of the in-process tier
+
+# Metadata fields read by the non-keyword checks
+_EXACT_FIELDS = ('features', 'age_rating_system')
+
+
+def result_fingerprint(rules: PolicyRuleSet, country: str, content_metadata: Dict,
+                       ad_schedule: Optional[Dict], current_time: datetime) -> str:
+    """
+    Canonical hash of everything a check_deployment result depends on
+
+    Searchable fields are hashed in their lowercased form, which is all the
+    keyword scan sees. The evaluation time only enters the key when the
+    country has an ad rule for the scheduled ad type: messages are rendered
+    at minute precision, and the window bounds additionally distinguish the
+    exact minute from any later second within it.
+    """
+    parts = [rules.version, country]
+    policy = rules.policies.get(country)
+    if policy is not None:
+        for field in ComplianceGuardrail.SEARCHABLE_FIELDS:
+            if field in content_metadata:
+                parts.append((field, str(content_metadata[field]).lower()))
+        for field in _EXACT_FIELDS:
+            if field in content_metadata:
+                parts.append((field, content_metadata[field]))
+        if ad_schedule and policy.ad_rules and policy.ad_rules_for(ad_schedule.get('ad_type', '')):
+            on_the_minute = current_time.second == 0 and current_time.microsecond == 0
+            parts.append(('ad', ad_schedule.get('ad_type'), current_time.strftime('%H:%M'), on_the_minute))
+
+    # repr() escapes separators inside values, and is several times cheaper than sorted JSON
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _copy_result(result: ComplianceResult) -> ComplianceResult:
+    """Independent copy stamped with the current time, as a fresh check would be"""
+    now = datetime.now().isoformat()
+    violations = [dict(v) for v in result.violations]
+    for violation in violations:
+        if 'timestamp' in violation:
+            violation['timestamp'] = now
+    copy = ComplianceResult(result.status, result.country, violations, result.policy_version)
+    copy.timestamp = now
+    return copy
+
+
+class ResultCache:
+    """
+    Result cache in front of a ComplianceGuardrail
+
+    The in-process tier is a src.cache.MemoryCache (LRU bounded by entries
+    and bytes); the optional shared tier is the Redis backend of src.cache.
+    """
+
+    def __init__(self, guardrail: ComplianceGuardrail, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 use_redis: bool = False, redis_ttl: int = DEFAULT_REDIS_TTL,
+                 local_ttl: float = DEFAULT_LOCAL_TTL):
+        """
+        Args:
+            guardrail: Guardrail that evaluates cache misses
+            max_entries: Maximum number of results kept in process
+            use_redis: Also share results through the Redis backend in src/cache.py
+                (ignored when it is not configured, skipped while its circuit breaker is open)
+            redis_ttl: Expiry of shared results in seconds
+            local_ttl: Expiry of in-process results in seconds (a policy reload clears them anyway)
+        """
+        self.guardrail = guardrail
+        self.max_entries = max_entries
+        self.redis_ttl = redis_ttl
+        self.local_ttl = local_ttl
+        self.shared = use_redis and cache.shared_cache_enabled()
+        self._local = cache.MemoryCache(max_entries)
+        self._lock = threading.Lock()
+        self._shared_hits = 0  # Local misses answered by the shared tier
+
+        # Results of older policy versions can never be hit again. The guardrail only
+        # holds a weak reference, and the listener is removed when this cache is collected.
+        self_ref = weakref.ref(self)
+
+        def clear_on_reload(old_rules, new_rules):
+            result_cache = self_ref()
+            if result_cache is not None:
+                result_cache.clear()
+
+        guardrail.add_reload_listener(clear_on_reload)
+        weakref.finalize(self, guardrail.remove_reload_listener, clear_on_reload)
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    @property
+    def hits(self) -> int:
+        return self._local.stats()['hits'] + self._shared_hits
+
+    @property
+    def misses(self) -> int:
+        return self._local.stats()['misses'] - self._shared_hits
+
+    @property
+    def evictions(self) -> int:
+        return self._local.stats()['evictions']
+
+    def check_deployment(self, country: str, content_metadata: Dict,
+                         ad_schedule: Optional[Dict] = None,
+                         current_time: Optional[datetime] = None) -> ComplianceResult:
+        """Cached equivalent of ComplianceGuardrail.check_deployment"""
+        rules = self.guardrail.rules
+        current_time = current_time or datetime.now()
+        key = result_fingerprint(rules, country, content_metadata, ad_schedule, current_time)
+
+        cached = self._get(key)
+        if cached is not None:
+            return _copy_result(cached)
+
+        result = self.guardrail.check_deployment(country, content_metadata, ad_schedule, current_time)
+        # A reload between fingerprinting and checking would file the result under the wrong version
+        if result.policy_version == rules.version:
+            self._put(key, _copy_result(result))
+        return result
+
+    def batch_check(self, deployments: List[Dict]) -> Dict[str, ComplianceResult]:
+        """Cached equivalent of a serial ComplianceGuardrail.batch_check"""
+        return {
+            ComplianceGuardrail._batch_key(deployment, idx): self.check_deployment(
+                deployment.get('country'),
+                deployment.get('content_metadata', {}),
+                deployment.get('ad_schedule')
+            )
+            for idx, deployment in enumerate(deployments)
+        }
+
+    def _get(self, key: str) -> Optional[ComplianceResult]:
+        result = self._local.get(REDIS_KEY_PREFIX + key)
+        if result is not None:
+            return result
+        result = self._get_shared(key)
+        if result is not None:
+            with self._lock:
+                self._shared_hits += 1
+            self._put(key, result, share=False)
+        return result
+
+    def _put(self, key: str, result: ComplianceResult, share: bool = True):
+        self._local.set(REDIS_KEY_PREFIX + key, result, self.local_ttl)
+        if share:
+            self._put_shared(key, result)
+
+    def _get_shared(self, key: str) -> Optional[ComplianceResult]:
+        if not self.shared:
+            return None
+        cached = cache.get_shared(REDIS_KEY_PREFIX + key)
+        if not cached:
+            return None
+        try:
+            data = json.loads(cached)
+            return ComplianceResult(data['status'], data['country'], data['violations'], data['policy_version'])
+        except (ValueError, KeyError, TypeError) as e:
+            # Corrupt or written by an incompatible version: a miss, and the key is dropped
+            logger.warning(f"Discarding unreadable shared result {key}: {e}")
+            cache.delete_shared(REDIS_KEY_PREFIX + key)
+            return None
+
+    def _put_shared(self, key: str, result: ComplianceResult):
+        if not self.shared:
+            return
+        data = {
+            'status': result.status,
+            'country': result.country,
+            'violations': result.violations,
+            'policy_version': result.policy_version
+        }
+        cache.set_shared(REDIS_KEY_PREFIX + key, json.dumps(data, ensure_ascii=False), self.redis_ttl)
+
+    def clear(self):
+        """Drop all in-process entries (shared entries expire on their own)"""
+        self._local.clear()
+
+    def stats(self) -> Dict:
+        """Cache statistics in the shape of src.cache.get_cache_stats"""
+        local = self._local.stats()
+        hits = local['hits'] + self._shared_hits
+        misses = local['misses'] - self._shared_hits
+        return {
+            'type': 'redis' if self.shared else 'memory',
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'evictions': local['evictions'],
+            'keys': local['keys'],
+            'max_entries': self.max_entries
+        }
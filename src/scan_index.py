@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Persistent scan index for incremental re-scans
+Stores the last compliance result of every deployment together with a
+token inverted index of its searchable text, so a policy change only
+re-checks the deployments that could change status.
+
+Usage:
+    python src/scan_index.py build catalog.jsonl
+    python src/scan_index.py rescan
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from itertools import tee
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.compliance_scanner import ComplianceGuardrail, ComplianceResult
+from src.policy_compiler import PolicyRuleSet, compile_policy_db
+from src.policy_diff import (
+    RULE_AD_RESTRICTION, RULE_AGE_RATING_SYSTEM, RULE_COUNTRY, RULE_FORBIDDEN_KEYWORD,
+    RULE_MANDATORY_FEATURE, RULE_VIOLATION_SEVERITY, PolicyDiff, diff_policies
+)
+
+
+DEFAULT_SCAN_INDEX = os.getenv('SCAN_INDEX_PATH', 'reports/scan_index.db')
+INSERT_BATCH_SIZE = 1000
+
+_TOKEN_RE = re.compile(r'\w+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value BLOB
+);
+CREATE TABLE IF NOT EXISTS deployments (
+    key TEXT PRIMARY KEY,
+    country TEXT,
+    deployment TEXT NOT NULL,
+    has_ad_schedule INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT NOT NULL,
+    policy_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deployments_country ON deployments (country);
+CREATE TABLE IF NOT EXISTS tokens (
+    token TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (token, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS keyword_hits (
+    country TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (country, keyword, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_keyword_hits_key ON keyword_hits (key);
+"""
+
+
+def text_tokens(content_metadata: Dict) -> Set[str]:
+    """
+    Lowercased word tokens of the fields the keyword scan looks at
+
+    A keyword can only match text that contains every word token of the
+    keyword, so the token index always returns a superset of real matches.
+    """
+    tokens = set()
+    for field in ComplianceGuardrail.SEARCHABLE_FIELDS:
+        if field in content_metadata:
+            tokens.update(_TOKEN_RE.findall(str(content_metadata[field]).lower()))
+    return tokens
+
+
+class ScanIndex:
+    """SQLite-backed index of the latest scan result per deployment"""
+
+    def __init__(self, path: str = DEFAULT_SCAN_INDEX):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway index)
+        """
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM deployments").fetchone()[0]
+
+    @property
+    def rules(self) -> Optional[PolicyRuleSet]:
+        """Compiled policy the indexed results were evaluated against (recompiled from the stored JSON)"""
+        meta = dict(self.conn.execute(
+            "SELECT name, value FROM meta WHERE name IN ('policy_db', 'policy_version')"
+        ).fetchall())
+        if len(meta) < 2:
+            return None  # Empty index, or one written by a version that stored pickled rules
+        return compile_policy_db(json.loads(meta['policy_db']), version=meta['policy_version'])
+
+    def _set_rules(self, rules: PolicyRuleSet):
+        self.conn.execute("DELETE FROM meta WHERE name = 'rules'")
+        self.conn.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", [
+            ('policy_db', json.dumps(dict(rules.raw), ensure_ascii=False, default=str)),
+            ('policy_version', rules.version),
+        ])
+
+    def build(self, guardrail: ComplianceGuardrail, deployments: Iterable[Dict]) -> int:
+        """
+        Full scan: check every deployment and replace the index contents
+
+        Returns:
+            Number of indexed deployments
+        """
+        # Pin one policy version for the whole scan, even if the guardrail reloads meanwhile
+        rules = guardrail.rules
+        guardrail = ComplianceGuardrail.from_rules(rules)
+        count = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM deployments")
+            self.conn.execute("DELETE FROM tokens")
+            self.conn.execute("DELETE FROM keyword_hits")
+
+            # Keys are the batch_check / iter_check keys
+            checked, originals = tee(deployments)
+            batch = []
+            for deployment, (key, result) in zip(originals, guardrail.iter_check(checked)):
+                batch.append((key, deployment, result))
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    count += self._insert(batch)
+                    batch.clear()
+            count += self._insert(batch)
+            self._set_rules(rules)
+        return count
+
+    def _insert(self, batch: List, index_tokens: bool = True) -> int:
+        deployment_rows, token_rows, hit_rows = [], [], []
+        for key, deployment, result in batch:
+            country = deployment.get('country')
+            deployment_rows.append((
+                key, country, json.dumps(deployment, ensure_ascii=False, default=str),
+                int(bool(deployment.get('ad_schedule'))), result.status,
+                json.dumps(result.to_dict(), ensure_ascii=False), result.policy_version
+            ))
+            if index_tokens:
+                token_rows.extend((token, key) for token in text_tokens(deployment.get('content_metadata') or {}))
+            hit_rows.extend(self._hit_rows(key, result))
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO deployments VALUES (?, ?, ?, ?, ?, ?, ?)", deployment_rows
+        )
+        self.conn.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?)", token_rows)
+        self.conn.executemany("INSERT OR IGNORE INTO keyword_hits VALUES (?, ?, ?)", hit_rows)
+        return len(deployment_rows)
+
+    @staticmethod
+    def _hit_rows(key: str, result: ComplianceResult) -> List:
+        return [
+            (result.country, v['detected_content'], key)
+            for v in result.violations
+            if v['type'] == "FORBIDDEN_KEYWORD"
+        ]
+
+    def result(self, key: str) -> Optional[Dict]:
+        """Stored result dictionary for one deployment"""
+        row = self.conn.execute("SELECT result FROM deployments WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _keys(self, sql: str, params=()) -> Set[str]:
+        return {row[0] for row in self.conn.execute(sql, params)}
+
+    def keyword_candidates(self, country: str, keyword: str) -> Set[str]:
+        """Deployments to country whose text contains every word token of keyword"""
+        tokens = set(_TOKEN_RE.findall(keyword.lower()))
+        if not tokens:
+            # Keyword without word characters; the token index cannot narrow it down
+            return self._keys("SELECT key FROM deployments WHERE country = ?", (country,))
+
+        candidates = None
+        for token in tokens:
+            keys = self._keys(
+                "SELECT t.key FROM tokens t JOIN deployments d ON d.key = t.key "
+                "WHERE t.token = ? AND d.country = ?", (token, country)
+            )
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                break
+        return candidates
+
+    def affected_keys(self, diff: PolicyDiff) -> Set[str]:
+        """
+        Deployments whose result could change under diff
+
+        Keyword additions and removals are resolved through the token index,
+        severity changes through the stored keyword hits, ad rule changes
+        through the deployments that carry an ad schedule. Feature and age
+        rating changes depend on every deployment to the country.
+        """
+        affected = set()
+        countries_changed = False
+        for change in diff.changes:
+            country = change.country
+            if change.rule == RULE_FORBIDDEN_KEYWORD:
+                affected |= self.keyword_candidates(country, change.item)
+            elif change.rule == RULE_VIOLATION_SEVERITY:
+                affected |= self._keys("SELECT DISTINCT key FROM keyword_hits WHERE country = ?", (country,))
+            elif change.rule == RULE_AD_RESTRICTION:
+                affected |= self._keys(
+                    "SELECT key FROM deployments WHERE country = ? AND has_ad_schedule = 1", (country,)
+                )
+            elif change.rule in (RULE_COUNTRY, RULE_MANDATORY_FEATURE, RULE_AGE_RATING_SYSTEM):
+                affected |= self._keys("SELECT key FROM deployments WHERE country = ?", (country,))
+                countries_changed = countries_changed or change.rule == RULE_COUNTRY
+
+        if countries_changed:
+            # UNKNOWN_COUNTRY messages list the supported countries
+            known = set(self.rules.policies) | {c.country for c in diff.changes}
+            affected |= {
+                key for key, country in self.conn.execute("SELECT key, country FROM deployments")
+                if country not in known
+            }
+        return affected
+
+    def rescan(self, guardrail: ComplianceGuardrail,
+               diff: Optional[PolicyDiff] = None) -> Dict[str, ComplianceResult]:
+        """
+        Re-check only the deployments affected by a policy change
+
+        Args:
+            guardrail: Guardrail holding the new policy version
+            diff: Policy diff to apply (default: indexed policy vs. guardrail policy)
+
+        Returns:
+            New results for the re-checked deployments
+        """
+        rules = guardrail.rules
+        indexed_rules = self.rules
+        if indexed_rules is None:
+            raise ValueError("Scan index is empty; run a full build first")
+        if diff is None:
+            diff = diff_policies(indexed_rules, rules)
+        if diff.old_version != indexed_rules.version:
+            raise ValueError(
+                f"Diff starts at policy {diff.old_version}, index holds {indexed_rules.version}"
+            )
+        if diff.new_version != rules.version:
+            raise ValueError(
+                f"Diff ends at policy {diff.new_version}, guardrail holds {rules.version}"
+            )
+
+        guardrail = ComplianceGuardrail.from_rules(rules)
+        keys = sorted(self.affected_keys(diff))
+        results = {}
+        with self.conn:
+            for start in range(0, len(keys), INSERT_BATCH_SIZE):
+                chunk = keys[start:start + INSERT_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, deployment FROM deployments WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                batch = []
+                for key, deployment_json in rows:
+                    deployment = json.loads(deployment_json)
+                    result = guardrail.check_deployment(
+                        deployment.get('country'),
+                        deployment.get('content_metadata', {}),
+                        deployment.get('ad_schedule')
+                    )
+                    results[key] = result
+                    batch.append((key, deployment, result))
+                self.conn.executemany(
+                    "DELETE FROM keyword_hits WHERE key = ?", [(key,) for key in chunk]
+                )
+                # Content is unchanged, so the token index is still valid
+                self._insert(batch, index_tokens=False)
+
+            # Results outside the diff stay valid; they keep the version they were evaluated against
+            self._set_rules(rules)
+        return results
+
+
+def main(argv=None) -> int:
+    """CLI entry point"""
+    from src.stream_scanner import detect_format, read_deployments
+
+    parser = argparse.ArgumentParser(description='Incremental compliance re-scan over a persisted scan index')
+    parser.add_argument('--index', default=DEFAULT_SCAN_INDEX, help='Scan index database path')
+    parser.add_argument('--policy', default='config/policy_rules.yaml', help='Policy database path')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Full scan of a catalog into the index')
+    build.add_argument('input', help='JSONL or YAML deployment catalog')
+    subparsers.add_parser('rescan', help='Re-check deployments affected by policy changes since the last scan')
+    args = parser.parse_args(argv)
+
+    guardrail = ComplianceGuardrail(args.policy)
+    with ScanIndex(args.index) as index:
+        if args.command == 'build':
+            with open(args.input, 'r', encoding='utf-8') as f:
+                count = index.build(guardrail, read_deployments(f, detect_format(args.input)))
+            print(f"Indexed {count} deployments (policy {guardrail.policy_version})")
+            return 0
+
+        indexed_rules = index.rules
+        if indexed_rules is None:
+            print("Scan index is empty; run 'build' first", file=sys.stderr)
+            return 1
+        diff = diff_policies(indexed_rules, guardrail.rules)
+        for change in diff.changes:
+            print(f"  {change}")
+        old_status = {key: index.result(key)['status'] for key in index.affected_keys(diff)}
+        results = index.rescan(guardrail, diff)
+        flipped = [key for key, result in results.items() if result.status != old_status.get(key)]
+        print(f"Policy {diff.old_version} -> {diff.new_version}: {len(diff.changes)} change(s), "
+              f"re-checked {len(results)} of {len(index)} deployments, {len(flipped)} changed status")
+        for key in sorted(flipped):
+            print(f"  {key}: {old_status.get(key)} -> {results[key].status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
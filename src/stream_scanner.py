@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming Compliance Scanner
+Scans deployment catalogs from newline-delimited JSON or (multi-document)
+YAML files, or stdin, and writes one JSON result per line as it goes.
+Memory use stays flat regardless of catalog size.
+
+Usage:
+    python src/stream_scanner.py catalog.jsonl -o results.jsonl
+    cat catalog.jsonl | python src/stream_scanner.py --format jsonl
+    python src/stream_scanner.py test_data/sample_deployments.yaml
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, IO, Iterator
+
+import yaml
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.compliance_scanner import ComplianceGuardrail, ComplianceSummary
+
+
+YAML_SUFFIXES = ('.yaml', '.yml')
+
+
+def detect_format(path: str) -> str:
+    """Guess the input format from the file extension (stdin defaults to jsonl)"""
+    suffix = Path(path).suffix.lower()
+    if suffix in YAML_SUFFIXES:
+        return 'yaml'
+    return 'jsonl'
+
+
+def read_jsonl(stream: IO) -> Iterator[Dict]:
+    """Yield one deployment per non-empty line"""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_no}: {e}")
+
+
+def read_yaml(stream: IO) -> Iterator[Dict]:
+    """
+    Yield deployments from a YAML stream, one document at a time
+
+    Each document may be a single deployment, a list of deployments or a
+    mapping of named deployments (the test_data/sample_deployments.yaml layout).
+    """
+    for document in yaml.safe_load_all(stream):
+        yield from _expand_document(document)
+
+
+def _expand_document(document) -> Iterator[Dict]:
+    if isinstance(document, list):
+        for item in document:
+            if isinstance(item, dict):
+                yield item
+    elif isinstance(document, dict):
+        if 'country' in document:
+            yield document
+        else:
+            for item in document.values():
+                if isinstance(item, dict) and 'country' in item:
+                    yield item
+
+
+def read_deployments(stream: IO, fmt: str = 'jsonl') -> Iterator[Dict]:
+    """Yield deployments lazily from a stream in the given format"""
+    if fmt == 'yaml':
+        return read_yaml(stream)
+    return read_jsonl(stream)
+
+
+def scan_stream(guardrail: ComplianceGuardrail, source: IO, sink: IO,
+                fmt: str = 'jsonl') -> ComplianceSummary:
+    """
+    Check every deployment in source and write JSONL results to sink
+
+    Returns:
+        Status counters accumulated while streaming
+    """
+    summary = ComplianceSummary()
+    for key, result in guardrail.iter_check(read_deployments(source, fmt), summary):
+        record = {"id": key}
+        record.update(result.to_dict())
+        sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return summary
+
+
+def main(argv=None) -> int:
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Streaming compliance scan over JSONL / YAML deployments')
+    parser.add_argument('input', nargs='?', default='-', help='Input file (default: stdin)')
+    parser.add_argument('-o', '--output', default='-', help='JSONL output file (default: stdout)')
+    parser.add_argument('--format', choices=['jsonl', 'yaml'], help='Input format (default: by extension)')
+    parser.add_argument('--policy', default='config/policy_rules.yaml', help='Policy database path')
+    parser.add_argument('--report', help='Also write the summary compliance report to this file')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('jsonl' if args.input == '-' else detect_format(args.input))
+    guardrail = ComplianceGuardrail(args.policy)
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = scan_stream(guardrail, source, sink, fmt)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    report = guardrail.generate_compliance_report({}, summary)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    print(report, file=sys.stderr)
+    return 1 if summary.critical else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Indexed queries over the regulatory update log
+Keeps the flattened updates of the update log in memory, sorted by
+timestamp with per-country and per-source postings, so the dashboard's
+top-N, time-range and per-country queries cost O(log n + k) instead of a
+full load, parse and sort of the log on every request. The index follows
+the log's files (size and mtime) and reads only appended lines.
+"""
+import os
+import sys
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.fork_safety import after_fork_in_child
+from src.update_log import UpdateLogStore
+
+
+def _stat_signature(path) -> Optional[Tuple[int, int]]:
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def format_update(update: Dict, timestamp: str) -> Dict:
+    """Dashboard representation of one update of a run logged at timestamp"""
+    try:
+        update_time = datetime.fromisoformat(timestamp)
+        date_str = update_time.strftime('%Y-%m-%d')
+        time_str = update_time.strftime('%H:%M')
+    except (TypeError, ValueError):
+        date_str = timestamp[:10] if timestamp else 'N/A'
+        time_str = ''
+    return {
+        'source': update.get('source', 'Unknown'),
+        'country': update.get('country', 'Unknown'),
+        'title': update.get('title', 'Policy Update'),
+        'url': update.get('url', ''),
+        'confidence': update.get('confidence', 'medium'),
+        'status': update.get('status', 'pending_review'),
+        'date': date_str,
+        'time': time_str,
+        'timestamp': timestamp,
+        'summary': update.get('summary', update.get('title', 'Regulatory update detected'))
+    }
+
+
+class _Postings:
+    """
+    Updates sorted by (timestamp, -sequence number), so reading backwards
+    lists the newest run first and a run's updates in their logged order
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[str, int]] = []
+        self.items: Dict[Tuple[str, int], Dict] = {}
+
+    def add(self, key: Tuple[str, int], item: Dict):
+        # The log is appended in time order, so this lands at (or next to) the end
+        insort(self.keys, key)
+        self.items[key] = item
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def bounds(self, since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+        """Positions of the timestamps in [since, until)"""
+        lo = bisect_left(self.keys, (since, float('-inf'))) if since is not None else 0
+        hi = bisect_left(self.keys, (until, float('-inf'))) if until is not None else len(self.keys)
+        return lo, hi
+
+    def newest(self, lo: int, hi: int, limit: Optional[int]) -> List[Dict]:
+        start = hi - limit if limit is not None else lo
+        return [self.items[self.keys[i]] for i in range(hi - 1, max(lo, start) - 1, -1)]
+
+
+class UpdateIndex:
+    """In-memory, incrementally maintained index of an UpdateLogStore"""
+
+    def __init__(self, store: Optional[UpdateLogStore] = None):
+        self.store = store or UpdateLogStore()
+        self._lock = threading.Lock()
+        self._reset()
+        after_fork_in_child(self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self._all = _Postings()
+        self._by_country: Dict[str, _Postings] = {}
+        self._by_source: Dict[str, _Postings] = {}
+        self._runs: List[Tuple[str, int]] = []   # (timestamp, sequence)
+        self._run_items: Dict[Tuple[str, int], Dict] = {}
+        self._sequence = 0
+        self._files: Optional[Tuple] = None      # Signature of the files indexed so far
+        self._active: Optional[str] = None
+        self._active_signature: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+    def recent(self, n: int, country: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """The n newest updates, newest first"""
+        return self.range(limit=n, country=country, source=source)
+
+    def range(self, since: Optional[str] = None, until: Optional[str] = None, limit: Optional[int] = None,
+              country: Optional[str] = None, source: Optional[str] = None) -> List[Dict]:
+        """Updates logged from `since` up to, not including, `until` (ISO timestamps), newest first"""
+        postings = self._postings(country, source)
+        if postings is None:
+            return []
+        with self._lock:
+            lo, hi = postings.bounds(since, until)
+            return postings.newest(lo, hi, limit)
+
+    def count(self, since: Optional[str] = None, until: Optional[str] = None,
+              country: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Number of updates range() would return without a limit"""
+        postings = self._postings(country, source)
+        if postings is None:
+            return 0
+        with self._lock:
+            lo, hi = postings.bounds(since, until)
+            return hi - lo
+
+    def latest_runs(self, n: int) -> List[Dict]:
+        """The n most recent run entries, oldest first"""
+        self.refresh()
+        with self._lock:
+            return [self._run_items[key] for key in self._runs[max(0, len(self._runs) - n):]]
+
+    def run_count(self, since: Optional[str] = None) -> int:
+        """Number of logged runs (from `since` on)"""
+        self.refresh()
+        with self._lock:
+            lo = bisect_left(self._runs, (since, -1)) if since is not None else 0
+            return len(self._runs) - lo
+
+    def _postings(self, country: Optional[str], source: Optional[str]) -> Optional[_Postings]:
+        if country is not None and source is not None:
+            raise ValueError("Filter by country or by source, not both")
+        self.refresh()
+        if country is not None:
+            return self._by_country.get(country)
+        if source is not None:
+            return self._by_source.get(source)
+        return self._all
+
+    def refresh(self) -> None:
+        """Index lines appended since the last refresh; rebuild if segments were rotated or rewritten"""
+        store = self.store
+        manifest = _stat_signature(store.manifest_path)
+        files = ('legacy', _stat_signature(store.legacy_path)) if manifest is None else ('store', manifest)
+        with self._lock:
+            if files == self._files and manifest is not None:
+                if _stat_signature(store.directory / self._active) != self._active_signature:
+                    self._read_active()
+                return
+            if files == self._files:
+                return
+            self._reset()
+            self._files = files
+            if manifest is None:
+                for entry in store.iter_entries():
+                    self._add_run(entry)
+                return
+            layout = store.layout()
+            if layout is None:
+                return
+            sealed, self._active = layout
+            for name in sealed:
+                for entry in store.read_segment(name)[0]:
+                    self._add_run(entry)
+            self._read_active()
+
+    def _read_active(self):
+        path = self.store.directory / self._active
+        self._active_signature = _stat_signature(path)
+        entries, self._offset = self.store.read_segment(self._active, self._offset)
+        for entry in entries:
+            self._add_run(entry)
+
+    def _add_run(self, entry: Dict):
+        timestamp = entry.get('timestamp', '')
+        key = (timestamp, self._sequence)
+        self._sequence += 1
+        if not self._runs or key > self._runs[-1]:
+            self._runs.append(key)
+        else:
+            insort(self._runs, key)
+        self._run_items[key] = entry
+        for update in entry.get('updates', []):
+            item = format_update(update, timestamp)
+            update_key = (timestamp, -self._sequence)
+            self._sequence += 1
+            self._all.add(update_key, item)
+            self._by_country.setdefault(item['country'], _Postings()).add(update_key, item)
+            self._by_source.setdefault(item['source'], _Postings()).add(update_key, item)
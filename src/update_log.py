@@ -0,0 +1,350 @@
+"""
+Append-only regulatory update log
+Stores one JSON line per monitoring run in size-rotated segment files under
+reports/update_log/, so saving a run is O(1) and history is never truncated.
+Writers take an exclusive file lock, so the scheduler and the dashboard's
+check-now endpoint can save concurrently; segment reads take the shared
+lock, so compaction never removes a file mid-read. The cross-process locks
+need fcntl (POSIX); elsewhere only threads of one process are serialized.
+
+Layout:
+    manifest.json             sealed segments with entry counts and time ranges
+    segment-000001.jsonl.gz   sealed, compacted segment
+    segment-000002.jsonl      active segment, appended to
+
+Usage:
+    python src/update_log.py stats
+    python src/update_log.py compact
+    python src/update_log.py prune 2025-01-01
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.fork_safety import after_fork_in_child
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_UPDATE_LOG_DIR = "reports/update_log"
+LEGACY_UPDATE_LOG = "reports/policy_updates.json"
+DEFAULT_SEGMENT_MAX_BYTES = 1024 * 1024
+MANIFEST_FORMAT = 1
+SEGMENT_PATTERN = "segment-{:06d}.jsonl"
+
+
+@contextmanager
+def file_lock(path: Path, thread_lock: Optional[threading.Lock] = None, shared: bool = False):
+    """
+    Advisory lock on path (created if missing) across processes, exclusive
+    unless shared; thread_lock additionally serializes threads sharing one object
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with (thread_lock or threading.Lock()), open(path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class UpdateLogStore:
+    """Segmented JSONL log of monitoring runs ({timestamp, updates_count, fetch_stats, updates})"""
+
+    def __init__(self, directory: str = DEFAULT_UPDATE_LOG_DIR,
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+                 legacy_path: Optional[str] = LEGACY_UPDATE_LOG,
+                 fsync: bool = True):
+        """
+        Args:
+            directory: Directory holding the manifest and segments
+            segment_max_bytes: Size after which the active segment is sealed
+            legacy_path: policy_updates.json imported (once, left in place) when the store is new
+            fsync: Flush every append to disk before returning
+        """
+        if segment_max_bytes < 1:
+            raise ValueError("segment_max_bytes must be positive")
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.fsync = fsync
+        self._thread_lock = threading.Lock()
+        after_fork_in_child(self._after_fork)
+
+    def _after_fork(self):
+        self._thread_lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / "manifest.json"
+
+    def append(self, entry: Dict) -> None:
+        """Append one run entry; a single O_APPEND write, so readers never see half a line"""
+        line = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+        with self._locked() as manifest:
+            active = self.directory / manifest['active']
+            self._write_line(active, line)
+            if active.stat().st_size >= self.segment_max_bytes:
+                self._rotate(manifest)
+
+    def compact(self) -> int:
+        """Gzip sealed segments that are still plain JSONL; returns the number compacted"""
+        compacted = 0
+        with self._locked() as manifest:
+            for segment in manifest['segments']:
+                if segment['name'].endswith('.gz'):
+                    continue
+                source = self.directory / segment['name']
+                target = source.with_name(source.name + '.gz')
+                with open(source, 'rb') as f_in, gzip.open(target, 'wb') as f_out:
+                    f_out.write(f_in.read())
+                segment['name'] = target.name
+                self._write_manifest(manifest)
+                source.unlink()
+                compacted += 1
+        return compacted
+
+    def prune(self, before: str) -> int:
+        """
+        Explicitly delete sealed segments whose newest entry is older than the
+        ISO timestamp `before`; returns the number of entries removed
+        """
+        removed = 0
+        with self._locked() as manifest:
+            kept = []
+            for segment in manifest['segments']:
+                if segment['last_timestamp'] and segment['last_timestamp'] < before:
+                    (self.directory / segment['name']).unlink(missing_ok=True)
+                    removed += segment['entries']
+                else:
+                    kept.append(segment)
+            manifest['segments'] = kept
+            self._write_manifest(manifest)
+        if removed:
+            logger.info(f"Pruned {removed} update log entries older than {before}")
+        return removed
+
+    def clear(self) -> None:
+        """Delete every segment (the legacy file is not re-imported)"""
+        with self._locked() as manifest:
+            for name in [s['name'] for s in manifest['segments']] + [manifest['active']]:
+                (self.directory / name).unlink(missing_ok=True)
+            manifest['segments'] = []
+            manifest['active'] = SEGMENT_PATTERN.format(manifest['next_segment'])
+            manifest['next_segment'] += 1
+            self._write_manifest(manifest)
+
+    def iter_entries(self, since: Optional[str] = None, reverse: bool = False) -> Iterator[Dict]:
+        """
+        Entries in append order (newest first with reverse=True)
+
+        Sealed segments whose time range ends before the ISO timestamp
+        `since` are skipped without being opened.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            for entry in (reversed(self._legacy_entries()) if reverse else self._legacy_entries()):
+                if since is None or entry.get('timestamp', '') >= since:
+                    yield entry
+            return
+
+        segments = [s['name'] for s in manifest['segments']
+                    if since is None or not s['last_timestamp'] or s['last_timestamp'] >= since]
+        segments.append(manifest['active'])
+        for name in (reversed(segments) if reverse else segments):
+            entries, _ = self.read_segment(name)
+            for entry in (reversed(entries) if reverse else entries):
+                if since is None or entry.get('timestamp', '') >= since:
+                    yield entry
+
+    def read_entries(self, since: Optional[str] = None) -> List[Dict]:
+        """All entries (at or after `since`), oldest first"""
+        return list(self.iter_entries(since))
+
+    def latest(self, n: int) -> List[Dict]:
+        """The n most recent entries, oldest first, reading only the segments needed"""
+        entries = []
+        for entry in self.iter_entries(reverse=True):
+            if len(entries) >= n:
+                break
+            entries.append(entry)
+        return entries[::-1]
+
+    def layout(self) -> Optional[Tuple[List[str], str]]:
+        """(sealed segment names, active segment name), or None while only the legacy file exists"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        return [s['name'] for s in manifest['segments']], manifest['active']
+
+    def read_segment(self, name: str, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Entries of a segment starting at byte offset (plain segments only),
+        and the offset just past the last complete line
+
+        A line still being written, or torn by an interrupted writer, is not
+        consumed; a torn line followed by later appends is skipped. A plain
+        segment compacted since the caller read the manifest is read from
+        its .gz replacement (same bytes, so offsets still apply).
+        """
+        with file_lock(self.directory / ".lock", shared=True):
+            return self._read_segment(name, offset)
+
+    def _read_segment(self, name: str, offset: int = 0) -> Tuple[List[Dict], int]:
+        """read_segment() for callers that already hold the lock"""
+        path = self.directory / name
+        if path.suffix != '.gz' and not path.exists() and path.with_name(name + '.gz').exists():
+            path = path.with_name(name + '.gz')
+        try:
+            if path.suffix == '.gz':
+                with gzip.open(path, 'rb') as f:
+                    data = f.read()[offset:]
+                end = len(data)
+            else:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+                end = data.rfind(b"\n") + 1
+        except FileNotFoundError:
+            return [], offset
+        entries = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping unreadable line in {path}")
+        return entries, offset + end
+
+    def stats(self) -> Dict:
+        """Segment and entry counts"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return {'segments': 0, 'entries': len(self._legacy_entries()), 'migrated': False}
+        active_entries = len(self.read_segment(manifest['active'])[0])
+        return {
+            'segments': len(manifest['segments']) + 1,
+            'entries': sum(s['entries'] for s in manifest['segments']) + active_entries,
+            'migrated': manifest.get('migrated_from') is not None
+        }
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive writer lock across threads and processes, yielding the current manifest"""
+        with file_lock(self.directory / ".lock", self._thread_lock):
+            manifest = self._read_manifest()
+            if manifest is None:
+                manifest = self._initialize()
+            yield manifest
+
+    def _initialize(self) -> Dict:
+        """Create the manifest, importing the legacy JSON log into the first segment"""
+        manifest = {'format': MANIFEST_FORMAT, 'segments': [], 'next_segment': 2,
+                    'active': SEGMENT_PATTERN.format(1), 'migrated_from': None}
+        legacy = self._legacy_entries()
+        if legacy:
+            with open(self.directory / manifest['active'], 'ab') as f:
+                for entry in legacy:
+                    f.write((json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8'))
+            manifest['migrated_from'] = {'path': str(self.legacy_path), 'entries': len(legacy)}
+            logger.info(f"Imported {len(legacy)} entries from {self.legacy_path} into {self.directory}")
+            if (self.directory / manifest['active']).stat().st_size >= self.segment_max_bytes:
+                self._rotate(manifest)
+        self._write_manifest(manifest)
+        return manifest
+
+    def _rotate(self, manifest: Dict) -> None:
+        """Seal the active segment and start the next one"""
+        sealed = self.directory / manifest['active']
+        entries, _ = self._read_segment(sealed.name)
+        manifest['segments'].append({
+            'name': sealed.name,
+            'entries': len(entries),
+            'first_timestamp': entries[0].get('timestamp') if entries else None,
+            'last_timestamp': entries[-1].get('timestamp') if entries else None
+        })
+        manifest['active'] = SEGMENT_PATTERN.format(manifest['next_segment'])
+        manifest['next_segment'] += 1
+        self._write_manifest(manifest)
+
+    def _write_line(self, path: Path, line: bytes) -> None:
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)  # Reads only: O_APPEND writes still go to the end
+                if os.read(fd, 1) != b"\n":
+                    line = b"\n" + line  # Do not glue onto a line torn by an interrupted writer
+            os.write(fd, line)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        """Replace the manifest atomically"""
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported update log manifest format: {manifest.get('format')}")
+        return manifest
+
+    def _legacy_entries(self) -> List[Dict]:
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return []
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read legacy update log {self.legacy_path}: {e}")
+            return []
+        return entries if isinstance(entries, list) else []
+
+
+def main(argv=None) -> int:
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description='Maintain the append-only regulatory update log')
+    parser.add_argument('--dir', default=DEFAULT_UPDATE_LOG_DIR, help='Update log directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help='Show segment and entry counts')
+    subparsers.add_parser('compact', help='Gzip sealed segments')
+    prune = subparsers.add_parser('prune', help='Delete sealed segments older than a date')
+    prune.add_argument('before', help='ISO date or timestamp, e.g. 2025-01-01')
+    args = parser.parse_args(argv)
+
+    store = UpdateLogStore(args.dir)
+    if args.command == 'compact':
+        print(f"Compacted {store.compact()} segment(s)")
+    elif args.command == 'prune':
+        print(f"Removed {store.prune(args.before)} entries older than {args.before}")
+    print(json.dumps(store.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
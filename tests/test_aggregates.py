@@ -0,0 +1,168 @@
+"""
+Unit tests for the materialized dashboard aggregates
+"""
+import json
+import threading
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.aggregates import AggregateStore, categorize_issue, main
+from src.file_cache import FileCache
+from src.update_log import UpdateLogStore
+
+
+def run_entry(day: int, *countries) -> dict:
+    return {"timestamp": f"2026-01-{day:02d}T09:00:00", "updates_count": len(countries),
+            "updates": [{"source": "FCC", "country": country, "title": "Update"} for country in countries]}
+
+
+def write_report(path: Path, violations: dict):
+    report = {
+        "summary": {"total_checks": 10 * len(violations), "compliance_rate": 90.0},
+        "country_details": {
+            country: {"compliance_status": "compliant" if count == 0 else "partial",
+                      "total_checks": 10, "violations": count, "compliance_rate": 100 - 10 * count,
+                      "critical_issues": ["Missing age rating"] * count, "warnings": []}
+            for country, count in violations.items()
+        }
+    }
+    path.write_text(json.dumps(report))
+
+
+@pytest.fixture
+def log(tmp_path):
+    return UpdateLogStore(str(tmp_path / "update_log"), legacy_path=None, fsync=False)
+
+
+@pytest.fixture
+def store(tmp_path, log):
+    return AggregateStore(update_log=log, compliance_report=str(tmp_path / "compliance_report.json"),
+                          cache=FileCache("test"))
+
+
+class TestAggregateStore:
+    def test_default_path_next_to_update_log(self, tmp_path, log):
+        """Test the aggregates file lives beside the update log directory"""
+        assert AggregateStore(update_log=log).path == tmp_path / "aggregates.json"
+
+    def test_record_run_is_incremental(self, store, log):
+        """Test runs are folded in at write time without re-reading the log"""
+        for day, countries in ((1, ("Japan", "India")), (1, ()), (2, ("Japan",))):
+            store.record_run(run_entry(day, *countries))
+
+        log.clear()  # Aggregates no longer depend on the raw log
+        store.cache.invalidate()
+        updates = store.get()['updates']
+        assert updates['run_count'] == 3 and updates['total_updates'] == 3
+        assert updates['recent_daily_updates'] == {"2026-01-01": 2, "2026-01-02": 1}
+        assert updates['updates_by_country'] == {"Japan": 2, "India": 1}
+        assert updates['last_run'] == {"timestamp": "2026-01-02T09:00:00", "updates_count": 1}
+
+    def test_recent_daily_updates_window(self, store, log):
+        """Test /api/stats daily updates cover the last 30 runs only"""
+        for day in range(1, 32):
+            store.record_run(run_entry(day, "Japan"))
+        updates = store.get()['updates']
+        assert len(updates['recent_daily_updates']) == 30 and "2026-01-01" not in updates['recent_daily_updates']
+        assert updates['daily_updates']["2026-01-01"] == 1
+
+    def test_compliance_section(self, store):
+        """Test monitoring rows, category distribution and insights from the report"""
+        write_report(store.compliance_report, {"Japan": 0, "India": 2})
+        store.record_compliance_report()
+        compliance = store.get()['compliance']
+        assert compliance['total_checks'] == 20 and compliance['compliant_regions'] == 1
+        assert compliance['monitoring']['India']['critical_issues'] == 2
+        analytics = compliance['analytics']
+        assert analytics['violations_by_country'] == {"Japan": 0, "India": 2}
+        assert analytics['distribution_by_category']['Content Rating'] == 2
+        assert analytics['insights'][1]['value'] == "50%"
+
+    def test_report_rewritten_without_hook(self, store):
+        """Test a report written by another tool is picked up on the next read"""
+        write_report(store.compliance_report, {"Japan": 0})
+        assert store.get()['compliance']['analytics']['total_countries'] == 1
+        write_report(store.compliance_report, {"Japan": 0, "India": 1, "China": 3})
+        assert store.get()['compliance']['analytics']['total_countries'] == 3
+
+    def test_report_without_country_details(self, store):
+        """Test reports in the deployment-results format leave the compliance section empty"""
+        store.compliance_report.write_text(json.dumps({"generated_at": "x", "results": []}))
+        compliance = store.get()['compliance']
+        assert compliance['monitoring'] == {} and compliance['analytics'] is None
+
+    def test_rebuild_matches_incremental(self, store, log, tmp_path):
+        """Test rebuilding from the raw log reproduces the incrementally kept aggregates"""
+        write_report(store.compliance_report, {"Japan": 1})
+        for day in (1, 2, 2, 3):
+            store.record_run(run_entry(day, "Japan"))
+        incremental = json.loads(store.path.read_text())
+        store.path.unlink()
+        store.cache.invalidate()
+        rebuilt = store.get()  # Missing file: rebuilt from the raw files
+        for key in ('updates', 'compliance'):
+            assert json.loads(json.dumps(rebuilt[key])) == incremental[key]
+
+    def test_concurrent_writers_and_rebuilds_count_each_run_once(self, store, log, tmp_path):
+        """Test a rebuild racing with writers neither drops nor double counts runs"""
+        def writer(day):
+            other = AggregateStore(store.path, log, str(store.compliance_report), cache=FileCache("writer"))
+            for _ in range(5):
+                other.record_run(run_entry(day, "Japan"))
+
+        def reader():
+            for _ in range(5):
+                store.path.unlink(missing_ok=True)  # Force the next read to rebuild
+                store.cache.invalidate()
+                store.get()
+
+        threads = [threading.Thread(target=writer, args=(day,)) for day in range(1, 5)]
+        threads.append(threading.Thread(target=reader))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.cache.invalidate()
+        updates = store.get()['updates']
+        assert updates['run_count'] == len(log.read_entries()) == 20
+        assert updates['updates_by_country'] == {"Japan": 20}
+
+    def test_log_kept_when_aggregates_fail(self, store, log, monkeypatch):
+        """Test the run reaches the update log even if the aggregates cannot be written"""
+        def fail(aggregates):
+            raise OSError("disk full")
+        monkeypatch.setattr(store, "_write", fail)
+        store.record_run(run_entry(1, "Japan"))
+        assert len(log.read_entries()) == 1
+
+    def test_cli_rebuild(self, store, log, capsys):
+        """Test the recovery command"""
+        log.append(run_entry(1, "Japan"))
+        assert main(["--path", str(store.path), "--update-log", str(log.directory),
+                     "--compliance-report", str(store.compliance_report), "rebuild"]) == 0
+        assert "1 runs" in capsys.readouterr().out
+        assert json.loads(store.path.read_text())['updates']['run_count'] == 1
+
+    def test_save_update_log_records_run(self, log):
+        """Test the updater materializes each saved run"""
+        from src.policy_auto_updater import PolicyUpdateMonitor
+        monitor = PolicyUpdateMonitor(update_log=log)
+        monitor.save_update_log([{"source": "FCC", "country": "United_States", "title": "Rule"}])
+        monitor.close()
+        updates = monitor.aggregates.get()['updates']
+        assert updates['run_count'] == 1 and updates['updates_by_country'] == {"United_States": 1}
+
+
+class TestCategorizeIssue:
+    def test_categories(self):
+        """Test keyword categorization of compliance issues"""
+        assert categorize_issue("Missing age rating") == 'Content Rating'
+        assert categorize_issue("GDPR consent") == 'Privacy'
+        assert categorize_issue("Subtitle missing") == 'Accessibility'
+        assert categorize_issue("Unknown") == 'Other'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,58 @@
+"""
+Unit tests for the benchmark harness and synthetic catalog generator
+"""
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from generate_benchmark_report import compare_with_baseline, percentile, summarize
+from generate_sample_data import generate_deployment_catalog
+from src.compliance_scanner import ComplianceGuardrail
+
+
+POLICY = {
+    "Japan": {"forbidden_keywords": ["gambling"], "age_rating_system": "Eirin"},
+    "Spain": {"ad_restrictions": {"gambling_ads": "completely_forbidden"}},
+}
+
+
+class TestCatalogGenerator:
+    def test_reproducible(self):
+        """Test the same seed yields the same catalog"""
+        assert generate_deployment_catalog(50, POLICY, seed=7) == generate_deployment_catalog(50, POLICY, seed=7)
+        assert generate_deployment_catalog(50, POLICY, seed=7) != generate_deployment_catalog(50, POLICY, seed=8)
+
+    def test_catalog_is_checkable(self):
+        """Test generated deployments run through batch_check"""
+        catalog = generate_deployment_catalog(200, POLICY, keyword_rate=0.5)
+        assert {d['country'] for d in catalog} == set(POLICY)
+        results = ComplianceGuardrail.from_policy_db(POLICY).batch_check(catalog)
+        assert len(results) == 200
+        assert any(r.status != "PASS" for r in results.values())
+
+
+class TestBenchmarkStats:
+    def test_percentiles(self):
+        """Test interpolated percentiles"""
+        values = [0.001 * i for i in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(0.0505)
+        assert percentile(values, 100) == pytest.approx(0.1)
+        stats = summarize(values)
+        assert stats['samples'] == 100
+        assert stats['p99_ms'] == pytest.approx(99.01)
+
+    def test_regression_detection(self):
+        """Test benchmarks slower than the threshold are flagged"""
+        baseline = {"generated_date": "2026-01-01", "benchmarks": {
+            "fast": {"p50_ms": 1.0}, "slow": {"p50_ms": 1.0}}}
+        current = {"fast": {"p50_ms": 1.1}, "slow": {"p50_ms": 1.5}, "new": {"p50_ms": 3.0}}
+        comparison = compare_with_baseline(current, baseline, threshold=0.2)
+        assert comparison['regressions'] == ["slow"]
+        assert set(comparison['benchmarks']) == {"fast", "slow"}
+        assert compare_with_baseline(current, None, 0.2)['regressions'] == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,647 @@
+"""
+Unit tests for the caching module
+"""
+import threading
+import time
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src import cache as cache_module
+from src.cache import (CacheSweeper, MemoryCache, SingleFlight, cache, cache_key, configure_cache,
+                       country_namespace, get_cache_stats, invalidate_cache, invalidate_namespace,
+                       invalidate_on_policy_reload)
+from src.compliance_scanner import ComplianceResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_generations(monkeypatch):
+    monkeypatch.setattr(cache_module, "_generations", {})
+
+
+@pytest.fixture
+def memory_backend():
+    """Decorator backed by a fresh in-process cache"""
+    previous = cache_module.REDIS_AVAILABLE, cache_module.memory_cache
+    configure_cache('memory', max_entries=100)
+    yield cache_module.memory_cache
+    cache_module.REDIS_AVAILABLE, cache_module.memory_cache = previous
+
+
+def by_country():
+    """Cached function namespaced per country, recording its calls"""
+    calls = []
+
+    @cache(ttl=60, beta=0, namespace=country_namespace)
+    def check(country):
+        calls.append(country)
+        return {"country": country, "run": len(calls)}
+
+    return check, calls
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    """Two-tier mode over an in-process Redis stand-in"""
+    fakeredis = pytest.importorskip("fakeredis")
+    for name in ('REDIS_AVAILABLE', 'local_cache', 'local_ttl'):
+        monkeypatch.setattr(cache_module, name, getattr(cache_module, name))
+    monkeypatch.setattr(cache_module, 'redis_client', getattr(cache_module, 'redis_client', None), raising=False)
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer())  # Binary replies, like the module's own client
+    configure_cache('redis', client=client, local_ttl_seconds=5)
+    return client
+
+
+@pytest.fixture
+def redis_down(redis_backend, monkeypatch):
+    """Two-tier mode whose Redis stops answering; yields the server to bring it back"""
+    breaker = cache_module.redis_breaker
+    for name in ('threshold', 'initial_threshold', 'probe_interval'):
+        monkeypatch.setattr(breaker, name, getattr(breaker, name))
+    breaker.threshold = breaker.initial_threshold = 2
+    breaker.probe_interval = 3600  # Tests probe explicitly unless they shorten it
+    monkeypatch.setattr(cache_module, 'memory_cache', MemoryCache(100))
+    server = redis_backend.connection_pool.connection_kwargs['server']
+    server.connected = False
+    yield server
+    server.connected = True
+    breaker.reset()
+    cache_module._missed_invalidations.clear()
+
+
+def call_concurrently(func, n):
+    """Call func from n threads released at once; returns their results"""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestMemoryCache:
+    def test_wall_clock_ttl(self):
+        """Test entries expire by time, not by number of reads"""
+        clock = FakeClock()
+        store = MemoryCache(clock=clock)
+        store.set("f:a", "1", ttl=10)
+        for _ in range(20):
+            assert store.get("f:a") == "1"
+        clock.now += 10
+        assert store.get("f:a") is None
+        assert store.stats()['functions']['f']['expirations'] == 1
+
+    def test_lru_eviction_by_entries(self):
+        """Test the least recently used entry is evicted first"""
+        store = MemoryCache(max_entries=2)
+        store.set("f:a", "1", 60)
+        store.set("f:b", "2", 60)
+        store.get("f:a")
+        store.set("f:c", "3", 60)
+        assert store.get("f:b") is None and store.get("f:a") == "1" and store.get("f:c") == "3"
+        assert store.stats()['evictions'] == 1
+
+    def test_max_bytes(self):
+        """Test the payload size bound and oversized values"""
+        store = MemoryCache(max_bytes=100)
+        assert not store.set("f:huge", "x" * 200, 60)
+        for i in range(10):
+            store.set(f"f:{i}", "x" * 20, 60)
+        stats = store.stats()
+        assert stats['bytes'] <= 100 and stats['keys'] == 4
+        assert store.get("f:9") is not None and store.get("f:0") is None
+
+    def test_overwrite_keeps_size_accounting(self):
+        """Test replacing a key does not leak its old size"""
+        store = MemoryCache()
+        store.set("f:a", "x" * 50, 60)
+        store.set("f:a", "x" * 10, 60)
+        assert store.stats()['bytes'] == len("f:a") + 10 and len(store) == 1
+
+    def test_per_namespace_stats(self):
+        """Test hits and misses are reported per decorated function"""
+        store = MemoryCache()
+        store.set("alpha:1", "1", 60)
+        store.get("alpha:1")
+        store.get("alpha:2")
+        store.get("beta:1")
+        functions = store.stats()['functions']
+        assert functions['alpha']['hits'] == 1 and functions['alpha']['misses'] == 1
+        assert functions['alpha']['hit_rate'] == 0.5
+        assert functions['beta']['misses'] == 1
+
+    def test_purge_expired(self):
+        """Test expired entries can be dropped without being read"""
+        clock = FakeClock()
+        store = MemoryCache(clock=clock)
+        store.set("f:a", "1", 5)
+        store.set("f:b", "2", 50)
+        clock.now += 10
+        assert store.purge_expired() == 1 and len(store) == 1
+
+    def test_concurrent_access(self):
+        """Test limits hold under concurrent writers"""
+        store = MemoryCache(max_entries=50)
+
+        def worker(n):
+            for i in range(500):
+                store.set(f"f:{n}-{i}", "v", 60)
+                store.get(f"f:{n}-{i // 2}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = store.stats()
+        assert stats['keys'] == 50 and stats['bytes'] == sum(e[2] for e in store._entries.values())
+
+    def test_invalid_limits(self):
+        """Test limits must be positive"""
+        with pytest.raises(ValueError):
+            MemoryCache(max_entries=0)
+
+
+class TestCacheDecorator:
+    def test_memory_backend_caches_until_ttl(self, memory_backend, monkeypatch):
+        """Test the decorator serves hits from the memory backend until the TTL passes"""
+        clock = FakeClock()
+        monkeypatch.setattr(memory_backend, "clock", clock)
+        calls = []
+
+        @cache(ttl=30)
+        def lookup(country):
+            calls.append(country)
+            return {"country": country}
+
+        assert lookup("Japan") == lookup("Japan") == {"country": "Japan"}
+        assert len(calls) == 1
+        clock.now += 31
+        lookup("Japan")
+        assert len(calls) == 2
+
+    def test_stats_and_invalidation(self, memory_backend):
+        """Test get_cache_stats reports the memory backend per function"""
+        @cache(ttl=30)
+        def lookup(country):
+            return country
+
+        lookup("Japan")
+        lookup("Japan")
+        stats = get_cache_stats()
+        assert stats['type'] == 'memory' and stats['keys'] == 1
+        assert stats['functions']['lookup']['hits'] == 1
+        invalidate_cache()
+        assert get_cache_stats()['keys'] == 0
+
+    def test_memory_backend_keeps_types(self, memory_backend):
+        """Test tuples and datetimes come back from the memory backend unchanged"""
+        from datetime import datetime
+        calls = []
+
+        @cache(ttl=30)
+        def checked_at(country):
+            calls.append(country)
+            return (country, datetime(2026, 1, 1, 12, 0))
+
+        assert checked_at("Japan") == checked_at("Japan") == ("Japan", datetime(2026, 1, 1, 12, 0))
+        assert isinstance(checked_at("Japan"), tuple) and len(calls) == 1
+
+    def test_unserializable_result_is_returned_uncached(self, redis_backend, caplog):
+        """Test a result the serializer cannot encode reaches the caller instead of raising"""
+        from datetime import datetime
+        calls = []
+
+        @cache(ttl=30, serializer='json')
+        def checked_at(country):
+            calls.append(country)
+            return datetime(2026, 1, 1, 12, 0)
+
+        assert checked_at("Japan") == datetime(2026, 1, 1, 12, 0)
+        assert checked_at("Japan") == datetime(2026, 1, 1, 12, 0)
+        assert len(calls) == 2
+        assert "cannot be serialized" in caplog.text
+
+    def test_unknown_backend(self):
+        """Test only known backends can be selected"""
+        with pytest.raises(ValueError):
+            configure_cache('memcached')
+
+
+class TestTwoTierCache:
+    def test_l1_answers_repeated_reads(self, redis_backend, monkeypatch):
+        """Test the local tier serves repeated reads without a Redis round trip"""
+        @cache(ttl=60)
+        def lookup(country):
+            return {"country": country}
+
+        lookup("Japan")
+        reads = []
+        original_get = redis_backend.get
+        monkeypatch.setattr(redis_backend, "get", lambda key: reads.append(key) or original_get(key))
+        assert lookup("Japan") == {"country": "Japan"}
+        assert reads == []
+        assert get_cache_stats()['local']['hits'] == 1
+
+    def test_l1_copies_expire(self, redis_backend):
+        """Test another process's write is seen once the L1 copy expires"""
+        clock = FakeClock()
+        cache_module.local_cache.clock = clock
+        calls = []
+
+        @cache(ttl=60, beta=0)
+        def lookup(country):
+            calls.append(country)
+            return len(calls)
+
+        assert lookup("Japan") == 1
+        key = next(iter(cache_module.local_cache._entries))
+        redis_backend.set(key, cache_module._pack(42, 0.0, 60))  # Written by another process
+        assert lookup("Japan") == 1
+        clock.now += 6
+        assert lookup("Japan") == 42 and len(calls) == 1
+
+    def test_single_flight_per_process(self, redis_backend):
+        """Test concurrent misses of one key compute it once"""
+        calls = []
+
+        @cache(ttl=60)
+        def slow(country):
+            calls.append(country)
+            time.sleep(0.2)
+            return {"country": country}
+
+        results = call_concurrently(lambda: slow("Japan"), 8)
+        assert len(calls) == 1
+        assert all(result == {"country": "Japan"} for result in results)
+        assert results[0] is not results[1] or results[1] is not results[2]  # Waiters get copies
+        assert get_cache_stats()['coalesced'] == 7
+
+    def test_waits_for_other_process(self, redis_backend):
+        """Test a miss locked by another process waits for its value instead of recomputing"""
+        calls = []
+
+        @cache(ttl=60)
+        def lookup(country):
+            calls.append(country)
+            return "computed here"
+
+        lookup("Japan")
+        key = next(iter(cache_module.local_cache._entries))
+        redis_backend.flushall()
+        cache_module.local_cache.clear()
+        redis_backend.set(f"lock:{key}", "other-process")
+        threading.Timer(0.1, lambda: redis_backend.set(key, cache_module._pack("computed there", 0.0, 60))).start()
+        assert lookup("Japan") == "computed there"
+        assert len(calls) == 1
+
+    def test_memory_backend_coalesces(self, memory_backend):
+        """Test single-flight also applies without Redis"""
+        calls = []
+
+        @cache(ttl=60)
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 1
+
+        call_concurrently(slow, 4)
+        assert len(calls) == 1
+
+    def test_leader_and_waiters_get_same_types(self, redis_backend):
+        """Test the caller that computed a value gets the same decoded form as those that waited"""
+        @cache(ttl=60, serializer='json')
+        def slow_pair():
+            time.sleep(0.2)
+            return ("Japan", 1)
+
+        results = call_concurrently(slow_pair, 4)
+        assert results == [["Japan", 1]] * 4
+        assert slow_pair() == ["Japan", 1]
+
+    def test_early_refresh_count_is_exact(self, memory_backend):
+        """Test concurrent early refreshes are all counted"""
+        before = cache_module._flights.early_refreshes
+        call_concurrently(lambda: [cache_module._flights.record_early_refresh() for _ in range(1000)], 8)
+        assert cache_module._flights.early_refreshes - before == 8000
+
+
+class TestEarlyRefresh:
+    def test_refresh_before_expiry(self, memory_backend):
+        """Test a key is recomputed before expiry when early refresh triggers"""
+        calls = []
+
+        @cache(ttl=60, beta=1e9)
+        def eager():
+            calls.append(1)
+            time.sleep(0.01)
+            return len(calls)
+
+        @cache(ttl=60, beta=0)
+        def lazy():
+            calls.append(1)
+            return 0
+
+        eager()
+        assert eager() == 2
+        lazy()
+        lazy()
+        assert len(calls) == 3
+        assert get_cache_stats()['early_refreshes'] >= 1
+
+    def test_xfetch_probability(self):
+        """Test the XFetch condition at its limits"""
+        now = time.time()
+        assert not cache_module._should_refresh_early({'v': 1, 'd': 0.0, 'x': now + 100}, 1.0)
+        assert cache_module._should_refresh_early({'v': 1, 'd': 0.0, 'x': now - 1}, 1.0)
+        assert not cache_module._should_refresh_early({'v': 1, 'd': 10.0, 'x': now - 1}, 0)
+
+
+class TestSingleFlight:
+    def test_error_reaches_every_caller(self):
+        """Test waiters see the leader's exception and the key can be retried"""
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        errors = []
+
+        def call():
+            try:
+                flights.do("k", fail)
+            except RuntimeError as e:
+                errors.append(e)
+
+        call_concurrently(call, 3)
+        assert len(errors) == 3
+        assert flights.do("k", lambda: 5) == (5, True)
+
+
+class TestInvalidation:
+    def test_memory_pattern_is_respected(self, memory_backend):
+        """Test pattern invalidation in memory mode only drops matching keys"""
+        @cache(ttl=60)
+        def alpha(x):
+            return x
+
+        @cache(ttl=60)
+        def beta(x):
+            return x
+
+        alpha(1), alpha(2), beta(1)
+        assert invalidate_cache("alpha:*") == 2
+        assert memory_backend.stats()['keys'] == 1
+
+    def test_namespace_bump(self, memory_backend):
+        """Test invalidating one country's namespace keeps the others cached"""
+        check, calls = by_country()
+        check("Japan"), check("India")
+        assert invalidate_namespace(country_namespace("Japan")) == 1
+        check("Japan"), check("India")
+        assert calls == ["Japan", "India", "Japan"]
+
+    def test_redis_invalidation_uses_scan(self, redis_backend, monkeypatch):
+        """Test pattern invalidation never issues KEYS and keeps generation counters"""
+        def no_keys(*args, **kwargs):
+            raise AssertionError("KEYS blocks the server")
+
+        monkeypatch.setattr(redis_backend, "keys", no_keys)
+        check, _ = by_country()
+        check("Japan")
+        invalidate_namespace(country_namespace("Japan"))
+        assert invalidate_cache("check:*") == 1
+        assert redis_backend.get("gen:country:Japan") == b"1"
+        assert cache_module.local_cache.stats()['keys'] == 0
+
+    def test_redis_namespace_bump_is_shared(self, redis_backend):
+        """Test a bump made by another process is seen once the cached generation is re-read"""
+        check, calls = by_country()
+        check("Japan")
+        redis_backend.incr("gen:country:Japan")  # Another process reloaded the policy
+        cache_module._generations.clear()        # local_ttl elapsed
+        check("Japan")
+        assert calls == ["Japan", "Japan"]
+
+    def test_sweeper_removes_stale_generations(self, redis_backend):
+        """Test the sweeper deletes only entries of superseded generations"""
+        check, _ = by_country()
+        check("Japan"), check("India")
+        invalidate_namespace(country_namespace("Japan"))
+        check("Japan")
+        redis_backend.set("unrelated", "1")
+        sweeper = CacheSweeper(interval=3600, pause=0)
+        assert sweeper.sweep_once() >= 1
+        keys = {key.decode() for key in redis_backend.keys("*")}
+        assert {"unrelated", "gen:country:Japan"} <= keys
+        assert any("country:Japan@1" in key for key in keys)
+        assert not any("country:Japan@0" in key for key in keys)
+        assert any("country:India@0" in key for key in keys)
+
+    def test_sweeper_thread(self, memory_backend):
+        """Test the background thread sweeps the memory backend"""
+        check, _ = by_country()
+        check("Japan")
+        invalidate_namespace(country_namespace("Japan"))
+        sweeper = CacheSweeper(interval=0.05).start()
+        try:
+            deadline = time.monotonic() + 2
+            while memory_backend.stats()['keys'] and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            sweeper.stop(timeout=1)
+        assert memory_backend.stats()['keys'] == 0 and sweeper.removed == 1
+
+    def test_policy_reload_invalidates_changed_countries(self, memory_backend, tmp_path):
+        """Test a policy reload drops cached results of the changed countries only"""
+        from src.compliance_scanner import ComplianceGuardrail
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text('Spain:\n  forbidden_keywords: ["casino"]\nJapan:\n  forbidden_keywords: ["poker"]\n')
+        guardrail = ComplianceGuardrail(str(policy_file), None)
+        invalidate_on_policy_reload(guardrail)
+        check, calls = by_country()
+        check("Spain"), check("Japan")
+
+        policy_file.write_text('Spain:\n  forbidden_keywords: ["casino", "dice"]\nJapan:\n  forbidden_keywords: ["poker"]\n')
+        assert guardrail.reload(force=True)
+        check("Spain"), check("Japan")
+        assert calls == ["Spain", "Japan", "Spain"]
+
+
+class TestKeysAndSerializers:
+    def test_key_ignores_dict_order(self):
+        """Test equal arguments built in a different order share a key"""
+        first = {"title": "Poker Night", "tags": ["cards"], "rating": {"age": 18, "region": "EU"}}
+        second = {"rating": {"region": "EU", "age": 18}, "tags": ["cards"], "title": "Poker Night"}
+        assert cache_key("Japan", first) == cache_key("Japan", second)
+        assert cache_key(a=1, b=2) == cache_key(b=2, a=1)
+        assert cache_key({"x", "y", "z"}) == cache_key({"z", "y", "x"})
+
+    def test_key_distinguishes_values(self):
+        """Test values that differ as JSON get different keys"""
+        keys = {cache_key(arg) for arg in ([1, 2], [2, 1], {1, 2}, {"1": 2}, "1", 1, 1.5, True, None, "None")}
+        assert len(keys) == 10
+        assert cache_key("Japan", None) != cache_key("Japan", country=None)
+
+    def test_key_of_objects(self):
+        """Test objects with to_dict() are keyed by their content, big integers are accepted"""
+        first, second = ComplianceResult("PASS", "Japan"), ComplianceResult("PASS", "Japan")
+        second.timestamp = first.timestamp
+        assert cache_key(first) == cache_key(second)
+        assert cache_key(2 ** 70) != cache_key(2 ** 71)
+
+    def test_pure_python_encoding_is_canonical(self):
+        """Test the encoder used without orjson also ignores ordering"""
+        encode = cache_module._encode_key_json
+        assert encode([{"b": 1, "a": {"y", "x"}}]) == encode([{"a": {"x", "y"}, "b": 1}])
+
+    def test_key_is_stable_across_processes(self):
+        """Test the key is a fixed-length digest that does not depend on hash randomization"""
+        key = cache_key("Japan", {"title": "Poker Night"})
+        assert len(key) == 32
+        assert key == cache_key("Japan", {"title": "Poker Night"})
+
+    def test_pickle_holds_compliance_results(self, redis_backend):
+        """Test a function returning ComplianceResult can be cached with pickle"""
+        calls = []
+
+        @cache(ttl=60, serializer='pickle')
+        def check(country):
+            calls.append(country)
+            result = ComplianceResult("WARNING", country, policy_version="v2")
+            result.add_violation("KEYWORD", "Forbidden keyword", "HIGH", "poker")
+            return result
+
+        first = check("Japan")
+        cache_module.local_cache.clear()
+        second = check("Japan")
+        assert len(calls) == 1
+        assert isinstance(second, ComplianceResult) and second is not first
+        assert second.to_dict() == first.to_dict()
+
+    def test_serializer_recorded_in_payload(self, memory_backend):
+        """Test a payload is read with the serializer that wrote it"""
+        payload = cache_module._pack({"a": [1, 2]}, 0.5, 60, 'pickle')
+        entry = cache_module._unpack(payload)
+        assert entry['v'] == {"a": [1, 2]} and entry['d'] == 0.5
+        assert cache_module._unpack(payload.replace(b"pickle", b"missing", 1)) is None
+        assert cache_module._unpack('{"v": 1, "d": 0.0, "x": 0}') is None  # Written by an older version
+
+    def test_unknown_serializer(self):
+        """Test an unregistered serializer is rejected when decorating"""
+        with pytest.raises(ValueError):
+            cache(ttl=60, serializer='yaml')
+
+    @pytest.mark.skipif(not cache_module.ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_orjson(self, memory_backend):
+        """Test orjson results round-trip through the cache"""
+        @cache(ttl=60, serializer='orjson')
+        def lookup(country):
+            return {"country": country, "rules": [1, 2]}
+
+        assert lookup("Japan") == lookup("Japan") == {"country": "Japan", "rules": [1, 2]}
+        assert memory_backend.stats()['hits'] == 1
+
+
+class TestCircuitBreaker:
+    def test_import_does_not_connect(self):
+        """Test importing the module does not wait for an unreachable Redis"""
+        import os
+        import subprocess
+        env = dict(os.environ, CACHE_BACKEND='redis', REDIS_HOST='10.255.255.1', REDIS_CONNECT_TIMEOUT='10')
+        start = time.monotonic()
+        subprocess.run([sys.executable, '-c', 'import src.cache'], cwd=Path(__file__).parent.parent,
+                       env=env, check=True, timeout=30)
+        assert time.monotonic() - start < 10
+
+    def test_trips_to_local_backend(self, redis_down, redis_backend, monkeypatch):
+        """Test consecutive connection failures switch calls to the in-process cache"""
+        calls = []
+
+        @cache(ttl=60, beta=0)
+        def lookup(country):
+            calls.append(country)
+            return {"country": country}
+
+        assert lookup("Japan") == {"country": "Japan"}
+        assert cache_module.redis_breaker.state == 'open'
+
+        def no_round_trips(*args, **kwargs):
+            raise AssertionError("Redis called while the breaker is open")
+
+        monkeypatch.setattr(redis_backend, "get", no_round_trips)
+        assert lookup("Japan") == {"country": "Japan"} and len(calls) == 1
+        stats = get_cache_stats()
+        assert stats['type'] == 'memory' and stats['breaker']['trips'] == 1
+
+    def test_failures_must_be_consecutive(self):
+        """Test a success in between resets the failure count"""
+        breaker = cache_module.CircuitBreaker(lambda: None, threshold=2, probe_interval=3600)
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == 'closed'
+        breaker.record_failure()
+        assert breaker.state == 'open' and not breaker.allow()
+        assert breaker.probe_once() and breaker.allow()
+
+    def test_recovery_applies_missed_invalidations(self, redis_down, redis_backend):
+        """Test a namespace bumped during the outage is bumped in Redis once it is back"""
+        check, calls = by_country()
+        check("Japan")
+        assert cache_module.redis_breaker.state == 'open'
+        invalidate_namespace(country_namespace("Japan"))
+        assert not cache_module.redis_breaker.probe_once()
+
+        redis_down.connected = True
+        assert cache_module.redis_breaker.probe_once()
+        assert cache_module.redis_breaker.state == 'closed'
+        assert redis_backend.get("gen:country:Japan") == b"1"
+        check("Japan")
+        assert calls == ["Japan", "Japan"] and get_cache_stats()['type'] == 'redis'
+
+    def test_background_probe_closes_breaker(self, redis_down):
+        """Test the probe thread notices Redis is back without any caller paying for it"""
+        breaker = cache_module.redis_breaker
+        breaker.probe_interval = 0.02
+        check, _ = by_country()
+        check("Japan")
+        assert breaker.state == 'open'
+        redis_down.connected = True
+        deadline = time.monotonic() + 2
+        while breaker.state == 'open' and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert breaker.state == 'closed'
+
+    def test_state_metric(self, redis_down):
+        """Test the breaker state is exported to Prometheus"""
+        pytest.importorskip("prometheus_client")
+        from prometheus_client import REGISTRY
+        check, _ = by_country()
+        check("Japan")
+        assert REGISTRY.get_sample_value('cache_redis_breaker_open') == 1
+        redis_down.connected = True
+        cache_module.redis_breaker.probe_once()
+        assert REGISTRY.get_sample_value('cache_redis_breaker_open') == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
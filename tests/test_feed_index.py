@@ -0,0 +1,52 @@
+"""
+Unit tests for the RSS seen-entry index
+"""
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.feed_index import SeenEntryIndex, entry_key
+
+
+DAY = 86400
+
+
+def entry(guid, title="Notice"):
+    return {'id': guid, 'title': title, 'link': f"http://example.gov/{guid}"}
+
+
+class TestSeenEntryIndex:
+    def test_entry_identity(self):
+        """Test entries are identified by GUID, then link, then title and date"""
+        assert entry_key(entry("a", "Old title")) == entry_key(entry("a", "New title"))
+        assert entry_key({'link': "http://example.gov/x"}) != entry_key({'link': "http://example.gov/y"})
+        assert entry_key({'title': "T", 'published': "Mon"}) != entry_key({'title': "T", 'published': "Tue"})
+        assert entry_key({}) is None
+
+    def test_update_returns_only_new_entries(self):
+        """Test only unseen entries are returned, in feed order"""
+        index = SeenEntryIndex()
+        assert index.update([entry("b"), entry("a")], now=0) == [entry("b"), entry("a")]
+        assert index.update([entry("d"), entry("c"), entry("b")], now=1) == [entry("d"), entry("c")]
+        assert len(index) == 4
+
+    def test_entries_still_listed_are_not_aged_out(self):
+        """Test the age limit counts from the last poll that listed an entry"""
+        index = SeenEntryIndex(max_age_days=30)
+        index.update([entry("a"), entry("b")], now=0)
+        index.update([entry("a")], now=20 * DAY)
+        index.update([entry("a")], now=40 * DAY)
+        assert entry_key(entry("a")) in index
+        assert entry_key(entry("b")) not in index
+
+    def test_size_cap_keeps_most_recent(self):
+        """Test the cap drops the least recently seen entries"""
+        index = SeenEntryIndex(max_entries=2)
+        for ts, guid in enumerate("abc"):
+            index.update([entry(guid)], now=ts)
+        assert set(index.to_dict()) == {entry_key(entry("b")), entry_key(entry("c"))}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
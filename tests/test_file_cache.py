@@ -0,0 +1,75 @@
+"""
+Unit tests for the parsed report file cache
+"""
+import pytest
+import json
+import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.file_cache import FileCache
+
+
+REPORT = {"summary": {"total_checks": 3}, "country_details": {"Japan": {"violations": 1, "critical_issues": ["age rating"]}}}
+
+
+@pytest.fixture
+def report_file(tmp_path):
+    path = tmp_path / "compliance_report.json"
+    path.write_text(json.dumps(REPORT))
+    return path
+
+
+class TestFileCache:
+    def test_parsed_once_per_version(self, report_file):
+        """Test repeated reads share one parse until the file changes"""
+        parses = []
+        cache = FileCache(loader=lambda path: parses.append(path) or json.loads(path.read_text()))
+        first = cache.get(report_file)
+        assert cache.get(report_file) is first
+        assert len(parses) == 1
+
+        report_file.write_text(json.dumps({"summary": {"total_checks": 4}}))
+        os.utime(report_file, ns=(0, os.stat(report_file).st_mtime_ns + 1))
+        assert cache.get(report_file)['summary']['total_checks'] == 4
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'reloads': 1, 'hit_rate': 0.3333, 'files': 1}
+
+    def test_views_are_read_only(self, report_file):
+        """Test callers cannot mutate the shared view"""
+        data = FileCache().get(report_file)
+        with pytest.raises(TypeError):
+            data['summary']['total_checks'] = 0
+        with pytest.raises(AttributeError):
+            data['country_details']['Japan']['critical_issues'].append("x")
+        assert json.loads(json.dumps(data)) == REPORT
+
+    def test_missing_or_invalid_file(self, tmp_path):
+        """Test unreadable files return the default"""
+        cache = FileCache()
+        assert cache.get(tmp_path / "missing.json", {}) == {}
+        broken = tmp_path / "broken.json"
+        broken.write_text("{")
+        assert cache.get(broken) is None
+
+    def test_dashboard_serves_cached_report(self, report_file, monkeypatch):
+        """Test the dashboard endpoints read the report through the cache"""
+        import web_dashboard
+        from src.aggregates import AggregateStore
+        from src.update_log import UpdateLogStore
+        monkeypatch.setattr(web_dashboard, "COMPLIANCE_REPORT", report_file)
+        update_log = UpdateLogStore(str(report_file.parent / "update_log"), legacy_path=None)
+        monkeypatch.setattr(web_dashboard, "aggregates", AggregateStore(update_log=update_log,
+                                                                        compliance_report=str(report_file)))
+        client = web_dashboard.app.test_client()
+        data = client.get('/api/country/Japan').get_json()
+        assert data['compliance'] == REPORT['country_details']['Japan']
+        analytics = client.get('/api/analytics').get_json()
+        assert analytics['violations_by_country'] == {"Japan": 1}
+        hits = web_dashboard.report_cache.hits
+        client.get('/api/analytics')
+        assert web_dashboard.report_cache.hits == hits + 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
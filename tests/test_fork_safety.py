@@ -0,0 +1,103 @@
+"""
+Unit tests for fork-safe process state
+"""
+import os
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.cache import CircuitBreaker
+from src.file_cache import FileCache
+from src.fork_safety import after_fork_in_child
+from src.update_log import UpdateLogStore
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def in_child(check) -> int:
+    """Exit status of a forked child running check() (0 when it returns True)"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os._exit(0 if check() else 1)
+        except BaseException:
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+class Counter:
+    def __init__(self):
+        self.forks = 0
+        after_fork_in_child(self.forked)
+
+    def forked(self):
+        self.forks += 1
+
+
+class TestForkSafety:
+    def test_callback_runs_in_child_only(self):
+        """Test registered callbacks run in the child, not the parent"""
+        counter = Counter()
+        assert in_child(lambda: counter.forks == 1) == 0
+        assert counter.forks == 0
+
+    def test_registration_does_not_keep_objects_alive(self):
+        """Test only weak references are kept"""
+        import gc
+        import weakref
+        counter = Counter()
+        ref = weakref.ref(counter)
+        del counter
+        gc.collect()
+        assert ref() is None
+        assert in_child(lambda: True) == 0  # Dead callbacks are skipped
+
+    def test_held_lock_is_replaced_in_child(self, tmp_path):
+        """Test a lock held by another thread at fork time does not deadlock the child"""
+        cache = FileCache("test")
+        report = tmp_path / "report.json"
+        report.write_text('{"a": 1}')
+        with cache._lock:
+            status = in_child(lambda: cache.get(report) == {"a": 1})
+        assert status == 0
+
+    def test_update_log_writable_in_child(self, tmp_path):
+        """Test a store created before the fork appends from the child"""
+        store = UpdateLogStore(str(tmp_path / "update_log"), legacy_path=None, fsync=False)
+        with store._thread_lock:
+            status = in_child(lambda: store.append({"timestamp": "2026-01-01T00:00:00", "updates": []}) is None)
+        assert status == 0
+        assert len(store.read_entries()) == 1
+
+    def test_open_breaker_probes_in_child(self):
+        """Test a worker forked while Redis was down still notices it coming back"""
+        import time
+        breaker = CircuitBreaker(lambda: None, threshold=1, probe_interval=3600)
+        breaker.record_failure()
+
+        def recovers():
+            breaker.probe_interval = 0.01
+            assert not breaker.allow()  # Starts this process's probe thread
+            deadline = time.monotonic() + 2
+            while breaker.state == 'open' and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return breaker.state == 'closed'
+
+        assert in_child(recovers) == 0
+        assert breaker.state == 'open'
+        breaker.reset()
+
+    def test_monitor_session_not_shared(self):
+        """Test a forked worker gets its own connection pool"""
+        from src.policy_auto_updater import PolicyUpdateMonitor
+        monitor = PolicyUpdateMonitor()
+        parent_session = monitor.session
+        assert in_child(lambda: monitor.session is not parent_session) == 0
+        assert monitor.session is parent_session
+        monitor.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
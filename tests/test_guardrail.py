@@ -0,0 +1,349 @@
+"""
+Unit tests for ComplianceGuardrail and compiled policy rules
+"""
+import io
+import json
+import os
+import pickle
+import pytest
+import time
+from datetime import datetime
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import src.compliance_scanner as compliance_scanner
+from src.compliance_scanner import ComplianceGuardrail, ComplianceSummary
+import src.policy_compiler as policy_compiler
+from src.policy_compiler import KeywordMatcher, compile_policy_db, load_policy_rules, parse_time_window
+from src.stream_scanner import read_deployments, scan_stream
+
+
+POLICY_PATH = str(Path(__file__).parent.parent / "config" / "policy_rules.yaml")
+
+
+@pytest.fixture
+def guardrail():
+    """Create a guardrail backed by the repository policy database"""
+    return ComplianceGuardrail(POLICY_PATH)
+
+
+class TestKeywordMatcher:
+    def test_reports_hits_with_offsets(self):
+        """Test every keyword hit is reported with its offset"""
+        matcher = KeywordMatcher(["casino", "poker"])
+        hits = matcher.find_all("casino poker night at the casino")
+        assert hits == [("casino", 0), ("poker", 7), ("casino", 26)]
+
+    def test_respects_word_boundaries(self):
+        """Test keywords inside longer words are not reported"""
+        matcher = KeywordMatcher(["wine"])
+        assert matcher.find_all("swine flu") == []
+        assert matcher.find_all("red wine") == [("wine", 4)]
+
+    def test_overlapping_keywords(self):
+        """Test nested keywords are all reported"""
+        matcher = KeywordMatcher(["root beer", "root", "beer"])
+        assert matcher.matched_keywords("root beer float") == {"root beer", "root", "beer"}
+
+    def test_empty_keywords(self):
+        """Test a matcher without keywords never matches"""
+        matcher = KeywordMatcher([])
+        assert not matcher
+        assert matcher.find_all("anything") == []
+
+
+class TestCompiledPolicy:
+    def test_time_window_bounds(self):
+        """Test windows are inclusive at minute precision like time comparisons"""
+        window = parse_time_window("01:00-05:00", "Spain", "gambling_ads")
+        assert (window.start_minute, window.end_minute) == (60, 300)
+        assert window.contains(datetime(2026, 1, 13, 5, 0, 0))
+        assert not window.contains(datetime(2026, 1, 13, 5, 0, 1))
+        assert not window.contains(datetime(2026, 1, 13, 0, 59, 59))
+
+    def test_ad_rule_lookup(self, guardrail):
+        """Test ad types resolve through the lookup table and substring fallback"""
+        korea = guardrail.rules.policies["South_Korea"]
+        assert [r.key for r in korea.ad_rules_for("tobacco_ads")] == ["tobacco_ads"]
+        assert [r.key for r in korea.ad_rules_for("premium_alcohol_ads_v2")] == ["alcohol_ads"]
+        assert korea.ad_rules_for("gambling_ads") == ()
+
+    def test_invalid_policies_rejected_at_load(self):
+        """Test malformed policies fail at compile time with ValueError"""
+        with pytest.raises(ValueError):
+            compile_policy_db({"Spain": {"ad_restrictions": {"gambling_ads": {
+                "restriction_type": "time_based", "allowed_time_window": "25:00-05:00"}}}})
+        with pytest.raises(ValueError):
+            compile_policy_db({"Spain": {"forbidden_keywords": "gambling"}})
+        with pytest.raises(ValueError):
+            compile_policy_db({"Spain": {"violation_severity": "SEVERE"}})
+        with pytest.raises(ValueError):
+            compile_policy_db({})
+
+    def test_rule_set_is_picklable(self, guardrail):
+        """Test compiled rules survive a pickle round trip"""
+        restored = pickle.loads(pickle.dumps(guardrail.rules))
+        assert set(restored.policies) == set(guardrail.rules.policies)
+        assert restored.union_matcher.keywords == guardrail.rules.union_matcher.keywords
+
+
+class TestPolicySnapshot:
+    POLICY = "Japan:\n  forbidden_keywords: [\"gambling\"]\n  age_rating_system: \"Eirin\"\n"
+
+    def test_snapshot_reused_without_parsing(self, tmp_path, monkeypatch):
+        """Test the second load comes from the snapshot, not the YAML parser"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        snapshot_dir = tmp_path / "snapshots"
+        load_policy_rules(str(policy_file), str(snapshot_dir))
+        assert len(list(snapshot_dir.iterdir())) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("YAML should not be parsed")
+        monkeypatch.setattr(policy_compiler, "parse_policy_yaml", fail)
+        rules = load_policy_rules(str(policy_file), str(snapshot_dir))
+        assert rules.policies["Japan"].forbidden_keywords == ("gambling",)
+
+    def test_snapshot_invalidated_on_change(self, tmp_path):
+        """Test editing the YAML rebuilds the compiled rules"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        snapshot_dir = str(tmp_path / "snapshots")
+        guardrail = ComplianceGuardrail(str(policy_file), snapshot_dir)
+        assert guardrail.check_deployment("Japan", {'title': "poker", 'age_rating_system': "Eirin"}).status == "PASS"
+
+        policy_file.write_text(self.POLICY.replace('"gambling"', '"gambling", "poker"'))
+        guardrail = ComplianceGuardrail(str(policy_file), snapshot_dir)
+        assert guardrail.check_deployment("Japan", {'title': "poker", 'age_rating_system': "Eirin"}).status == "WARNING"
+
+    def test_snapshot_is_plain_json(self, tmp_path):
+        """Test the snapshot holds the parsed policy as JSON, not pickled objects"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        snapshot_dir = tmp_path / "snapshots"
+        rules = load_policy_rules(str(policy_file), str(snapshot_dir))
+        snapshot = json.loads(next(snapshot_dir.iterdir()).read_text())
+        assert snapshot['policy_db'] == dict(rules.raw)
+        assert load_policy_rules(str(policy_file), str(snapshot_dir)).version == rules.version
+
+    def test_policy_with_dates_not_snapshotted(self, tmp_path):
+        """Test values JSON cannot round-trip (YAML dates) skip the snapshot"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY + "  effective_date: 2026-01-01\n")
+        snapshot_dir = tmp_path / "snapshots"
+        rules = load_policy_rules(str(policy_file), str(snapshot_dir))
+        assert not snapshot_dir.exists()
+        assert rules.policies["Japan"].raw["effective_date"].year == 2026
+
+    def test_default_snapshot_dir_outside_checkout(self):
+        """Test default snapshots do not depend on, or land in, the working directory"""
+        snapshot_dir = Path(policy_compiler.DEFAULT_SNAPSHOT_DIR)
+        assert snapshot_dir.is_absolute()
+        assert Path(POLICY_PATH).parent.parent not in snapshot_dir.parents
+
+    def test_missing_and_invalid_policy(self, tmp_path):
+        """Test load errors keep their original exception types"""
+        with pytest.raises(FileNotFoundError):
+            ComplianceGuardrail(str(tmp_path / "missing.yaml"), None)
+        broken = tmp_path / "broken.yaml"
+        broken.write_text("Japan: [unclosed")
+        with pytest.raises(ValueError):
+            ComplianceGuardrail(str(broken), str(tmp_path))
+
+
+class TestHotReload:
+    POLICY = TestPolicySnapshot.POLICY
+    METADATA = {'title': "poker", 'age_rating_system': "Eirin"}
+
+    def _rewrite(self, policy_file, text):
+        """Write new policy content and bump mtime so the change is always visible"""
+        policy_file.write_text(text)
+        stat = policy_file.stat()
+        os.utime(policy_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_reload_swaps_version(self, tmp_path):
+        """Test reload picks up edits and results record the policy version"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        guardrail = ComplianceGuardrail(str(policy_file), None)
+        before = guardrail.check_deployment("Japan", self.METADATA)
+        assert guardrail.reload() is False
+
+        seen = []
+        guardrail.add_reload_listener(lambda old, new: seen.append((old.version, new.version)))
+        self._rewrite(policy_file, self.POLICY.replace('"gambling"', '"gambling", "poker"'))
+        assert guardrail.reload() is True
+        after = guardrail.check_deployment("Japan", self.METADATA)
+
+        assert before.status == "PASS" and after.status == "WARNING"
+        assert before.policy_version != after.policy_version
+        assert after.to_dict()['policy_version'] == guardrail.policy_version
+        assert seen == [(before.policy_version, after.policy_version)]
+
+    def test_invalid_edit_keeps_old_rules(self, tmp_path):
+        """Test a broken policy file does not replace the working rules"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        guardrail = ComplianceGuardrail(str(policy_file), None)
+        version = guardrail.policy_version
+
+        self._rewrite(policy_file, "Japan: [unclosed")
+        assert guardrail.reload() is False
+        assert guardrail.policy_version == version
+        assert guardrail.check_deployment("Japan", self.METADATA).status == "PASS"
+
+    def test_in_flight_check_keeps_its_version(self, guardrail):
+        """Test a swap during a check does not mix rule versions"""
+        old_version = guardrail.policy_version
+        new_rules = compile_policy_db({"Japan": {"forbidden_keywords": ["poker"]}})
+        original_evaluate = guardrail._evaluate
+
+        def swap_mid_check(rules, *args):
+            guardrail._set_rules(new_rules)
+            return original_evaluate(rules, *args)
+        guardrail._evaluate = swap_mid_check
+
+        result = guardrail.check_deployment("Japan", self.METADATA)
+        assert result.policy_version == old_version
+        assert result.status == "PASS"
+        assert guardrail.policy_version == new_rules.version
+
+    def test_watcher_reloads_in_background(self, tmp_path):
+        """Test the polling watcher applies file changes without a manual reload"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text(self.POLICY)
+        guardrail = ComplianceGuardrail(str(policy_file), None)
+        version = guardrail.policy_version
+        guardrail.start_watching(interval=0.01)
+        try:
+            self._rewrite(policy_file, self.POLICY.replace('"gambling"', '"poker"'))
+            deadline = time.time() + 5
+            while guardrail.policy_version == version and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            guardrail.stop_watching()
+        assert guardrail.policy_version != version
+
+
+class TestForbiddenKeywords:
+    def test_forbidden_keywords_detected(self, guardrail):
+        """Test forbidden keywords are reported once per field"""
+        result = guardrail.check_deployment("Saudi_Arabia", {
+            'title': "Vegas Nights",
+            'description': "casino poker and more casino",
+            'age_rating_system': "GCAM"
+        })
+        detected = [v['detected_content'] for v in result.violations
+                    if v['type'] == "FORBIDDEN_KEYWORD"]
+        assert detected == ["casino", "poker"]
+        assert result.status == "CRITICAL"
+
+    def test_clean_content_passes(self, guardrail):
+        """Test clean content has no keyword violations"""
+        result = guardrail.check_deployment("Saudi_Arabia", {
+            'title': "Desert Documentary",
+            'description': "Wildlife of the Arabian peninsula",
+            'age_rating_system': "GCAM"
+        })
+        assert result.status == "PASS"
+
+
+class TestCheckAllCountries:
+    def test_matches_per_country_checks(self, guardrail):
+        """Test the single-pass scan agrees with per-country checks"""
+        metadata = {
+            'title': "Casino Royale",
+            'description': "gambling, drugs and nazi propaganda",
+            'tags': ["poker", "violence"],
+            'features': ["gdpr_compliance"]
+        }
+        results = guardrail.check_all_countries(metadata)
+        assert set(results) == set(guardrail.supported_countries)
+        for country, result in results.items():
+            expected = guardrail.check_deployment(country, metadata)
+            assert result.status == expected.status
+            assert [v['message'] for v in result.violations] == \
+                [v['message'] for v in expected.violations]
+
+    def test_subset_and_unknown_countries(self, guardrail):
+        """Test explicit country lists, including unknown countries"""
+        results = guardrail.check_all_countries(
+            {'title': "gambling night"}, countries=["Japan", "Atlantis"]
+        )
+        assert set(results) == {"Japan", "Atlantis"}
+        assert results["Atlantis"].violations[0]['type'] == "UNKNOWN_COUNTRY"
+        assert not any(v['type'] == "FORBIDDEN_KEYWORD" for v in results["Japan"].violations)
+
+
+class TestBatchCheck:
+    DEPLOYMENTS = [
+        {'country': "Saudi_Arabia", 'content_metadata': {'title': "casino night"}},
+        {'country': "Germany", 'content_metadata': {'title': "history", 'age_rating_system': "FSK"}},
+        {'country': "Atlantis", 'content_metadata': {}},
+        {'country': "South_Korea", 'content_metadata': {'title': "drugs"},
+         'ad_schedule': {'ad_type': "tobacco_ads"}},
+    ] * 5
+
+    def test_serial_keys(self, guardrail):
+        """Test batch results keep the country_index keys"""
+        results = guardrail.batch_check(self.DEPLOYMENTS)
+        assert list(results)[:3] == ["Saudi_Arabia_0", "Germany_1", "Atlantis_2"]
+        assert len(results) == len(self.DEPLOYMENTS)
+
+    def test_parallel_matches_serial(self, guardrail, monkeypatch):
+        """Test the process-pool path returns the same results in the same order"""
+        monkeypatch.setattr(compliance_scanner, "PARALLEL_MIN_BATCH", 0)
+        serial = guardrail.batch_check(self.DEPLOYMENTS)
+        parallel = guardrail.batch_check(self.DEPLOYMENTS, workers=2, chunk_size=3)
+        assert list(parallel) == list(serial)
+        for key, result in serial.items():
+            assert parallel[key].status == result.status
+            assert len(parallel[key].violations) == len(result.violations)
+
+
+class TestStreamingCheck:
+    def test_iter_check_matches_batch_check(self, guardrail):
+        """Test the generator yields the batch_check keys and keeps counters"""
+        deployments = TestBatchCheck.DEPLOYMENTS
+        summary = ComplianceSummary()
+        streamed = dict(guardrail.iter_check(iter(deployments), summary))
+        batched = guardrail.batch_check(deployments)
+        assert list(streamed) == list(batched)
+        assert summary.to_dict() == ComplianceSummary.from_results(batched.values()).to_dict()
+
+    def test_report_from_summary_only(self, guardrail):
+        """Test the report can be produced from counters without results"""
+        summary = ComplianceSummary()
+        list(guardrail.iter_check(TestBatchCheck.DEPLOYMENTS, summary))
+        report = guardrail.generate_compliance_report({}, summary)
+        assert f"Total Deployments Checked: {summary.total}" in report
+
+    def test_scan_jsonl_stream(self, guardrail):
+        """Test JSONL in, JSONL out"""
+        source = io.StringIO(
+            '{"country": "Saudi_Arabia", "content_metadata": {"title": "casino"}}\n'
+            '\n'
+            '{"country": "Japan", "content_metadata": {"age_rating_system": "Eirin"}}\n'
+        )
+        sink = io.StringIO()
+        summary = scan_stream(guardrail, source, sink)
+        lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+        assert [line['id'] for line in lines] == ["Saudi_Arabia_0", "Japan_1"]
+        assert summary.critical == 1 and summary.passed == 1
+
+    def test_read_multi_document_yaml(self):
+        """Test single, list and named-mapping YAML documents"""
+        source = io.StringIO(
+            "country: Japan\n"
+            "---\n"
+            "- country: Spain\n"
+            "---\n"
+            "case_1:\n  country: China\n"
+        )
+        countries = [d['country'] for d in read_deployments(source, 'yaml')]
+        assert countries == ["Japan", "Spain", "China"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,86 @@
+"""
+Unit tests for the HTML extractor backends
+"""
+import pytest
+import yaml
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.html_extractor import ExtractedPage, HTMLExtractor, available_backends, css_to_xpath, get_extractor
+
+
+FIXTURES = sorted((Path(__file__).parent.parent / "test_data" / "html").glob("*.html"))
+FAST_BACKENDS = [name for name in available_backends() if name != "bs4"]
+SOURCES_CONFIG = Path(__file__).parent.parent / "config" / "regulatory_sources.yaml"
+# Saved copies of the configured scrape pages
+SAVED_PAGES = {
+    "BfDI Press Releases": "press_releases.html",
+    "Korea Communications Standards Commission Announcements": "notice_list.html",
+}
+
+
+@pytest.mark.parametrize("backend", FAST_BACKENDS)
+class TestBackendParity:
+    @pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.name)
+    def test_default_selectors_match_reference(self, backend, fixture):
+        """Test fast backends extract exactly what BeautifulSoup extracts"""
+        content = fixture.read_bytes()
+        assert get_extractor(backend).extract(content) == get_extractor("bs4").extract(content)
+
+    @pytest.mark.parametrize("selectors", [["section.content"], ["#main > h1"], ["table.board", "main"]])
+    def test_configured_selectors_match_reference(self, backend, selectors):
+        """Test configured selectors resolve to the same element"""
+        content = (FIXTURES[0].parent / "press_releases.html").read_bytes()
+        page = get_extractor(backend).extract(content, selectors)
+        assert page == get_extractor("bs4").extract(content, selectors)
+        assert page.selector == selectors[-1]
+
+    def test_non_content_text_skipped(self, backend):
+        """Test scripts, styles and comments are not part of the text"""
+        html = b"<html><body><main><script>var a;</script><!-- x --><p> A &amp; B </p>tail</main></body></html>"
+        assert get_extractor(backend).extract(html) == ExtractedPage("A & B tail", selector="main")
+
+    def test_charset_from_header(self, backend):
+        """Test the Content-Type charset is used for documents without a meta tag"""
+        html = "<html><body><main><h1>Jugendschutz Änderung</h1></main></body></html>".encode("latin-1")
+        assert get_extractor(backend).extract(html, charset="iso-8859-1").title == "Jugendschutz Änderung"
+
+    def test_empty_document(self, backend):
+        """Test an empty response yields empty text"""
+        assert get_extractor(backend).extract(b"").text == ""
+
+
+class TestConfiguredSources:
+    @pytest.mark.parametrize("backend", available_backends())
+    @pytest.mark.parametrize("source_name", sorted(SAVED_PAGES))
+    def test_configured_selectors_match_saved_page(self, backend, source_name):
+        """Test the shipped selectors find the content block of the saved page"""
+        sources = {s["name"]: s for s in yaml.safe_load(SOURCES_CONFIG.read_text(encoding="utf-8"))["sources"]}
+        selectors = sources[source_name]["selectors"]
+        page = get_extractor(backend).extract((FIXTURES[0].parent / SAVED_PAGES[source_name]).read_bytes(), selectors)
+        assert page.selector == selectors[0]
+        assert page.title and page.link
+
+    def test_extractor_is_abstract(self):
+        """Test the base class cannot be used without a backend"""
+        with pytest.raises(TypeError):
+            HTMLExtractor()
+
+
+class TestSelectors:
+    def test_simple_selectors(self):
+        """Test type, id, class and combinators translate to XPath"""
+        assert css_to_xpath("main") == "descendant-or-self::main"
+        assert "@id = 'content'" in css_to_xpath("#content")
+        assert css_to_xpath("div.notice-list > table").endswith("')]/table")
+        assert css_to_xpath("#container table").endswith("/descendant::table")
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            get_extractor("regex")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,152 @@
+"""
+Unit tests for the policy diff engine and incremental re-scans
+"""
+import json
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.compliance_scanner import ComplianceGuardrail
+from src.policy_compiler import compile_policy_db
+from src.policy_diff import PolicyChange, diff_policies
+from src.scan_index import ScanIndex, text_tokens
+
+
+POLICY = {
+    "Japan": {
+        "forbidden_keywords": ["gambling"],
+        "age_rating_system": "Eirin",
+    },
+    "Germany": {
+        "forbidden_keywords": ["nazi"],
+        "ad_restrictions": {"gambling_ads": {
+            "restriction_type": "time_based", "allowed_time_window": "23:00-06:00"}},
+    },
+}
+
+DEPLOYMENTS = [
+    {'country': "Japan", 'content_metadata': {'title': "Poker Night", 'age_rating_system': "Eirin"}},
+    {'country': "Japan", 'content_metadata': {'title': "gambling den", 'age_rating_system': "Eirin"}},
+    {'country': "Japan", 'content_metadata': {'title': "Garden Poker", 'age_rating_system': "Eirin"}},
+    {'country': "Germany", 'content_metadata': {'title': "poker"}},
+    {'country': "Germany", 'content_metadata': {'title': "history"},
+     'ad_schedule': {'ad_type': "gambling_ads"}},
+    {'country': "Atlantis", 'content_metadata': {'title': "poker"}},
+]
+
+
+def edited(**countries):
+    """Copy of POLICY with some countries replaced"""
+    policy = {country: dict(rules) for country, rules in POLICY.items()}
+    policy.update(countries)
+    return {country: rules for country, rules in policy.items() if rules is not None}
+
+
+@pytest.fixture
+def index():
+    """Scan index built from DEPLOYMENTS under POLICY"""
+    scan_index = ScanIndex(":memory:")
+    scan_index.build(ComplianceGuardrail.from_policy_db(POLICY), DEPLOYMENTS)
+    yield scan_index
+    scan_index.close()
+
+
+class TestPolicyDiff:
+    def test_identical_policies(self):
+        """Test an unchanged policy produces an empty diff"""
+        diff = diff_policies(compile_policy_db(POLICY), compile_policy_db(POLICY))
+        assert not diff
+        assert diff.old_version == diff.new_version
+
+    def test_rule_level_changes(self):
+        """Test each changed rule is reported once per country"""
+        new = edited(
+            Japan={"forbidden_keywords": ["gambling", "poker"], "age_rating_system": "CERO",
+                   "mandatory_features": ["subtitles"]},
+            Germany=None,
+            Spain={"violation_severity": "CRITICAL"},
+        )
+        diff = diff_policies(compile_policy_db(POLICY), compile_policy_db(new))
+        assert set(diff.changes) == {
+            PolicyChange("Japan", "forbidden_keyword", "added", "poker"),
+            PolicyChange("Japan", "mandatory_feature", "added", "subtitles"),
+            PolicyChange("Japan", "age_rating_system", "changed", "CERO"),
+            PolicyChange("Spain", "country", "added"),
+            PolicyChange("Germany", "country", "removed"),
+        }
+
+    def test_ad_rule_changes(self):
+        """Test a modified ad window is reported as a change of that ad type"""
+        germany = dict(POLICY["Germany"])
+        germany["ad_restrictions"] = {"gambling_ads": {
+            "restriction_type": "time_based", "allowed_time_window": "22:00-06:00"}}
+        diff = diff_policies(compile_policy_db(POLICY), compile_policy_db(edited(Germany=germany)))
+        assert diff.changes == (PolicyChange("Germany", "ad_restriction", "changed", "gambling_ads"),)
+
+
+class TestScanIndex:
+    def test_text_tokens(self):
+        """Test tokens come from the searchable fields only"""
+        assert text_tokens({'title': "Root-Beer", 'tags': ["Night"], 'studio': "ignored"}) == \
+            {"root", "beer", "night"}
+
+    def test_keyword_addition_rechecks_only_candidates(self, index):
+        """Test a new keyword only re-checks deployments containing it"""
+        guardrail = ComplianceGuardrail.from_policy_db(
+            edited(Japan={"forbidden_keywords": ["gambling", "poker night"], "age_rating_system": "Eirin"})
+        )
+        results = index.rescan(guardrail)
+        assert set(results) == {"Japan_0"}
+        assert results["Japan_0"].status == "WARNING"
+        assert index.result("Japan_0")['policy_version'] == guardrail.policy_version
+        assert index.rules.version == guardrail.policy_version
+
+    def test_severity_and_ad_changes(self, index):
+        """Test severity changes hit stored keyword matches and ad changes hit ad schedules"""
+        japan = dict(POLICY["Japan"], violation_severity="CRITICAL")
+        germany = dict(POLICY["Germany"], ad_restrictions={"gambling_ads": "completely_forbidden"})
+        results = index.rescan(ComplianceGuardrail.from_policy_db(edited(Japan=japan, Germany=germany)))
+        assert set(results) == {"Japan_1", "Germany_4"}
+        assert results["Japan_1"].status == "CRITICAL"
+        assert results["Germany_4"].status == "CRITICAL"
+
+    def test_rescan_matches_full_scan(self, index):
+        """Test the incremental results agree with a full re-scan of the catalog"""
+        new_policy = edited(
+            Japan={"forbidden_keywords": ["poker"], "age_rating_system": "CERO"},
+            Germany=None,
+            Atlantis={"forbidden_keywords": ["poker"]},
+        )
+        guardrail = ComplianceGuardrail.from_policy_db(new_policy)
+        index.rescan(guardrail)
+        for key, expected in guardrail.batch_check(DEPLOYMENTS).items():
+            stored = index.result(key)
+            assert stored['status'] == expected.status
+            assert [v['message'] for v in stored['violations']] == \
+                [v['message'] for v in expected.violations]
+
+    def test_rescan_rejects_mismatched_diff(self, index):
+        """Test a diff that does not start at the indexed version is refused"""
+        other = compile_policy_db(edited(Japan={"forbidden_keywords": ["poker"]}))
+        guardrail = ComplianceGuardrail.from_rules(other)
+        with pytest.raises(ValueError):
+            index.rescan(guardrail, diff_policies(other, other))
+
+    def test_policy_stored_as_json(self, index):
+        """Test the indexed policy is plain JSON and recompiles to the same version"""
+        meta = dict(index.conn.execute("SELECT name, value FROM meta").fetchall())
+        assert set(meta) == {'policy_db', 'policy_version'}
+        assert json.loads(meta['policy_db']) == POLICY
+        rules = index.rules
+        assert rules.version == compile_policy_db(POLICY).version == meta['policy_version']
+        assert rules.policies["Japan"].forbidden_keywords == ("gambling",)
+
+    def test_rescan_requires_build(self):
+        """Test an empty index cannot be re-scanned"""
+        with ScanIndex(":memory:") as empty, pytest.raises(ValueError):
+            empty.rescan(ComplianceGuardrail.from_policy_db(POLICY))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
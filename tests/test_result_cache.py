@@ -0,0 +1,179 @@
+"""
+Unit tests for the compliance result cache
+"""
+import gc
+import json
+import pytest
+from datetime import datetime
+from pathlib import Path
+import sys
+import weakref
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import src.cache as cache_module
+from src.compliance_scanner import ComplianceGuardrail
+from src.result_cache import REDIS_KEY_PREFIX, ResultCache
+
+
+POLICY = {
+    "Spain": {
+        "forbidden_keywords": ["casino"],
+        "ad_restrictions": {"gambling_ads": {
+            "restriction_type": "time_based", "allowed_time_window": "01:00-05:00"}},
+    },
+}
+
+
+@pytest.fixture
+def guardrail():
+    """Guardrail over a small in-memory policy"""
+    return ComplianceGuardrail.from_policy_db(POLICY)
+
+
+@pytest.fixture
+def shared_redis(monkeypatch):
+    """Redis tier of src.cache over an in-process stand-in"""
+    fakeredis = pytest.importorskip("fakeredis")
+    for name in ('REDIS_AVAILABLE', 'local_cache', 'local_ttl'):
+        monkeypatch.setattr(cache_module, name, getattr(cache_module, name))
+    monkeypatch.setattr(cache_module, 'redis_client', getattr(cache_module, 'redis_client', None), raising=False)
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    cache_module.configure_cache('redis', client=client, local_ttl_seconds=5)
+    yield client
+    cache_module.redis_breaker.reset()
+
+
+class TestResultCache:
+    def test_resubmitted_metadata_hits(self, guardrail):
+        """Test identical and case-only variations of metadata share an entry"""
+        cache = ResultCache(guardrail)
+        first = cache.check_deployment("Spain", {'title': "Casino Night"})
+        second = cache.check_deployment("Spain", {'title': "CASINO NIGHT"})
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+        assert second.status == first.status == "WARNING"
+        assert second.policy_version == guardrail.policy_version
+
+    def test_irrelevant_fields_ignored(self, guardrail):
+        """Test fields no check reads do not split the cache"""
+        cache = ResultCache(guardrail)
+        cache.check_deployment("Spain", {'title': "News", 'studio': "A"})
+        cache.check_deployment("Spain", {'title': "News", 'studio': "B"})
+        assert cache.hits == 1
+
+    def test_cached_results_are_copies(self, guardrail):
+        """Test callers cannot corrupt cached entries"""
+        cache = ResultCache(guardrail)
+        result = cache.check_deployment("Spain", {'title': "casino"})
+        result.violations.clear()
+        assert len(cache.check_deployment("Spain", {'title': "casino"}).violations) == 1
+
+    def test_ad_checks_key_on_evaluated_minute(self, guardrail):
+        """Test time-dependent ad results are never served for another time"""
+        cache = ResultCache(guardrail)
+        ad = {'ad_type': "gambling_ads"}
+
+        def check(hour, minute, second=0):
+            return cache.check_deployment(
+                "Spain", {'title': "news"}, ad, datetime(2026, 1, 13, hour, minute, second)
+            )
+
+        assert check(5, 0).status == "PASS"
+        assert check(5, 0, 1).status == "WARNING"   # same minute, past the inclusive bound
+        assert check(5, 0, 30).status == "WARNING"  # served from the entry above
+        assert check(3, 0).status == "PASS"
+        assert cache.hits == 1
+
+        # Without a matching ad rule the time does not matter
+        cache.check_deployment("Spain", {'title': "news"}, {'ad_type': "toy_ads"}, datetime(2026, 1, 13, 9, 0))
+        cache.check_deployment("Spain", {'title': "news"}, {'ad_type': "toy_ads"}, datetime(2026, 1, 13, 18, 30))
+        assert cache.hits == 2
+
+    def test_lru_eviction(self, guardrail):
+        """Test the least recently used entry is evicted at capacity"""
+        cache = ResultCache(guardrail, max_entries=2)
+        cache.check_deployment("Spain", {'title': "a"})
+        cache.check_deployment("Spain", {'title': "b"})
+        cache.check_deployment("Spain", {'title': "a"})
+        cache.check_deployment("Spain", {'title': "c"})
+        assert len(cache) == 2 and cache.evictions == 1
+        cache.check_deployment("Spain", {'title': "a"})
+        assert cache.hits == 2
+
+    def test_policy_version_in_key(self, tmp_path):
+        """Test a policy reload never serves results of the old version"""
+        policy_file = tmp_path / "policy.yaml"
+        policy_file.write_text("Spain:\n  forbidden_keywords: [\"casino\"]\n")
+        guardrail = ComplianceGuardrail(str(policy_file), None)
+        cache = ResultCache(guardrail)
+        assert cache.check_deployment("Spain", {'title': "poker"}).status == "PASS"
+
+        policy_file.write_text("Spain:\n  forbidden_keywords: [\"casino\", \"poker\"]\n")
+        assert guardrail.reload(force=True)
+        assert len(cache) == 0
+        assert cache.check_deployment("Spain", {'title': "poker"}).status == "WARNING"
+
+    def test_discarded_cache_is_not_kept_alive(self, guardrail):
+        """Test the reload listener neither keeps the cache alive nor outlives it"""
+        cache = ResultCache(guardrail)
+        ref = weakref.ref(cache)
+        del cache
+        gc.collect()
+        assert ref() is None
+        assert guardrail._reload_listeners == []
+
+    def test_results_shared_through_redis(self, guardrail, shared_redis):
+        """Test a second process-local cache is served from the shared tier"""
+        first = ResultCache(guardrail, use_redis=True)
+        assert first.check_deployment("Spain", {'title': "casino"}).status == "WARNING"
+        assert first.stats()['type'] == 'redis'
+
+        second = ResultCache(guardrail, use_redis=True)
+        result = second.check_deployment("Spain", {'title': "casino"})
+        assert result.status == "WARNING" and second.hits == 1
+
+    @pytest.mark.parametrize("value", [b"{not json", b'{"status": "PASS"}', b"[1, 2]"])
+    def test_unreadable_shared_value_is_a_miss(self, guardrail, shared_redis, value):
+        """Test corrupt or old-format shared values are re-checked and dropped"""
+        writer = ResultCache(guardrail, use_redis=True)
+        writer.check_deployment("Spain", {'title': "casino"})
+        key, = shared_redis.keys(REDIS_KEY_PREFIX + "*")
+        shared_redis.set(key, value)
+
+        reader = ResultCache(guardrail, use_redis=True)
+        assert reader.check_deployment("Spain", {'title': "casino"}).status == "WARNING"
+        assert reader.misses == 1 and reader.hits == 0
+        assert json.loads(shared_redis.get(key))['status'] == "WARNING"  # Rewritten by the re-check
+
+    def test_local_tier_is_memory_cache(self, guardrail):
+        """Test the in-process tier and its statistics come from src.cache.MemoryCache"""
+        cache = ResultCache(guardrail, max_entries=5)
+        cache.check_deployment("Spain", {'title': "casino"})
+        cache.check_deployment("Spain", {'title': "casino"})
+        assert isinstance(cache._local, cache_module.MemoryCache)
+        local = cache._local.stats()['functions'][REDIS_KEY_PREFIX.rstrip(':')]
+        assert (local['hits'], local['misses'], local['sets']) == (1, 1, 1)
+        assert cache.stats()['hit_rate'] == 0.5 and cache.stats()['keys'] == 1
+
+    def test_open_breaker_skips_shared_tier(self, guardrail, shared_redis, monkeypatch):
+        """Test lookups fall back to checking while the Redis breaker is open"""
+        monkeypatch.setattr(cache_module.redis_breaker, 'allow', lambda: False)
+        cache = ResultCache(guardrail, use_redis=True)
+        assert cache.check_deployment("Spain", {'title': "casino"}).status == "WARNING"
+        assert shared_redis.dbsize() == 0 and cache.misses == 1
+
+    def test_batch_check_matches_guardrail(self, guardrail):
+        """Test cached batch results agree with the uncached guardrail"""
+        deployments = [
+            {'country': "Spain", 'content_metadata': {'title': "casino"}},
+            {'country': "Atlantis", 'content_metadata': {}},
+        ] * 3
+        cache = ResultCache(guardrail)
+        cached = cache.batch_check(deployments)
+        direct = guardrail.batch_check(deployments)
+        assert list(cached) == list(direct)
+        assert [r.status for r in cached.values()] == [r.status for r in direct.values()]
+        assert cache.hits == 4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
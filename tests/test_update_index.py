@@ -0,0 +1,85 @@
+"""
+Unit tests for the indexed update log queries
+"""
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.update_index import UpdateIndex
+from src.update_log import UpdateLogStore
+
+
+def run_entry(day: int, *updates) -> dict:
+    return {"timestamp": f"2026-01-{day:02d}T09:00:00", "updates_count": len(updates),
+            "updates": [{"source": source, "country": country, "title": f"{title} ({day})"}
+                        for source, country, title in updates]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store holding a few runs"""
+    log = UpdateLogStore(str(tmp_path / "update_log"), legacy_path=None, fsync=False)
+    log.append(run_entry(1, ("FCC", "United_States", "A"), ("KCSC", "South_Korea", "B")))
+    log.append(run_entry(2))
+    log.append(run_entry(3, ("KCSC", "South_Korea", "C")))
+    return log
+
+
+class TestUpdateIndex:
+    def test_recent_newest_first(self, store):
+        """Test top-N is newest run first, a run's updates in logged order"""
+        index = UpdateIndex(store)
+        assert [u['title'] for u in index.recent(10)] == ["C (3)", "A (1)", "B (1)"]
+        assert [u['title'] for u in index.recent(2)] == ["C (3)", "A (1)"]
+        assert index.recent(1)[0]['date'] == "2026-01-03" and index.recent(1)[0]['time'] == "09:00"
+
+    def test_range_and_filters(self, store):
+        """Test time-range, per-country and per-source queries"""
+        index = UpdateIndex(store)
+        assert [u['title'] for u in index.range(since="2026-01-02")] == ["C (3)"]
+        assert [u['title'] for u in index.range(until="2026-01-03")] == ["A (1)", "B (1)"]
+        assert index.count(country="South_Korea") == 2
+        assert index.count(since="2026-01-02", country="South_Korea") == 1
+        assert [u['title'] for u in index.recent(5, source="FCC")] == ["A (1)"]
+        assert index.recent(5, country="Atlantis") == []
+        assert index.run_count() == 3 and index.run_count(since="2026-01-02") == 2
+        assert [r['timestamp'][:10] for r in index.latest_runs(2)] == ["2026-01-02", "2026-01-03"]
+
+    def test_incremental_refresh(self, store, monkeypatch):
+        """Test appended runs are picked up without re-reading sealed data"""
+        index = UpdateIndex(store)
+        assert index.count() == 3
+
+        reads = []
+        original = store.read_segment
+        monkeypatch.setattr(store, "read_segment",
+                            lambda name, offset=0: reads.append(offset) or original(name, offset))
+        store.append(run_entry(4, ("FCC", "United_States", "D")))
+        assert [u['title'] for u in index.recent(1)] == ["D (4)"]
+        assert reads and all(offset > 0 for offset in reads)
+        reads.clear()
+        assert index.count() == 4 and not reads  # Unchanged log: no reads at all
+
+    def test_rebuild_after_rotation(self, tmp_path):
+        """Test the index follows segment rotation and compaction"""
+        store = UpdateLogStore(str(tmp_path / "update_log"), segment_max_bytes=200, legacy_path=None, fsync=False)
+        index = UpdateIndex(store)
+        for day in range(1, 11):
+            store.append(run_entry(day, ("FCC", "United_States", "X")))
+            assert index.count() == day
+        store.compact()
+        assert index.count() == 10
+        assert index.recent(1)[0]['title'] == "X (10)"
+
+    def test_legacy_file(self, tmp_path):
+        """Test an unmigrated policy_updates.json is indexed"""
+        import json
+        legacy = tmp_path / "policy_updates.json"
+        legacy.write_text(json.dumps([run_entry(1, ("FCC", "United_States", "A"))]))
+        index = UpdateIndex(UpdateLogStore(str(tmp_path / "update_log"), legacy_path=str(legacy)))
+        assert [u['title'] for u in index.recent(5)] == ["A (1)"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,13 +2,153 @@
 Unit tests for policy auto-updater
 """
 import pytest
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.policy_auto_updater import PolicyUpdateMonitor, RegulatorySource
 
 
+RSS_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Regulator</title>
+<item><title>New gambling ad rules</title><link>http://example.gov/1</link>
+<description>Summary</description></item>
+</channel></rss>"""
+
+HTML_FIXTURES = Path(__file__).parent.parent / "test_data" / "html"
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local regulator stand-in with slow, trickling and failing endpoints"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.conditional_requests = []
+        self.connections = 0
+        self.flaky_failures = 0
+        self.feed_items = []  # (guid, title) of /feed, newest first
+
+    def url(self, path: str, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.server_address[1]}{path}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        host = self.headers.get("Host", "").split(":")[0]
+        with server.lock:
+            server.active[host] = server.active.get(host, 0) + 1
+            server.max_active[host] = max(server.max_active.get(host, 0), server.active[host])
+        try:
+            parts = urlsplit(self.path)
+            delay = float(parse_qs(parts.query).get("delay", ["0"])[0])
+            time.sleep(delay)
+            if parts.path.startswith("/etag"):
+                server.conditional_requests.append(self.headers.get("If-None-Match"))
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                body = RSS_FEED if parts.path.endswith("rss") else b"<html><main><h1>Notice</h1></main></html>"
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif parts.path == "/fail":
+                self.send_response(500)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif parts.path == "/flaky" and server.flaky_failures > 0:
+                server.flaky_failures -= 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif parts.path.startswith("/pages/"):
+                self._send((HTML_FIXTURES / parts.path[len("/pages/"):]).read_bytes(), "text/html; charset=utf-8")
+            elif parts.path == "/feed":
+                items = "".join(f"<item><guid>{guid}</guid><title>{title}</title>"
+                                f"<link>http://example.gov/{guid}</link></item>"
+                                for guid, title in server.feed_items)
+                self._send(f'<?xml version="1.0"?><rss version="2.0"><channel><title>Regulator</title>'
+                           f'{items}</channel></rss>'.encode(), "application/rss+xml")
+            elif parts.path == "/api":
+                self._send(b'{"notices": [{"id": 1, "title": "Ad rules"}]}', "application/json")
+            elif parts.path == "/rss":
+                self._send(RSS_FEED, "application/rss+xml")
+            elif parts.path == "/trickle":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for _ in range(50):
+                    self.wfile.write(b"<p>still loading</p>" * 10)
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            else:
+                self._send(f"<html><body><main><h2>Notice {parts.path}</h2></main></body></html>".encode(),
+                           "text/html")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.lock:
+                server.active[host] -= 1
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stand_in():
+    """Run the stand-in regulator server for one test"""
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_monitor(sources, **limits) -> PolicyUpdateMonitor:
+    """Monitor over explicit sources instead of the configuration file"""
+    monitor = PolicyUpdateMonitor(**limits)
+    monitor.sources = sources
+    return monitor
+
+
+def scrape_source(name: str, url: str) -> RegulatorySource:
+    return RegulatorySource(country="Testland", name=name, url=url, method="scrape", language="en")
+
+
+@pytest.fixture
+def isolated_reports(tmp_path, monkeypatch):
+    """Keep source state and update logs written by a test out of the repository"""
+    monkeypatch.chdir(tmp_path)
+
+
 @pytest.fixture
 def monitor():
     """Create policy update monitor instance"""
@@ -20,7 +160,7 @@ class TestPolicyUpdateMonitor:
         """Test monitor initializes with sources"""
         assert monitor is not None
         assert len(monitor.sources) > 0
-    
+
     def test_sources_have_required_fields(self, monitor):
         """Test all sources have required fields"""
         for source in monitor.sources:
@@ -28,18 +168,18 @@ class TestPolicyUpdateMonitor:
             assert 'name' in source
             assert 'url' in source
             assert 'type' in source
-    
+
     def test_source_types_valid(self, monitor):
         """Test all source types are valid"""
         valid_types = ['rss', 'web', 'api']
         for source in monitor.sources:
             assert source['type'] in valid_types
-    
+
     def test_check_updates_returns_list(self, monitor):
         """Test check_updates returns a list"""
         results = monitor.check_updates()
         assert isinstance(results, list)
-    
+
     def test_regulatory_source_dataclass(self):
         """Test RegulatorySource dataclass"""
         source = RegulatorySource(
@@ -52,5 +192,225 @@ class TestPolicyUpdateMonitor:
         assert source.url == "https://example.com"
 
 
+@pytest.mark.usefixtures("isolated_reports")
+class TestConcurrentPolling:
+    def test_slow_sources_polled_concurrently(self, stand_in):
+        """Test total time tracks the slowest source, not the sum"""
+        sources = [scrape_source(f"Slow {i}", stand_in.url(f"/page{i}?delay=0.5")) for i in range(6)]
+        monitor = make_monitor(sources, max_workers=6, per_host_limit=6)
+        start = time.monotonic()
+        updates = monitor.check_for_updates()
+        assert time.monotonic() - start < 2.0
+        assert [u['source'] for u in updates] == [s.name for s in sources]
+        assert updates[0]['title'] == "Notice /page0"
+
+    def test_per_host_and_global_limits(self, stand_in):
+        """Test no host ever sees more than per_host_limit concurrent fetches"""
+        sources = [scrape_source(f"A {i}", stand_in.url(f"/a{i}?delay=0.2")) for i in range(4)]
+        sources += [scrape_source(f"B {i}", stand_in.url(f"/b{i}?delay=0.2", host="localhost")) for i in range(4)]
+        monitor = make_monitor(sources, max_workers=3, per_host_limit=1)
+        assert len(monitor.check_for_updates()) == 8
+        assert stand_in.max_active == {"127.0.0.1": 1, "localhost": 1}
+
+    def test_failing_and_overdue_sources_skipped(self, stand_in):
+        """Test errors and trickling downloads do not hold up other sources"""
+        sources = [
+            scrape_source("Broken", stand_in.url("/fail")),
+            scrape_source("Trickle", stand_in.url("/trickle")),
+            RegulatorySource(country="Testland", name="Feed", url=stand_in.url("/rss"),
+                             method="rss", language="en"),
+            RegulatorySource(country="Testland", name="Manual", url="", method="manual", language="en"),
+        ]
+        monitor = make_monitor(sources, source_deadline=0.5)
+        start = time.monotonic()
+        updates = monitor.check_for_updates()
+        assert time.monotonic() - start < 2.0
+        assert [(u['source'], u['title']) for u in updates] == [("Feed", "New gambling ad rules")]
+
+    def test_run_budget(self, stand_in):
+        """Test sources still pending when the budget runs out are skipped"""
+        sources = [
+            scrape_source("Quick", stand_in.url("/quick")),
+            scrape_source("Hung", stand_in.url("/hung?delay=3")),
+        ]
+        monitor = make_monitor(sources, run_budget=0.5)
+        start = time.monotonic()
+        updates = monitor.check_for_updates()
+        assert time.monotonic() - start < 1.5
+        assert [u['source'] for u in updates] == ["Quick"]
+
+    def test_overlapping_runs_over_source_subsets(self, stand_in):
+        """Test concurrent runs over explicit subsets leave the configured sources alone"""
+        sources = [scrape_source(f"Slow {i}", stand_in.url(f"/page{i}?delay=0.2")) for i in range(4)]
+        monitor = make_monitor(list(sources))
+        results = {}
+
+        def run(name, subset):
+            results[name] = [u['source'] for u in monitor.check_for_updates(subset)]
+
+        threads = [threading.Thread(target=run, args=("even", sources[::2])),
+                   threading.Thread(target=run, args=("odd", sources[1::2]))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {"even": ["Slow 0", "Slow 2"], "odd": ["Slow 1", "Slow 3"]}
+        assert monitor.sources == sources
+        assert monitor.fetch_stats['requests'] == 2  # Runs are serialized, stats are the last one's
+
+
+@pytest.mark.usefixtures("isolated_reports")
+class TestConditionalFetch:
+    @pytest.mark.parametrize("method,path", [("scrape", "/etag"), ("rss", "/etag-rss")])
+    def test_not_modified_short_circuits(self, stand_in, monkeypatch, method, path):
+        """Test the second run sends the saved ETag and skips parsing on 304"""
+        source = RegulatorySource(country="Testland", name="Etag", url=stand_in.url(path),
+                                  method=method, language="en")
+        monitor = make_monitor([source])
+        assert len(monitor.check_for_updates()) == 1
+        assert monitor.fetch_stats['not_modified'] == 0
+
+        import src.policy_auto_updater as updater
+
+        def no_parsing(*args, **kwargs):
+            raise AssertionError("304 responses must not be parsed")
+        monkeypatch.setattr(monitor.extractor, "extract", no_parsing)
+        monkeypatch.setattr(updater.feedparser, "parse", no_parsing)
+
+        assert monitor.check_for_updates() == []
+        assert stand_in.conditional_requests == [None, '"v1"']
+        stats = monitor.fetch_stats
+        assert stats['requests'] == 1 and stats['not_modified'] == 1
+        assert stats['not_modified_rate'] == 1.0
+        assert stats['bytes_downloaded'] == 0 and stats['bytes_saved'] > 0
+
+    def test_unchanged_api_response_not_reported(self, stand_in):
+        """Test an API source is compared with the hash saved by the previous run"""
+        source = RegulatorySource(country="Testland", name="Api", url=stand_in.url("/api"),
+                                  method="api", language="en")
+        monitor = make_monitor([source])
+        assert monitor._check_api(source) is not None
+        assert monitor._check_api(source) is None
+
+    def test_validators_not_sent_for_changed_url(self, stand_in):
+        """Test validators saved for another URL are not reused"""
+        source = scrape_source("Moved", stand_in.url("/etag"))
+        monitor = make_monitor([source])
+        monitor.check_for_updates()
+        source.url = stand_in.url("/etag?page=2")
+        monitor.check_for_updates()
+        assert stand_in.conditional_requests == [None, None]
+
+
+@pytest.mark.usefixtures("isolated_reports")
+class TestSessionPool:
+    def test_connections_reused_across_sources_and_runs(self, stand_in):
+        """Test sources on one host share kept-alive connections, also across runs"""
+        sources = [scrape_source(f"Page {i}", stand_in.url(f"/page{i}")) for i in range(4)]
+        with make_monitor(sources, max_workers=1, per_host_limit=1) as monitor:
+            monitor.check_for_updates()
+            monitor.check_for_updates()
+        assert stand_in.connections == 1
+
+    def test_retries_transient_errors(self, stand_in):
+        """Test 503 responses are retried with backoff"""
+        stand_in.flaky_failures = 2
+        source = scrape_source("Flaky", stand_in.url("/flaky"))
+        with make_monitor([source], max_retries=2, retry_backoff=0.01) as monitor:
+            assert [u['source'] for u in monitor.check_for_updates()] == ["Flaky"]
+        assert stand_in.flaky_failures == 0
+
+    def test_retries_stay_within_source_deadline(self, stand_in):
+        """Test retries and backoff stop at the source deadline instead of running (retries+1)x past it"""
+        stand_in.flaky_failures = 100
+        source = scrape_source("Down", stand_in.url("/flaky?delay=0.3"))
+        with make_monitor([source], source_deadline=1.0, max_retries=10, retry_backoff=0.05) as monitor:
+            start = time.monotonic()
+            assert monitor.check_for_updates() == []
+            assert time.monotonic() - start < 1.5
+
+
+@pytest.mark.usefixtures("isolated_reports")
+class TestWebsiteExtraction:
+    def test_configured_selectors(self, stand_in):
+        """Test per-source selectors pick the content block and its headline link"""
+        source = scrape_source("Press", stand_in.url("/pages/press_releases.html"))
+        source.selectors = ["section.content"]
+        with make_monitor([source]) as monitor:
+            update, = monitor.check_for_updates()
+        assert update['title'].startswith("Pressemitteilung 120:")
+        assert update['link'] == stand_in.url("/SharedDocs/Pressemitteilungen/DE/2026/120_Meldung.html")
+
+    def test_backends_hash_identically(self, stand_in):
+        """Test switching parser backend does not report every page as changed"""
+        source = scrape_source("Notices", stand_in.url("/pages/notice_list.html"))
+        with make_monitor([source], html_backend="bs4") as monitor:
+            first, = monitor.check_for_updates()
+        with make_monitor([source], html_backend="lxml") as monitor:
+            assert monitor.check_for_updates() == []
+        assert first['link'] == stand_in.url("/news/notice/view?id=9000")
+
+
+@pytest.mark.usefixtures("isolated_reports")
+class TestFeedDiffing:
+    @pytest.fixture
+    def feed_monitor(self, stand_in):
+        source = RegulatorySource(country="Testland", name="Feed", url=stand_in.url("/feed"),
+                                  method="rss", language="en")
+        with make_monitor([source]) as monitor:
+            yield monitor
+
+    @staticmethod
+    def titles(updates):
+        return [u['title'] for u in updates]
+
+    def test_reports_every_new_entry_once(self, stand_in, feed_monitor):
+        """Test each poll emits exactly the entries added since the previous one"""
+        stand_in.feed_items = [("g2", "Second"), ("g1", "First")]
+        assert self.titles(feed_monitor.check_for_updates()) == ["Second"]
+
+        stand_in.feed_items = [("g4", "Fourth"), ("g3", "Third")] + stand_in.feed_items
+        assert self.titles(feed_monitor.check_for_updates()) == ["Fourth", "Third"]
+        assert feed_monitor.check_for_updates() == []
+
+    def test_edited_entry_not_reported(self, stand_in, feed_monitor):
+        """Test changing the title of a known entry is not a new update"""
+        stand_in.feed_items = [("g1", "First")]
+        feed_monitor.check_for_updates()
+        stand_in.feed_items = [("g1", "First (corrected)")]
+        assert feed_monitor.check_for_updates() == []
+
+    def test_legacy_top_entry_hash_migrated(self, stand_in, feed_monitor):
+        """Test a source last checked with the top-entry hash is not re-reported"""
+        import hashlib
+        import json
+        import src.policy_auto_updater as updater
+        stand_in.feed_items = [("g1", "First")]
+        source = feed_monitor.sources[0]
+        updater.SOURCE_STATE_DIR.mkdir(parents=True)
+        feed_monitor._state_file(source).write_text(json.dumps(
+            {"hash": hashlib.md5(b"First").hexdigest(), "url": source.url}))
+
+        assert feed_monitor.check_for_updates() == []
+        state = json.loads(feed_monitor._state_file(source).read_text())
+        assert "hash" not in state and len(state['seen_entries']) == 1
+
+    def test_stale_legacy_hash_reports_latest_entry_only(self, stand_in, feed_monitor):
+        """Test a feed that changed since the top-entry hash was saved reports just its newest entry"""
+        import hashlib
+        import json
+        import src.policy_auto_updater as updater
+        stand_in.feed_items = [("g3", "Third"), ("g2", "Second"), ("g1", "First")]
+        source = feed_monitor.sources[0]
+        updater.SOURCE_STATE_DIR.mkdir(parents=True)
+        feed_monitor._state_file(source).write_text(json.dumps(
+            {"hash": hashlib.md5(b"First").hexdigest(), "url": source.url}))
+
+        assert self.titles(feed_monitor.check_for_updates()) == ["Third"]
+        state = json.loads(feed_monitor._state_file(source).read_text())
+        assert "hash" not in state and len(state['seen_entries']) == 3
+        assert feed_monitor.check_for_updates() == []
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
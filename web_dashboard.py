@@ -6,7 +6,8 @@ Regulatory Update Monitoring Dashboard for Global OTT Platforms
 from flask import Flask, render_template, jsonify, request
 from flask_swagger_ui import get_swaggerui_blueprint
 from flask_cors import CORS
-import json
+import os
+import threading
 import yaml
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -15,6 +16,10 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 from src.policy_auto_updater import PolicyUpdateMonitor
 from src.change_tracker import ChangeTracker
+from src.aggregates import AggregateStore, analytics_view
+from src.file_cache import report_cache
+from src.update_index import UpdateIndex
+from src.update_log import UpdateLogStore
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -34,13 +39,47 @@ app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 # Global variables - lazy initialization
 monitor = None
 tracker = None
+update_log = UpdateLogStore()
+update_index = UpdateIndex(update_log)
+COMPLIANCE_REPORT = Path("reports/compliance_report.json")
+aggregates = AggregateStore(update_log=update_log, compliance_report=COMPLIANCE_REPORT)
+# Shown by /api/analytics until a compliance report with country details exists
+SAMPLE_ANALYTICS = analytics_view(
+    {
+        'South Korea': 2,
+        'Japan': 1,
+        'China': 3,
+        'United States': 0,
+        'EU General': 1,
+        'India': 2,
+        'Saudi Arabia': 1
+    },
+    {
+        'Content Rating': 4,
+        'Advertising': 3,
+        'Privacy': 2,
+        'Accessibility': 1,
+        'Localization': 2
+    }
+)
+_init_lock = threading.Lock()
+def _reset_init_lock():
+    global _init_lock
+    _init_lock = threading.Lock()
+if hasattr(os, 'register_at_fork'):  # Forked workers start with an unlocked lock
+    os.register_at_fork(after_in_child=_reset_init_lock)
 def init_globals():
-    """Initialize global variables"""
+    """Initialize global variables (once per process, also under threaded workers)"""
+    if monitor is not None and tracker is not None:
+        return
+    with _init_lock:
+        _init_globals()
+def _init_globals():
     global monitor, tracker
     if monitor is None:
         try:
             print("Initializing PolicyUpdateMonitor...")
-            monitor = PolicyUpdateMonitor()
+            monitor = PolicyUpdateMonitor(update_log=update_log, aggregates=aggregates)
             print(f"PolicyUpdateMonitor initialized with {len(monitor.sources)} sources")
         except Exception as e:
             print(f"Error initializing PolicyUpdateMonitor: {e}")
@@ -57,6 +96,22 @@ def init_globals():
             import traceback
             traceback.print_exc()
             tracker = None
+def preload_state():
+    """
+    Build the process state every request needs before workers are forked
+
+    Called by wsgi.py; with gunicorn's preload_app the sources, update
+    index and parsed reports are loaded once in the master and shared
+    copy-on-write by the workers. Inherited locks and pooled connections
+    are re-created in each worker (src/fork_safety.py).
+    """
+    init_globals()
+    try:
+        update_index.refresh()
+        aggregates.get()
+        report_cache.get(COMPLIANCE_REPORT)
+    except Exception as e:
+        print(f"Error preloading dashboard state: {e}")
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -70,25 +125,10 @@ def index():
         }
         # Country list
         countries = sorted(set(s.country for s in monitor.sources)) if monitor else []
-        # Monitoring data (status by country) - Load from compliance report
-        monitoring = {}
-        compliance_file = Path("reports/compliance_report.json")
-        if compliance_file.exists():
-            try:
-                with open(compliance_file, 'r') as f:
-                    compliance_data = json.load(f)
-                    for country, data in compliance_data.get('country_details', {}).items():
-                        monitoring[country] = {
-                            'status': data['compliance_status'],
-                            'checks': data['total_checks'],
-                            'violations': data['violations'],
-                            'pass_rate': data['compliance_rate'],
-                            'critical_issues': len(data.get('critical_issues', [])),
-                            'warnings': len(data.get('warnings', [])),
-                            'last_checked': data.get('last_checked', '')
-                        }
-            except:
-                pass
+        # Monitoring data (status by country) - Materialized from the compliance report
+        current = aggregates.get()
+        compliance = current['compliance']
+        monitoring = dict(compliance.get('monitoring', {}))
         # Fallback if no compliance data
         if not monitoring and monitor:
             for country in countries:
@@ -102,58 +142,25 @@ def index():
                     'last_checked': datetime.now().isoformat()
                 }
         # Calculate more detailed statistics
-        if compliance_file.exists():
-            try:
-                with open(compliance_file, 'r') as f:
-                    compliance_data = json.load(f)
-                    stats['total_checks'] = compliance_data.get('summary', {}).get('total_checks', 0)
-                    stats['success_rate'] = compliance_data.get('summary', {}).get('compliance_rate', 0)
-            except:
-                pass
+        if compliance:
+            stats['total_checks'] = compliance['total_checks']
+            stats['success_rate'] = compliance['compliance_rate']
         
-        # Recent updates - Load from policy_updates.json
+        # Recent updates - Load from the update log
         recent_updates = []
-        log_file = Path("reports/policy_updates.json")
-        if log_file.exists():
-            try:
-                with open(log_file, 'r') as f:
-                    logs = json.load(f)
-                if logs and not stats['total_checks']:
-                    stats['total_checks'] = len(logs)
-                    stats['success_rate'] = 95
-                    # Collect all updates with timestamps
-                    all_updates = []
-                    for log_entry in logs:
-                        timestamp = log_entry.get('timestamp', '')
-                        for update in log_entry.get('updates', []):
-                            # Parse timestamp for sorting
-                            try:
-                                update_time = datetime.fromisoformat(timestamp)
-                                date_str = update_time.strftime('%Y-%m-%d')
-                                time_str = update_time.strftime('%H:%M')
-                            except:
-                                date_str = timestamp[:10] if timestamp else 'N/A'
-                                time_str = ''
-                            all_updates.append({
-                                'source': update.get('source', 'Unknown'),
-                                'country': update.get('country', 'Unknown'),
-                                'date': date_str,
-                                'time': time_str,
-                                'title': update.get('title', 'Policy Update'),
-                                'url': update.get('url', ''),
-                                'confidence': update.get('confidence', 'medium'),
-                                'status': update.get('status', 'pending_review'),
-                                'timestamp': timestamp,
-                                'summary': update.get('summary', update.get('title', 'Regulatory update detected'))
-                            })
-                    # Sort by timestamp (newest first) and take top 10
-                    all_updates.sort(key=lambda x: x['timestamp'], reverse=True)
-                    recent_updates = all_updates[:10]
-            except Exception as e:
-                print(f"Error loading policy updates: {e}")
-                pass
+        try:
+            run_count = current['updates']['run_count']
+            if run_count and not stats['total_checks']:
+                stats['total_checks'] = run_count
+                stats['success_rate'] = 95
+                # Newest 10 updates
+                recent_updates = update_index.recent(10)
+        except Exception as e:
+            print(f"Error loading policy updates: {e}")
+            pass
         
         # Generate insights
+        compliant_regions = compliance.get('compliant_regions', 0)
         insights = [
             {
                 'title': 'Global Coverage',
@@ -169,8 +176,8 @@ def index():
             },
             {
                 'title': 'Active Monitoring',
-                'description': f'{len([m for m in monitoring.values() if m.get("status") == "compliant"])} regions fully compliant',
-                'value': len([m for m in monitoring.values() if m.get('status') == 'compliant']),
+                'description': f'{compliant_regions} regions fully compliant',
+                'value': compliant_regions,
                 'trend': 'positive'
             },
             {
@@ -204,14 +211,8 @@ def get_status():
         init_globals()
         if monitor is None or tracker is None:
             return jsonify({"error": "System not initialized"}), 500
-        # Read recent update logs
-        log_file = Path("reports/policy_updates.json")
-        recent_log = None
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-                if logs and len(logs) > 0:
-                    recent_log = logs[-1]
+        # Most recent run, materialized when it was logged
+        recent_log = aggregates.get()['updates']['last_run']
         # Pending changes
         pending_changes = tracker.get_pending_changes()
         approved_changes = tracker.get_approved_changes()
@@ -257,50 +258,15 @@ def get_updates():
     """Get recent updates"""
     try:
         days = int(request.args.get('days', 30))
-        log_file = Path("reports/policy_updates.json")
-        if not log_file.exists():
-            return jsonify({"success": True, "updates": [], "total": 0})
-        with open(log_file, 'r') as f:
-            logs = json.load(f)
         # Filter last N days
-        cutoff = datetime.now() - timedelta(days=days)
-        recent_logs = [
-            log for log in logs
-            if datetime.fromisoformat(log['timestamp']) > cutoff
-        ]
-        # Extract all updates with enhanced formatting
-        all_updates = []
-        for log in recent_logs:
-            timestamp = log['timestamp']
-            for update in log.get('updates', []):
-                # Parse timestamp for better display
-                try:
-                    update_time = datetime.fromisoformat(timestamp)
-                    date_str = update_time.strftime('%Y-%m-%d')
-                    time_str = update_time.strftime('%H:%M')
-                except:
-                    date_str = timestamp[:10] if timestamp else 'N/A'
-                    time_str = ''
-                all_updates.append({
-                    'source': update.get('source', 'Unknown'),
-                    'country': update.get('country', 'Unknown'),
-                    'title': update.get('title', 'Policy Update'),
-                    'url': update.get('url', ''),
-                    'confidence': update.get('confidence', 'medium'),
-                    'status': update.get('status', 'pending_review'),
-                    'date': date_str,
-                    'time': time_str,
-                    'timestamp': timestamp,
-                    'summary': update.get('summary', update.get('title', 'Regulatory update detected'))
-                })
-        # Sort by timestamp (newest first)
-        all_updates.sort(key=lambda x: x['timestamp'], reverse=True)
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        total = update_index.count(since=cutoff)
         return jsonify({
             "success": True,
-            "updates": all_updates[:20],  # Return top 20
-            "total": len(all_updates),
-            "count": min(len(all_updates), 20),
-            "logs": len(recent_logs)
+            "updates": update_index.range(since=cutoff, limit=20),  # Return top 20
+            "total": total,
+            "count": min(total, 20),
+            "logs": update_index.run_count(since=cutoff)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -349,14 +315,11 @@ def check_now():
             return jsonify({"error": "System not initialized"}), 500
         data = request.get_json() or {}
         frequency = data.get('frequency', 'all')
-        # Filter by frequency
+        # Filter by frequency without touching the shared monitor's source list
+        sources = None
         if frequency != 'all':
-            original_sources = monitor.sources
-            monitor.sources = [s for s in monitor.sources if s.check_frequency == frequency]
-        updates = monitor.check_for_updates()
-        # Restore original sources
-        if frequency != 'all':
-            monitor.sources = original_sources
+            sources = [s for s in monitor.sources if s.check_frequency == frequency]
+        updates = monitor.check_for_updates(sources)
         # Save log
         if updates:
             monitor.save_update_log(updates)
@@ -381,16 +344,8 @@ def get_stats():
             if country not in countries:
                 countries[country] = 0
             countries[country] += 1
-        # Update count for last 30 days
-        log_file = Path("reports/policy_updates.json")
-        daily_updates = {}
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-            for log in logs[-30:]:  # Last 30 logs
-                date = log['timestamp'][:10]
-                count = log.get('updates_count', 0)
-                daily_updates[date] = daily_updates.get(date, 0) + count
+        # Update count of the last 30 logs, materialized when each run was logged
+        daily_updates = aggregates.get()['updates']['recent_daily_updates']
         return jsonify({
             "countries": countries,
             "daily_updates": daily_updates,
@@ -404,29 +359,23 @@ def get_country_details(country_name):
     try:
         init_globals()
         # Load compliance report
-        compliance_file = Path("reports/compliance_report.json")
-        country_data = None
-        if compliance_file.exists():
-            with open(compliance_file, 'r') as f:
-                compliance_data = json.load(f)
-                country_data = compliance_data.get('country_details', {}).get(country_name)
+        compliance_data = report_cache.get(COMPLIANCE_REPORT, {})
+        country_data = compliance_data.get('country_details', {}).get(country_name)
         if not country_data:
             return jsonify({"error": "Country not found"}), 404
         # Get recent updates for this country
         recent_updates = []
-        log_file = Path("reports/policy_updates.json")
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-                for log in logs[-30:]:  # Last 30 days
-                    for update in log.get('updates', []):
-                        if update.get('country') == country_name:
-                            recent_updates.append({
-                                'date': log['timestamp'][:10],
-                                'title': update.get('title', ''),
-                                'source': update.get('source', ''),
-                                'confidence': update.get('confidence', '')
-                            })
+        # Updates of this country within the last 30 runs, newest first
+        last_runs = update_index.latest_runs(30)
+        since = last_runs[0]['timestamp'] if last_runs else None
+        update_count = update_index.count(since=since, country=country_name)
+        for update in update_index.range(since=since, limit=10, country=country_name):
+            recent_updates.append({
+                'date': update['timestamp'][:10],
+                'title': update.get('title', ''),
+                'source': update.get('source', ''),
+                'confidence': update.get('confidence', '')
+            })
         # Get sources monitoring this country
         sources = []
         if monitor:
@@ -442,9 +391,9 @@ def get_country_details(country_name):
         return jsonify({
             "country": country_name,
             "compliance": country_data,
-            "recent_updates": recent_updates[:10],
+            "recent_updates": recent_updates,
             "sources": sources,
-            "update_count": len(recent_updates)
+            "update_count": update_count
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -454,112 +403,20 @@ def get_analytics():
     try:
         init_globals()
         
-        # Load compliance report for violations data
-        compliance_file = Path("reports/compliance_report.json")
-        violations_by_country = {}
-        distribution_by_category = {
-            'Content Rating': 0,
-            'Advertising': 0,
-            'Privacy': 0,
-            'Accessibility': 0,
-            'Localization': 0,
-            'Other': 0
-        }
-        
-        if compliance_file.exists():
-            try:
-                with open(compliance_file, 'r') as f:
-                    compliance_data = json.load(f)
-                    for country, data in compliance_data.get('country_details', {}).items():
-                        violations_by_country[country] = data.get('violations', 0)
-                        
-                        # Categorize violations
-                        for issue in data.get('critical_issues', []):
-                            category = categorize_issue(issue)
-                            distribution_by_category[category] = distribution_by_category.get(category, 0) + 1
-            except Exception as e:
-                print(f"Error loading compliance data: {e}")
-        
-        # If no data, create sample data
-        if not violations_by_country:
-            violations_by_country = {
-                'South Korea': 2,
-                'Japan': 1,
-                'China': 3,
-                'United States': 0,
-                'EU General': 1,
-                'India': 2,
-                'Saudi Arabia': 1
-            }
-            distribution_by_category = {
-                'Content Rating': 4,
-                'Advertising': 3,
-                'Privacy': 2,
-                'Accessibility': 1,
-                'Localization': 2
-            }
-        
-        # Generate insights
-        total_violations = sum(violations_by_country.values())
-        total_countries = len(violations_by_country)
-        compliant_countries = sum(1 for v in violations_by_country.values() if v == 0)
-        
-        insights = [
-            {
-                'type': 'coverage',
-                'title': 'Global Coverage',
-                'description': f'Monitoring {total_countries} countries with comprehensive regulatory tracking',
-                'value': f'{total_countries} Countries'
-            },
-            {
-                'type': 'compliance',
-                'title': 'Compliance Rate',
-                'description': f'{compliant_countries} out of {total_countries} regions are fully compliant',
-                'value': f'{int((compliant_countries/total_countries)*100)}%' if total_countries > 0 else '0%'
-            },
-            {
-                'type': 'monitoring',
-                'title': 'Active Monitoring',
-                'description': f'{compliant_countries} regions fully compliant',
-                'value': f'{compliant_countries} Regions'
-            },
-            {
-                'type': 'warning' if total_violations > 5 else 'success',
-                'title': 'Total Violations',
-                'description': f'{total_violations} violations detected across all monitored regions',
-                'value': f'{total_violations} Issues'
-            }
-        ]
-        
-        return jsonify({
-            'violations_by_country': violations_by_country,
-            'distribution_by_category': distribution_by_category,
-            'insights': insights,
-            'total_violations': total_violations,
-            'total_countries': total_countries,
-            'compliant_countries': compliant_countries
-        })
+        # Materialized from the compliance report; sample data if it has no country details
+        analytics = aggregates.get()['compliance'].get('analytics') or SAMPLE_ANALYTICS
+        return jsonify(analytics)
     except Exception as e:
         print(f"Error in analytics: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
-def categorize_issue(issue):
-    """Categorize an issue based on its content"""
-    issue_lower = str(issue).lower()
-    if any(word in issue_lower for word in ['rating', 'age', 'mature', 'violence', 'sexual']):
-        return 'Content Rating'
-    elif any(word in issue_lower for word in ['ad', 'advertising', 'commercial', 'sponsor']):
-        return 'Advertising'
-    elif any(word in issue_lower for word in ['privacy', 'data', 'personal', 'gdpr']):
-        return 'Privacy'
-    elif any(word in issue_lower for word in ['accessibility', 'subtitle', 'caption', 'audio']):
-        return 'Accessibility'
-    elif any(word in issue_lower for word in ['language', 'translation', 'localization', 'local']):
-        return 'Localization'
-    else:
-        return 'Other'
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics, including the parsed report cache counters"""
+    from src.monitoring import metrics_endpoint
+    return metrics_endpoint()
 
 @app.route('/health')
 def health():
@@ -570,7 +427,6 @@ def health():
     })
 def main():
     """Main function"""
-    import os
     # Create required directories
     Path("reports").mkdir(exist_ok=True)
     Path("reports/scheduler_logs").mkdir(exist_ok=True)
@@ -583,6 +439,7 @@ def main():
     print("=" * 70)
     print(f"Server starting on http://{host}:{port}")
     print("Press Ctrl+C to stop")
+    print("Development server; for production use: gunicorn -c gunicorn.conf.py wsgi:app")
     print("=" * 70)
     print()
     app.run(host=host, port=port, debug=debug)
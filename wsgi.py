@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production serving of the web dashboard
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Process state (sources, update index, parsed reports) is built at import,
+so with preload_app it is loaded once in the gunicorn master before the
+workers are forked.
+"""
+from web_dashboard import app, preload_state
+
+preload_state()
+
+application = app